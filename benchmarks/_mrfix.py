@@ -0,0 +1,18 @@
+"""Load the single-file analyzer as an importable module for benchmarks."""
+import importlib.util
+import sys
+from pathlib import Path
+
+SCRIPT_PATH = Path(__file__).resolve().parent.parent / "mr-fix-my-project-please.py"
+MODULE_NAME = "mr_fix_my_project_please"
+
+
+def load_mrfix():
+    """Import mr-fix-my-project-please.py (hyphenated name) once per process"""
+    if MODULE_NAME in sys.modules:
+        return sys.modules[MODULE_NAME]
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
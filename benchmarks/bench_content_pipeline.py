@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Content pipeline benchmark: per-analyzer file reads vs one ContentPipeline read.
+
+Builds (or reuses) a synthetic tree and runs the per-file work of a cold
+analyze_and_heal over its source files in two ways:
+    • legacy    — what the parse stage and LOC count did before: the dependency
+                  parser, the sniper entity scan and the line counter each open
+                  and read the file themselves (3 reads per file)
+    • pipeline  — ContentPipeline.run(): one read, the same bytes fanned out to
+                  hash, loc, imports, entities, patterns and quality
+Opens are counted with an audit hook (sys.addaudithook, "open" events under the
+tree). Bytes read come from file sizes for legacy and from the pipeline's own
+accounting for the pipeline run.
+
+It also checks the pipeline's results against the code paths it replaced:
+imports, entities and line counts as in legacy, the duplicate hash as
+detect_duplicates computes it, and patterns/quality as perform_deep_analysis
+computed them from a 10 KB text read.
+
+Exit code 1 when any result differs, when the pipeline opens a file more than
+once, or when its read amplification is not 1.0.
+
+Usage:
+    python benchmarks/bench_content_pipeline.py [--files 2000] [--seed 0]
+                                                [--workdir DIR] [--json OUT]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _mrfix import load_mrfix  # noqa: E402
+from synthetic_repo import generate  # noqa: E402
+
+VOLATILE = ("scan_time_ms", "scan_timestamp")  # Differ between any two runs
+
+
+class OpenCounter:
+    """Counts open() calls under `root` while active (audit hooks cannot be removed)"""
+
+    def __init__(self, root: Path):
+        self.root = os.path.realpath(root) + os.sep
+        self.active = False
+        self.opens = Counter()
+        sys.addaudithook(self.hook)
+
+    def hook(self, event, args):
+        if not self.active or event != "open" or not args or not isinstance(args[0], (str, bytes, os.PathLike)):
+            return
+        path = os.fsdecode(args[0])
+        if path.startswith(self.root):
+            self.opens[path] += 1
+
+    @contextlib.contextmanager
+    def counting(self):
+        self.opens.clear()
+        self.active = True
+        try:
+            yield self.opens
+        finally:
+            self.active = False
+
+
+def stable(result):
+    if isinstance(result, dict):
+        return {key: value for key, value in result.items() if key not in VOLATILE}
+    return result
+
+
+def legacy_lines(path) -> int:
+    """The old _count_total_lines body for one file"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return len(f.readlines())
+    except Exception:
+        return None
+
+
+def legacy_quality(analyzer, path: Path) -> dict:
+    """The old perform_deep_analysis read: first 10 KB as text, undecodable bytes dropped"""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        content = f.read(10240)
+    return {
+        "content_length": len(content),
+        "patterns": analyzer.detect_patterns(content, path.suffix),
+        "quality": analyzer.analyze_code_quality(content, path.suffix),
+    }
+
+
+def run_legacy(fixer, files: list) -> dict:
+    return {
+        str(path): {
+            "imports": stable(fixer._analyze_file_dependencies(path)),
+            "entities": stable(fixer._sniper_entity_scan(path)),
+            "loc": legacy_lines(path),
+        }
+        for path in files
+    }
+
+
+def run_pipeline(mrfix, fixer, files: list, sizes: dict):
+    pipeline = mrfix.ContentPipeline(helper=fixer)
+    outputs = {}
+    for path in files:
+        result, read = pipeline.run(path)
+        pipeline.account(read, sizes[str(path)])
+        outputs[str(path)] = {name: stable(value) for name, value in result.items()}
+    return outputs, pipeline
+
+
+def timed(counter, func):
+    with counter.counting() as opens:
+        started = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - started
+    return result, round(seconds, 3), sum(opens.values()), max(opens.values(), default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000, help="synthetic tree size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=str(Path(tempfile.gettempdir()) / "mrfix-bench"))
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    root = Path(args.workdir) / f"repo_{args.files}_s{args.seed}"
+    generate(root, args.files, args.seed)
+    mrfix = load_mrfix()
+    fixer = mrfix.MrFixMyProjectPlease(str(root))
+    ultra = mrfix.UltraThinkMermaidMaximizer(fixer.project_path)
+    files = fixer._scan_source_files(fixer.project_path)
+    sizes = {str(path): os.path.getsize(path) for path in files}
+    tree_bytes = sum(sizes.values())
+    counter = OpenCounter(fixer.project_path)
+
+    with contextlib.redirect_stdout(io.StringIO()):  # Analyzer progress lines
+        legacy, legacy_seconds, legacy_opens, _ = timed(counter, lambda: run_legacy(fixer, files))
+        (outputs, pipeline), pipeline_seconds, pipeline_opens, max_opens = timed(
+            counter, lambda: run_pipeline(mrfix, fixer, files, sizes))
+
+    failures = []
+    io_stats = Counter()
+    for path in files:
+        key = str(path)
+        got = outputs[key]
+        for name in ("imports", "entities", "loc"):
+            if got[name] != legacy[key][name]:
+                failures.append(f"{path.name}: {name} differs from the legacy reader")
+        if got["hash"] != ultra._content_digest(key, sizes[key], io_stats):
+            failures.append(f"{path.name}: hash differs from detect_duplicates")
+        if mrfix.ContentPipeline.quality_entry(got) != legacy_quality(ultra, path):
+            failures.append(f"{path.name}: patterns/quality differ from perform_deep_analysis")
+    summary = pipeline.summary()
+    if max_opens > 1:
+        failures.append(f"pipeline opened a file {max_opens} times")
+    if summary["read_amplification"] != 1.0:
+        failures.append(f"pipeline read amplification {summary['read_amplification']} (want 1.0)")
+
+    rows = {
+        "legacy": {"seconds": legacy_seconds, "opens": legacy_opens, "bytes_read": 3 * tree_bytes,
+                   "read_amplification": 3.0},
+        "pipeline": {"seconds": pipeline_seconds, "opens": pipeline_opens, "bytes_read": summary["bytes_read"],
+                     "read_amplification": summary["read_amplification"]},
+    }
+    print(f"{len(files):,} source files, {tree_bytes / 1024 / 1024:.1f} MB")
+    print(f"{'mode':<9} {'seconds':>8} {'opens':>7} {'MB read':>8} {'amplification':>14}")
+    for mode, row in rows.items():
+        print(f"{mode:<9} {row['seconds']:>8.3f} {row['opens']:>7} {row['bytes_read'] / 1024 / 1024:>8.1f} "
+              f"{row['read_amplification']:>14}")
+    print("\npipeline analyzer time (ms): "
+          + ", ".join(f"{name} {ms}" for name, ms in summary["analyzer_ms"].items()))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(dict(files=len(files), tree_bytes=tree_bytes, modes=rows,
+                                                   pipeline=summary, failures=failures[:50]), indent=2))
+    for failure in failures[:20]:
+        print(f"❌ {failure}")
+    if len(failures) > 20:
+        print(f"❌ ... {len(failures) - 20} more")
+    if not failures:
+        print(f"\n✅ same results as the per-analyzer readers; one open per file "
+              f"({rows['legacy']['opens']} → {rows['pipeline']['opens']}), read amplification 1.0")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Dependency graph build benchmark: legacy O(N·E) export matching vs symbol index.
+
+Generates an in-memory synthetic repo (Python packages + TypeScript components
+with relative imports) and times MrFixMyProjectPlease._build_dependency_graph.
+The legacy matcher is too slow to run to completion on large repos, so it is
+timed on a sample of importers and extrapolated linearly (its cost per
+importer is proportional to the total number of exports).
+
+Usage:
+    python benchmarks/bench_dependency_graph.py [--sizes 5000 20000 50000]
+                                                [--legacy-sample 200] [--json OUT]
+"""
+import argparse
+import json
+import posixpath
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _mrfix import load_mrfix  # noqa: E402
+
+SYNTHETIC_ROOT = "/synthetic-repo"
+
+
+def synthetic_dependencies(file_count: int, seed: int = 42):
+    """file_dependencies / all_exports shaped like generate_dependency_analysis output"""
+    rng = random.Random(seed)
+    rel_paths = []
+    for i in range(file_count):
+        if i % 5 < 3:
+            rel_paths.append(f"pkg{i // 500}/sub{(i // 25) % 20}/mod{i}.py")
+        else:
+            rel_paths.append(f"web/feature{i // 400}/part{(i // 20) % 20}/comp{i}.ts")
+
+    file_dependencies = {}
+    all_exports = {}
+    for i, rel in enumerate(rel_paths):
+        file_path = Path(SYNTHETIC_ROOT) / rel
+        exports = [("function", f"sym{i}_{k}") for k in range(3)]
+        imports = ["os", "json"]
+        for _ in range(3):
+            j = rng.randrange(file_count)
+            target = rel_paths[j]
+            if rel.endswith(".py") and target.endswith(".py"):
+                module = target[:-3].replace("/", ".")
+                imports.append(module)
+                imports.append(f"{module}.sym{j}_0")
+            elif rel.endswith(".ts") and target.endswith(".ts"):
+                spec = posixpath.relpath(target[:-3], posixpath.dirname(rel))
+                imports.append(spec if spec.startswith(".") else "./" + spec)
+        if rel.endswith(".ts"):
+            imports.append("react")
+        file_dependencies[file_path] = {"imports": sorted(set(imports)), "exports": exports}
+        all_exports[file_path] = exports
+    return file_dependencies, all_exports
+
+
+def legacy_build_dependency_graph(file_dependencies: dict, all_exports: dict) -> dict:
+    """The pre-index implementation, kept verbatim for comparison"""
+    graph = {}
+    for file_path, deps in file_dependencies.items():
+        imports = deps.get("imports", [])
+        file_deps = []
+        for imp in imports:
+            for export_file, exports in all_exports.items():
+                for export_type, export_name in exports:
+                    if imp.endswith(export_name) or export_name in imp:
+                        file_deps.append(str(export_file))
+                        break
+        graph[str(file_path)] = list(set(file_deps))
+    return graph
+
+
+def run(sizes, legacy_sample):
+    mrfix = load_mrfix()
+    analyzer = mrfix.MrFixMyProjectPlease.__new__(mrfix.MrFixMyProjectPlease)
+    analyzer.project_path = Path(SYNTHETIC_ROOT)
+    rows = []
+    for size in sizes:
+        file_dependencies, all_exports = synthetic_dependencies(size)
+
+        start = time.perf_counter()
+        graph = analyzer._build_dependency_graph(file_dependencies, all_exports)
+        indexed = time.perf_counter() - start
+
+        sample_keys = list(file_dependencies)[:legacy_sample]
+        sample = {k: file_dependencies[k] for k in sample_keys}
+        start = time.perf_counter()
+        legacy_build_dependency_graph(sample, all_exports)
+        legacy = (time.perf_counter() - start) * size / max(1, len(sample))
+
+        rows.append(
+            {
+                "files": size,
+                "edges": sum(len(v) for v in graph.values()),
+                "indexed_seconds": round(indexed, 4),
+                "legacy_seconds_estimated": round(legacy, 2),
+                "speedup": round(legacy / indexed, 1) if indexed else None,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000, 50000])
+    parser.add_argument("--legacy-sample", type=int, default=200,
+                        help="importers timed with the legacy matcher before extrapolating")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.legacy_sample)
+    print(f"{'files':>8} {'edges':>8} {'indexed (s)':>12} {'legacy est. (s)':>16} {'speedup':>9}")
+    for row in rows:
+        print(
+            f"{row['files']:>8,} {row['edges']:>8,} {row['indexed_seconds']:>12.3f} "
+            f"{row['legacy_seconds_estimated']:>16.1f} {row['speedup']:>8}x"
+        )
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Ignore-pruning benchmark: full inventory walk vs .gitignore-aware pruning.
+
+Builds a synthetic tree in a fresh git repository, then adds what real projects
+ignore: a .venv with thousands of site-packages files, node_modules, .turbo and
+.next build caches, Rust target/, *.log files (with one !negated keeper), a
+"vendored/*" rule with one directory re-included by "!vendored/keepme/", a line
+git accepts but Python's re rejects ("[z-a]"), a nested src/.gitignore for
+generated code, a .git/info/exclude rule and a .mrfixignore rule.
+    • full     — FileInventory(honor_ignore_files=False): --no-ignore, lists everything
+    • pruned   — FileInventory(): ignored directories are never scanned
+It reports directories scanned, files listed, bytes listed (what later stages
+would stat, hash or read) and walk time.
+
+Correctness: without .mrfixignore, the pruned inventory must list exactly the
+files `git ls-files --others --exclude-standard` reports, with one walk thread
+and with several. With .mrfixignore, the .mrfixignore'd directory must
+disappear too.
+
+Exit code 1 when the file sets differ from git, when nothing was pruned, or when
+git is not available.
+
+Usage:
+    python benchmarks/bench_ignore_pruning.py [--files 5000] [--venv-files 20000]
+                                              [--repeat 3] [--json OUT]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _mrfix import load_mrfix  # noqa: E402
+from synthetic_repo import generate  # noqa: E402
+
+GITIGNORE = """# Python
+.venv/
+__pycache__/
+*.py[cod]
+# JS
+node_modules/
+.turbo
+.next/
+# Rust
+/target
+# Logs
+*.log
+!keep.log
+# Glob over a directory's children, one child brought back
+vendored/*
+!vendored/keepme/
+# Valid for git (matches nothing), invalid as a Python regex range
+[z-a]
+"""
+NESTED_GITIGNORE = "generated/\n"
+INFO_EXCLUDE = "scratch/\n"
+MRFIXIGNORE = "docs/\n"
+
+
+def write_files(root: Path, rel_dir: str, count: int, size: int = 512, ext: str = ".py"):
+    directory = root / rel_dir
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        (directory / f"file_{i}{ext}").write_bytes(b"x = 1\n" * (size // 6))
+
+
+def build_project(root: Path, files: int, venv_files: int):
+    generate(root, files, seed=0)
+    (root / ".synthetic_manifest.json").unlink(missing_ok=True)
+    subprocess.run(["git", "init", "-q", str(root)], check=True)
+    (root / ".gitignore").write_text(GITIGNORE)
+    (root / ".git" / "info").mkdir(parents=True, exist_ok=True)
+    (root / ".git" / "info" / "exclude").write_text(INFO_EXCLUDE)
+    per_package = 50
+    for package in range(max(1, venv_files // per_package)):
+        write_files(root, f".venv/lib/python3.11/site-packages/pkg{package}", per_package)
+    for package in range(40):
+        write_files(root, f"node_modules/dep{package}/lib", 25, ext=".js")
+    write_files(root, ".turbo/cache", 300, size=4096, ext=".bin")
+    write_files(root, "web/.next/cache/webpack", 300, size=4096, ext=".pack")
+    write_files(root, "target/debug/deps", 400, size=2048, ext=".rlib")
+    write_files(root, "src/generated/proto", 200)
+    (root / "src" / ".gitignore").write_text(NESTED_GITIGNORE)
+    write_files(root, "scratch", 50)
+    for rel in ("", "src", "web/big"):
+        (root / rel / "debug.log").write_text("log\n")
+    (root / "src" / "keep.log").write_text("kept by !keep.log\n")
+    write_files(root, "src/__pycache__", 30, ext=".pyc")
+    write_files(root, "vendored/drop", 20)
+    write_files(root, "vendored/keepme", 5)
+    (root / "vendored" / "top.py").write_text("x = 1\n")
+
+
+def git_visible(root: Path) -> set:
+    output = subprocess.run(["git", "-C", str(root), "ls-files", "--others", "--exclude-standard", "-z"],
+                            check=True, capture_output=True).stdout
+    return {path for path in output.decode("utf-8", "surrogateescape").split("\0") if path}
+
+
+def inventory_files(inventory) -> set:
+    return {entry.path.replace(os.sep, "/") for entry in inventory.iter_files()}
+
+
+def measure(mrfix, root: Path, honor: bool, repeat: int) -> dict:
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        inventory = mrfix.FileInventory(root, workers=1, honor_ignore_files=honor)
+        seconds.append(time.perf_counter() - started)
+    return {
+        "seconds": round(statistics.median(seconds), 3),
+        "directories_scanned": len(inventory.listings),
+        "files_listed": inventory.stats["files"],
+        "mb_listed": round(sum(entry.size for entry in inventory.iter_files()) / 1024 / 1024, 1),
+        "ignored_dirs": inventory.stats["ignored_dirs"],
+        "ignored_files": inventory.stats["ignored_files"],
+        "ignore_files": inventory.stats["ignore_files"],
+        "inventory": inventory,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5000, help="synthetic project files")
+    parser.add_argument("--venv-files", type=int, default=20000, help="files inside .venv")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if shutil.which("git") is None:
+        print("❌ git is required for the correctness check")
+        sys.exit(1)
+    mrfix = load_mrfix()
+    workdir = Path(tempfile.mkdtemp(prefix="mrfix-ignore-"))
+    try:
+        root = workdir / "project"
+        build_project(root, args.files, args.venv_files)
+        rows = {
+            "full": measure(mrfix, root, False, args.repeat),
+            "pruned": measure(mrfix, root, True, args.repeat),
+        }
+        failures = []
+        expected = git_visible(root)
+        listed = inventory_files(rows["pruned"]["inventory"])
+        for label, paths in (("listed but ignored by git", listed - expected),
+                             ("visible to git but pruned", expected - listed)):
+            if paths:
+                failures.append(f"{len(paths)} files {label}: {sorted(paths)[:5]}")
+        threaded = inventory_files(mrfix.FileInventory(root, workers=4))
+        if threaded != listed:
+            failures.append(f"threaded walk: {len(threaded ^ listed)} files differ from the serial walk")
+        (root / ".mrfixignore").write_text(MRFIXIGNORE)
+        with_mrfix = inventory_files(mrfix.FileInventory(root, workers=1))
+        wanted = {path for path in expected if not path.startswith("docs/")} | {".mrfixignore"}
+        if with_mrfix != wanted:
+            failures.append(f".mrfixignore: {len(with_mrfix ^ wanted)} files differ from git minus docs/")
+        if not rows["pruned"]["ignored_dirs"]:
+            failures.append("nothing was pruned")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'mode':<7} {'seconds':>8} {'dirs scanned':>13} {'files':>8} {'MB':>7} "
+          f"{'pruned dirs':>12} {'pruned files':>13}")
+    for mode, row in rows.items():
+        row.pop("inventory")
+        print(f"{mode:<7} {row['seconds']:>8.3f} {row['directories_scanned']:>13} {row['files_listed']:>8} "
+              f"{row['mb_listed']:>7} {row['ignored_dirs']:>12} {row['ignored_files']:>13}")
+    speedup = rows["full"]["seconds"] / max(rows["pruned"]["seconds"], 1e-9)
+    print(f"\npruned walk: {speedup:.1f}x faster, {rows['pruned']['ignore_files']} ignore files compiled")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(dict(rows, failures=failures), indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print(f"✅ same files as `git ls-files --others --exclude-standard` ({len(expected):,}); "
+              f".mrfixignore honored")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
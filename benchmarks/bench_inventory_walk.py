@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Inventory walk benchmark: legacy os.walk + Path.stat vs threaded scandir walker.
+
+Builds deep (long narrow chains) and wide (many sibling directories) synthetic
+trees in a temporary directory and times:
+    • legacy   — os.walk with Path.exists()/Path.stat() per file (the old
+                 scan_project_optimized loop)
+    • serial   — FileInventory with one thread
+    • threads  — FileInventory with --threads workers pulling from one queue
+Every walker's (directory, files) replay is checked against os.walk.
+
+Local disks answer scandir/stat from the page cache, so --latency-ms adds a
+sleep to each os.scandir() call to model NFS/overlay round trips (the sleep
+releases the GIL, just as a blocking network filesystem call does).
+
+Usage:
+    python benchmarks/bench_inventory_walk.py [--files 20000] [--threads 1 4 8]
+                                              [--latency-ms 0 1] [--json OUT]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _mrfix import load_mrfix  # noqa: E402
+
+
+def build_tree(root: Path, shape: str, file_count: int):
+    """deep: chains of 40 nested dirs, 5 files each; wide: flat dirs of 5 files"""
+    files_per_dir = 5
+    dir_count = max(1, file_count // files_per_dir)
+    if shape == "deep":
+        chain_length = 40
+        paths = []
+        for chain in range(max(1, dir_count // chain_length)):
+            current = root / f"chain{chain}"
+            for level in range(chain_length):
+                current = current / f"level{level}"
+                paths.append(current)
+    else:
+        paths = [root / f"group{i // 100}" / f"dir{i}" for i in range(dir_count)]
+    for directory in paths:
+        directory.mkdir(parents=True, exist_ok=True)
+        for k in range(files_per_dir):
+            (directory / f"file{k}.py").write_text("x = 1\n")
+
+
+def legacy_walk(root: Path):
+    """os.walk + Path.exists()/stat() per file, as scan_project_optimized used to"""
+    listing = []
+    total_size = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in filenames:
+            file_path = Path(dirpath) / name
+            if file_path.exists():
+                total_size += file_path.stat().st_size
+        listing.append((os.path.relpath(dirpath, root), sorted(filenames)))
+    return sorted(listing), total_size
+
+
+def inventory_walk(mrfix, root: Path, workers: int):
+    inventory = mrfix.FileInventory(root, workers=workers, honor_ignore_files=False)  # Same entries as os.walk
+    listing = []
+    total_size = 0
+    for rel_dir, dirs, files in inventory.walk():
+        total_size += sum(entry.size for entry in files)
+        listing.append((rel_dir or ".", sorted(entry.name for entry in files)))
+    return sorted(listing), total_size
+
+
+def with_latency(latency_ms: float):
+    """Wrap os.scandir with a fixed per-call delay (None restores it)"""
+    original = getattr(with_latency, "original", os.scandir)
+    with_latency.original = original
+    if not latency_ms:
+        os.scandir = original
+        return
+
+    def slow_scandir(path="."):
+        time.sleep(latency_ms / 1000.0)
+        return original(path)
+
+    os.scandir = slow_scandir
+
+
+def run(file_count, thread_counts, latencies):
+    mrfix = load_mrfix()
+    rows = []
+    for shape in ("deep", "wide"):
+        workdir = Path(tempfile.mkdtemp(prefix=f"mrfix-walk-{shape}-"))
+        try:
+            build_tree(workdir, shape, file_count)
+            for latency in latencies:
+                with_latency(latency)
+                try:
+                    start = time.perf_counter()
+                    expected = legacy_walk(workdir)
+                    legacy = time.perf_counter() - start
+                    row = {
+                        "shape": shape,
+                        "files": file_count,
+                        "latency_ms": latency,
+                        "legacy_seconds": round(legacy, 4),
+                        "threads": {},
+                    }
+                    for workers in thread_counts:
+                        start = time.perf_counter()
+                        result = inventory_walk(mrfix, workdir, workers)
+                        seconds = time.perf_counter() - start
+                        row["threads"][workers] = {
+                            "seconds": round(seconds, 4),
+                            "identical": result == expected,
+                        }
+                    rows.append(row)
+                finally:
+                    with_latency(0)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 1],
+                        help="simulated delay per os.scandir() call")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run(args.files, args.threads, args.latency_ms)
+    header = f"{'shape':>6} {'latency':>8} {'legacy (s)':>11}"
+    for workers in args.threads:
+        header += f" {f'{workers} thr (s)':>11}"
+    print(header + "  identical")
+    for row in rows:
+        line = f"{row['shape']:>6} {row['latency_ms']:>6}ms {row['legacy_seconds']:>11.3f}"
+        for workers in args.threads:
+            line += f" {row['threads'][workers]['seconds']:>11.3f}"
+        identical = all(t["identical"] for t in row["threads"].values())
+        print(line + f"  {identical}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
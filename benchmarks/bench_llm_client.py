@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+LLM client benchmark: per-call credentials + fresh client vs shared LLMClient.
+
+Runs offline against a local stub of POST /v1/chat/completions with a fixed
+per-request latency.
+    • legacy      — what each LLM stage did before: spawn a credential lookup
+                    (a python subprocess standing in for `doppler secrets get`),
+                    open a new connection, one call after another
+    • pooled      — LLMClient: credentials resolved once, keep-alive connections,
+                    still one call after another
+    • concurrent  — LLMClient.gather(): the same calls in flight together,
+                    bounded by max_concurrency
+Two workloads: the three stage calls (purpose_layer1, gpt5, action_plan) and a
+batch of --batch chunk summaries (map-reduce compaction).
+
+It also checks client behavior against the stub and exits 1 on any failure:
+same answers in every mode, in-flight requests never above max_concurrency,
+429s retried, 400 not retried, per-call timeout enforced, one connection and one
+credential lookup for sequential pooled calls.
+
+Usage:
+    python benchmarks/bench_llm_client.py [--latency 0.3] [--batch 12]
+                                          [--concurrency 4] [--json OUT]
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _mrfix import load_mrfix  # noqa: E402
+
+STAGE_CALLS = ("purpose_layer1", "gpt5", "action_plan")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    OpenAI-shaped chat completions. The answer is server.respond(prompt) when set,
+    else a hash of the prompt. Latency is server.latency plus
+    server.latency_per_1k_tokens for every 1000 prompt tokens (chars / 4).
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        stub = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        prompt_tokens = sum(len(message["content"]) for message in body["messages"]) // 4
+        with stub.lock:
+            stub.requests += 1
+            stub.prompts.append(prompt)
+            stub.max_prompt_tokens = max(stub.max_prompt_tokens, prompt_tokens)
+            stub.in_flight += 1
+            stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+            fail = stub.fail_next > 0
+            stub.fail_next -= fail
+        try:
+            time.sleep(stub.latency * (20 if "STUB_HANG" in prompt else 1)
+                       + stub.latency_per_1k_tokens * prompt_tokens / 1000)
+            if fail or "STUB_BAD_REQUEST" in prompt:
+                status = 429 if fail else 400
+                payload = {"error": {"message": "rate limited" if fail else "bad request"}}
+            else:
+                status = 200
+                if stub.respond is not None:
+                    content = stub.respond(prompt)
+                else:
+                    content = json.dumps({"answer": hashlib.sha256(prompt.encode()).hexdigest()[:16]})
+                payload = {"choices": [{"message": {"role": "assistant", "content": content}}]}
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client timed out and closed the socket
+        finally:
+            with stub.lock:
+                stub.in_flight -= 1
+
+
+def start_stub(latency: float, latency_per_1k_tokens: float = 0.0, respond=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.latency = latency
+    server.latency_per_1k_tokens = latency_per_1k_tokens
+    server.respond = respond
+    server.fail_next = 0
+    server.reset = lambda: server.__dict__.update(requests=0, connections=0, in_flight=0, max_in_flight=0,
+                                                  max_prompt_tokens=0, prompts=[])
+    server.reset()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_request(label: str, index: int = 0, marker: str = "") -> dict:
+    return {
+        "model": "gpt-4o",
+        "messages": [
+            {"role": "system", "content": "Respond ONLY with valid JSON."},
+            {"role": "user", "content": f"{label} #{index} {marker}"},
+        ],
+        "temperature": 0.3,
+        "max_tokens": 800,
+    }
+
+
+def legacy_call(port: int, request: dict) -> str:
+    """Old per-stage path: credential subprocess + new connection per call"""
+    api_key = subprocess.run(
+        [sys.executable, "-c", "print('sk-stub')"], capture_output=True, text=True
+    ).stdout.strip()
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        connection.request("POST", "/v1/chat/completions", body=json.dumps(request), headers={
+            "Authorization": f"Bearer {api_key}", "Content-Type": "application/json",
+        })
+        response = connection.getresponse()
+        return json.loads(response.read())["choices"][0]["message"]["content"]
+    finally:
+        connection.close()
+
+
+def timed(stub, func):
+    stub.reset()
+    started = time.perf_counter()
+    answers = func()
+    return answers, {
+        "seconds": round(time.perf_counter() - started, 3),
+        "requests": stub.requests,
+        "connections": stub.connections,
+        "max_in_flight": stub.max_in_flight,
+    }
+
+
+def run_workload(mrfix, stub, base_url: str, requests: dict, concurrency: int) -> dict:
+    port = stub.server_address[1]
+    rows = {}
+    legacy, rows["legacy"] = timed(stub, lambda: {k: legacy_call(port, r) for k, r in requests.items()})
+    client = mrfix.LLMClient(base_url=base_url, max_concurrency=concurrency)
+    pooled, rows["pooled"] = timed(stub, lambda: {k: client.complete(r) for k, r in requests.items()})
+    rows["pooled"]["credential_lookups"] = client.stats["credential_lookups"]
+    client = mrfix.LLMClient(base_url=base_url, max_concurrency=concurrency)
+    concurrent, rows["concurrent"] = timed(stub, lambda: client.gather(requests))
+    rows["same_answers"] = legacy == pooled == concurrent
+    return rows
+
+
+def behavior_checks(mrfix, stub, base_url: str, concurrency: int) -> list:
+    failures = []
+    LLMError = mrfix.LLMError
+
+    client = mrfix.LLMClient(base_url=base_url, max_concurrency=concurrency, backoff=0.05)
+    stub.reset()
+    stub.fail_next = 2
+    try:
+        client.complete(make_request("retry"))
+        if client.stats["retries"] != 2 or stub.requests != 3:
+            failures.append(f"429 retry: {client.stats['retries']} retries / {stub.requests} requests (want 2 / 3)")
+    except LLMError as e:
+        failures.append(f"429 retry: gave up ({e})")
+
+    stub.reset()
+    try:
+        client.complete(make_request("bad", marker="STUB_BAD_REQUEST"))
+        failures.append("400: expected LLMError")
+    except LLMError as e:
+        if e.status != 400 or stub.requests != 1:
+            failures.append(f"400: status {e.status} after {stub.requests} requests (want 400 after 1)")
+
+    client = mrfix.LLMClient(base_url=base_url, timeout=stub.latency * 2, retries=1, backoff=0.05)
+    stub.reset()
+    started = time.perf_counter()
+    try:
+        client.complete(make_request("hang", marker="STUB_HANG"))
+        failures.append("timeout: expected LLMError")
+    except LLMError:
+        elapsed = time.perf_counter() - started
+        if elapsed > stub.latency * 2 * 2 + 1.0:
+            failures.append(f"timeout: took {elapsed:.2f}s for 2 attempts of {stub.latency * 2:.2f}s")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.3, help="stub seconds per request")
+    parser.add_argument("--batch", type=int, default=12, help="chunk summaries in the batch workload")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    os.environ["OPENAI_API_KEY"] = "sk-stub"  # LLMClient resolves it once per client
+    mrfix = load_mrfix()
+    stub = start_stub(args.latency)
+    base_url = f"http://127.0.0.1:{stub.server_address[1]}/v1"
+    workloads = {
+        "stage_calls": {label: make_request(label) for label in STAGE_CALLS},
+        "chunk_batch": {f"chunk{i}": make_request("chunk", i) for i in range(args.batch)},
+    }
+    results = {name: run_workload(mrfix, stub, base_url, requests, args.concurrency)
+               for name, requests in workloads.items()}
+
+    print(f"{'workload':<12} {'mode':<11} {'seconds':>8} {'requests':>9} {'connections':>12} {'in flight':>10}")
+    failures = []
+    for name, rows in results.items():
+        for mode in ("legacy", "pooled", "concurrent"):
+            row = rows[mode]
+            print(f"{name:<12} {mode:<11} {row['seconds']:>8.3f} {row['requests']:>9} "
+                  f"{row['connections']:>12} {row['max_in_flight']:>10}")
+        if not rows["same_answers"]:
+            failures.append(f"{name}: answers differ between modes")
+        if rows["pooled"]["connections"] != 1 or rows["pooled"]["credential_lookups"] != 1:
+            failures.append(f"{name}: pooled used {rows['pooled']['connections']} connections / "
+                            f"{rows['pooled']['credential_lookups']} credential lookups (want 1 / 1)")
+        if rows["concurrent"]["max_in_flight"] > args.concurrency:
+            failures.append(f"{name}: {rows['concurrent']['max_in_flight']} in flight > {args.concurrency}")
+        speedup = rows["legacy"]["seconds"] / max(rows["concurrent"]["seconds"], 1e-9)
+        print(f"{'':<12} concurrent vs legacy: {speedup:.1f}x")
+    failures += behavior_checks(mrfix, stub, base_url, args.concurrency)
+    stub.shutdown()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(dict(results, failures=failures), indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("\n✅ same answers in every mode; bounded concurrency, retries, timeouts and pooling behave")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Prompt compaction benchmark: Layer 3 + GPT-5 prompt size and LLM time vs tree size.
+
+Builds synthetic analysis state for 1k…1M-file projects (directory purposes
+with nested unknown subtrees, work sessions with repeated sample paths, long
+file-type and purpose distributions). It then runs the real
+discover_emergent_purpose_layer3() and analyze_with_gpt5() against a local
+stub of the chat completions API. Stub latency grows with prompt size, like
+the real API.
+    • raw tokens   — the full directory listing + distributions before compaction
+    • max prompt   — largest request actually sent (system + user message)
+    • requests     — LLM calls (map-reduce chunks go out in one parallel round)
+    • llm seconds  — wall time of the two stages
+    • resolved     — unknown directories given a purpose by Layer 3
+
+Exit code 1 when any prompt exceeds the budget plus the fixed instructions, when
+the request count or LLM time grows with tree size, or when the same analysis
+produces different prompts on a second run (which would defeat LLMResponseCache).
+
+Usage:
+    python benchmarks/bench_prompt_compaction.py [--sizes 1000 10000 100000 1000000]
+                                                 [--budget 3000] [--json OUT]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _mrfix import load_mrfix  # noqa: E402
+from bench_llm_client import start_stub  # noqa: E402
+
+FILES_PER_DIR = 20
+INSTRUCTION_TOKENS = 1500  # Fixed prompt text around the compacted data (GPT-5 system prompt)
+AREAS = ("src", "tests", "docs", "packages", "tools", "vendor", "data", "legacy", "experiments", "infra")
+
+
+def synthetic_state(files: int, seed: int = 7) -> dict:
+    """Analysis attributes for a project of `files` files (deterministic per seed)"""
+    rng = random.Random(seed)
+    purposes = {".": {"purpose": "root", "files": 5, "subdirs": len(AREAS), "priority": "medium"}}
+    frontier = list(AREAS)
+    for area in AREAS:  # Root folders are known from Layer 1, like a real run
+        purposes[area] = {"purpose": "mixed", "files": 3, "subdirs": 0, "priority": "medium"}
+    while len(purposes) < max(len(AREAS) + 1, files // FILES_PER_DIR):
+        parent = frontier[rng.randrange(len(frontier))]
+        child = f"{parent}/{rng.choice(('core', 'util', 'mod', 'impl', 'gen', 'x'))}{rng.randrange(10**6)}"
+        if child in purposes or child.count("/") > 7:
+            continue
+        known = rng.random() < 0.4
+        purposes[child] = {"purpose": rng.choice(("source_code", "testing", "assets")) if known else "unknown",
+                           "files": rng.randrange(1, 2 * FILES_PER_DIR), "subdirs": 0,
+                           "priority": "high" if known else "medium"}
+        purposes[parent]["subdirs"] += 1
+        frontier.append(child)
+    distribution = Counter(info["purpose"] for info in purposes.values())
+    distribution.update({f"layer3 purpose {i}": 1 for i in range(len(purposes) // 50)})
+    paths = list(purposes)
+    sessions = [{
+        "start": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00",
+        "duration_minutes": 30 + i, "file_count": 10 + i,
+        "sample_files": [f"{paths[(i + j) % 7]}/file{j}.py" for j in range(5)],  # Repeats across sessions
+    } for i in range(20)]
+    return {
+        "initial_purpose_map": {"root_purpose": "Synthetic monorepo",
+                                "folder_purposes": {area: "mixed" for area in AREAS}},
+        "directory_purposes": {"purposes": purposes, "purpose_distribution": distribution,
+                               "high_priority": [{"directory": "src", "purpose": "source_code", "files": 3}]},
+        "surface_scan": {"summary": {"total_files": files, "total_directories": len(purposes),
+                                     "total_size": files * 4096,
+                                     "file_types": {f".e{i}": files // (i + 1) for i in range(200)}}},
+        "tech_stack": {"language_distribution": {"python": files // 2, "typescript": files // 3}},
+        "temporal_analysis": {"project_age_days": 700, "work_sessions": sessions},
+        "work_sessions": sessions,
+        "monthly_activity": {f"2025-{m:02d}": m * 10 for m in range(1, 13)},
+        "duplicate_analysis": {"exact_duplicates": []},
+        "empty_directories": [],
+        "consolidation_opportunities": [],
+        "naming_analysis": {"conventions": {"snake_case": 10}},
+    }
+
+
+def respond(prompt: str) -> str:
+    """Stub answers: purposes for every listed path, areas for listings, text for GPT-5"""
+    paths = re.findall(r'"path":\s*"([^"]+)"', prompt)
+    if "UNKNOWN DIRECTORIES TO CLASSIFY" in prompt:
+        return json.dumps({"hierarchical_purposes": {path: "stub purpose" for path in paths},
+                           "reasoning_chain": ["stub"], "confidence": 0.9})
+    if "functional AREAS" in prompt:
+        return json.dumps({"areas": [{"path": path, "summary": "stub area", "files": 1} for path in paths[:8]]})
+    return "Stub GPT-5 insights."
+
+
+def run_size(mrfix, stub, project: Path, files: int) -> dict:
+    state = synthetic_state(files)
+    purposes = state["directory_purposes"]["purposes"]
+    unknown = sum(1 for info in purposes.values() if info["purpose"] == "unknown")
+    raw_tokens = mrfix.PromptCompactor.tokens({
+        "directories": [{"path": path, "purpose": info["purpose"], "files": info["files"]}
+                        for path, info in purposes.items()],
+        "purpose_distribution": state["directory_purposes"]["purpose_distribution"],
+        "file_types": state["surface_scan"]["summary"]["file_types"],
+        "work_sessions": state["work_sessions"],
+    })
+    analyzer = mrfix.UltraThinkMermaidMaximizer(str(project))
+    analyzer.__dict__.update(state)
+    mrfix.PromptCompactor.shared().reset_stats()
+    stub.reset()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Analyzer progress lines
+        layer3 = analyzer.discover_emergent_purpose_layer3()
+        analyzer.analyze_with_gpt5()
+    seconds = time.perf_counter() - started
+    resolved = sum(1 for info in purposes.values() if info.get("layer") == "layer3")
+    return {
+        "files": files,
+        "dirs": len(purposes),
+        "unknown_dirs": unknown,
+        "raw_tokens": raw_tokens,
+        "max_prompt_tokens": stub.max_prompt_tokens,
+        "requests": stub.requests,
+        "llm_seconds": round(seconds, 3),
+        "resolved": resolved,
+        "layer3_confidence": layer3.get("confidence"),
+        "compaction": mrfix.PromptCompactor.shared().stats(),
+        "prompts": sorted(stub.prompts),  # Chunks arrive in any order
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--budget", type=int, default=3000, help="--prompt-budget TOKENS")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per request")
+    parser.add_argument("--latency-per-1k", type=float, default=0.1, help="stub seconds per 1000 prompt tokens")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+    stub = start_stub(args.latency, args.latency_per_1k, respond)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{stub.server_address[1]}/v1"
+    mrfix = load_mrfix()
+    mrfix.LLMResponseCache.enabled_by_default = False  # Every size pays for its calls
+    mrfix.PromptCompactor.budget_tokens = args.budget
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="mrfix-compaction-") as project:
+        for files in args.sizes:
+            row = run_size(mrfix, stub, Path(project), files)
+            rerun = run_size(mrfix, stub, Path(project), files)
+            row["deterministic"] = row["prompts"] == rerun["prompts"]
+            results.append(row)
+    stub.shutdown()
+
+    print(f"{'files':>9} {'dirs':>7} {'unknown':>8} {'raw tokens':>11} {'max prompt':>11} "
+          f"{'requests':>9} {'llm s':>7} {'resolved':>9}")
+    for row in results:
+        print(f"{row['files']:>9} {row['dirs']:>7} {row['unknown_dirs']:>8} {row['raw_tokens']:>11} "
+              f"{row['max_prompt_tokens']:>11} {row['requests']:>9} {row['llm_seconds']:>7.2f} {row['resolved']:>9}")
+
+    failures = []
+    ceiling = args.budget + INSTRUCTION_TOKENS
+    smallest = results[0]
+    for row in results:
+        if row["max_prompt_tokens"] > ceiling:
+            failures.append(f"{row['files']} files: prompt of {row['max_prompt_tokens']} tokens > {ceiling}")
+        if not row["deterministic"]:
+            failures.append(f"{row['files']} files: prompts differ between identical runs")
+    largest = results[-1]
+    if largest["requests"] > 2 * mrfix.PromptCompactor.max_chunks + 1:
+        failures.append(f"{largest['files']} files: {largest['requests']} requests")
+    if largest["llm_seconds"] > 3 * max(smallest["llm_seconds"], args.latency):
+        failures.append(f"LLM time grew from {smallest['llm_seconds']}s to {largest['llm_seconds']}s")
+
+    if args.json:
+        for row in results:
+            row.pop("prompts")
+        Path(args.json).write_text(json.dumps(dict(results=results, failures=failures), indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print(f"\n✅ prompts within {args.budget} + {INSTRUCTION_TOKENS} tokens, deterministic, "
+              f"and LLM time flat from {smallest['files']} to {largest['files']} files")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Similar filename benchmark: all-pairs SequenceMatcher vs prefix-filtered join.
+
+Generates realistic lowercase filenames (module/component names with version,
+copy and typo variants) and times find_similar_name_pairs. The all-pairs loop
+from the old detect_duplicates is quadratic, so it is run to completion only
+up to --verify-limit names (and its output compared pair-for-pair); above that
+it is timed on a sample of outer-loop rows and extrapolated.
+
+Usage:
+    python benchmarks/bench_similar_names.py [--sizes 1000 10000 100000]
+                                             [--legacy-sample 20] [--json OUT]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from _mrfix import load_mrfix  # noqa: E402
+
+WORDS = """
+user auth service controller model view config utils helper manager handler router
+client server cache index api data schema test spec main app component button modal
+table form store reducer hook context provider account address admin alert analytics
+archive asset audit avatar backup badge banner billing blog bookmark breadcrumb bridge
+broker browser buffer builder bundle calendar camera canvas card cart catalog category
+channel chart chat checkbox checkout cluster collection command comment compiler
+connector console contact container content cookie core counter coupon course credit
+cron customer dashboard database date debug deploy device dialog diff directory
+document domain download draft driver editor email embed encoder engine entity error
+event export factory feature feed field file filter flag footer format gallery gateway
+generator graph grid group guard header history home icon image importer inbox input
+invoice item job kernel label layout ledger license link list loader locale logger
+login map markdown media menu message metric middleware migration mixin monitor
+network node notification order page panel parser payment permission pipeline plugin
+policy popup post preview price printer product profile project proxy query queue
+rating record registry report request resolver resource response review role route
+runner sandbox scheduler search section security session setting share shell sidebar
+signup sitemap slider snapshot socket source stats status storage stream style
+subscription summary support sync tag task template theme thread ticket timeline
+token toolbar tooltip tracker transaction transform tree upload validator vendor
+version video wallet webhook widget worker workflow workspace
+""".split()
+EXTENSIONS = [".py", ".ts", ".tsx", ".js", ".md", ".json", ".css", ".yaml"]
+VARIANTS = ["", "_v2", "_old", "_new", "_copy", "_backup", " (1)", "_final", "2"]
+
+
+def synthetic_names(count: int, seed: int = 7):
+    """Unique lowercase names with a realistic share of near-duplicates"""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        parts = rng.sample(WORDS, rng.randint(1, 3))
+        stem = rng.choice(["_", "-", ""]).join(parts)
+        if rng.random() < 0.5:
+            stem += str(rng.randrange(1000))
+        if rng.random() < 0.15:
+            stem += rng.choice(VARIANTS)
+        if rng.random() < 0.05 and len(stem) > 3:
+            pos = rng.randrange(len(stem))
+            stem = stem[:pos] + rng.choice("abcdefghijklmnopqrstuvwxyz") + stem[pos + 1 :]
+        names.add(stem + rng.choice(EXTENSIONS))
+    # Sorted before shuffling: set order depends on hash randomization, and
+    # SequenceMatcher.ratio() is not symmetric, so pair order must be reproducible
+    ordered = sorted(names)
+    rng.shuffle(ordered)
+    return ordered
+
+
+def legacy_similar_pairs(names, rows=None):
+    """The pre-index all-pairs loop (optionally limited to the first `rows` rows)"""
+    pairs = []
+    for i, name1 in enumerate(names[:rows] if rows else names):
+        for j in range(i + 1, len(names)):
+            similarity = SequenceMatcher(None, name1, names[j]).ratio()
+            if similarity > 0.85 and similarity < 1.0:
+                pairs.append((i, j, similarity))
+    return pairs
+
+
+def run(sizes, legacy_sample, verify_limit):
+    mrfix = load_mrfix()
+    rows = []
+    for size in sizes:
+        names = synthetic_names(size)
+
+        start = time.perf_counter()
+        pairs = mrfix.find_similar_name_pairs(names, 0.85)
+        indexed = time.perf_counter() - start
+
+        if size <= verify_limit:
+            start = time.perf_counter()
+            expected = legacy_similar_pairs(names)
+            legacy = time.perf_counter() - start
+            verified = expected == pairs
+        else:
+            # Row i costs (size - i - 1) comparisons: scale by the sampled share
+            sample_rows = min(legacy_sample, size)
+            start = time.perf_counter()
+            legacy_similar_pairs(names, sample_rows)
+            sampled = time.perf_counter() - start
+            sampled_comparisons = sum(size - i - 1 for i in range(sample_rows))
+            legacy = sampled * (size * (size - 1) / 2) / max(1, sampled_comparisons)
+            verified = None
+
+        rows.append(
+            {
+                "names": size,
+                "pairs": len(pairs),
+                "indexed_seconds": round(indexed, 4),
+                "legacy_seconds": round(legacy, 2),
+                "legacy_estimated": size > verify_limit,
+                "identical": verified,
+                "speedup": round(legacy / indexed, 1) if indexed else None,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--legacy-sample", type=int, default=20,
+                        help="outer-loop rows timed with the legacy loop before extrapolating")
+    parser.add_argument("--verify-limit", type=int, default=2000,
+                        help="run the legacy loop to completion (and compare) up to this size")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.legacy_sample, args.verify_limit)
+    print(f"{'names':>8} {'pairs':>7} {'indexed (s)':>12} {'legacy (s)':>12} {'speedup':>9}  identical")
+    for row in rows:
+        legacy = f"{row['legacy_seconds']:.1f}" + ("*" if row["legacy_estimated"] else "")
+        identical = "n/a" if row["identical"] is None else str(row["identical"])
+        print(
+            f"{row['names']:>8,} {row['pairs']:>7,} {row['indexed_seconds']:>12.3f} "
+            f"{legacy:>12} {row['speedup']:>8}x  {identical}"
+        )
+    print("* extrapolated from a sample of the all-pairs loop")
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time from process start to the first filesystem access.
+
+Each run starts a fresh interpreter under `-X importtime`. An audit hook
+(sys.addaudithook) fires on the first scandir/listdir/open/mkdir/sqlite
+connect inside the project directory, reports the elapsed wall time, and exits
+the child at that point. So the number covers interpreter start, the analyzer
+import, and everything analyze_and_heal does before touching the tree.
+    • cli     — python3 mr-fix-cli.py PROJECT (what the MCP server runs)
+    • script  — python3 mr-fix-my-project-please.py PROJECT (recompiled every call)
+The importtime lines printed before that moment show which modules were paid
+for. Heavy or optional modules listed in DEFERRED must not appear there.
+
+Exit code 1 when the cli median exceeds --budget-ms or a deferred module was
+imported before the first filesystem access.
+
+Bytecode caching is on for the children (PYTHONDONTWRITEBYTECODE is removed
+from their environment), as on a default install. One warm-up run fills
+__pycache__ before timing.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 150] [--json OUT]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+ENTRIES = {
+    "cli": REPO / "mr-fix-cli.py",
+    "script": REPO / "mr-fix-my-project-please.py",
+}
+DEFERRED = ("numpy", "psutil", "xxhash", "openai", "subprocess", "difflib", "asyncio", "http.client")
+MARKER = "MRFIX_FIRST_FS"
+FS_EVENTS = ("os.scandir", "os.listdir", "open", "os.mkdir", "sqlite3.connect")
+
+# Runs inside the child: install the hook, then execute the entry as __main__
+BOOTSTRAP = f"""
+import os, sys, time
+root = os.path.realpath(sys.argv[1]) + os.sep
+events = {FS_EVENTS!r}
+
+def first_access(event, args):
+    if event not in events or not args:
+        return
+    try:
+        path = os.path.realpath(os.fsdecode(args[0]))
+    except (TypeError, ValueError):
+        return
+    if (path + os.sep).startswith(root):
+        sys.stderr.write(f"{MARKER} {{time.time()}} {{event}} {{path}}\\n")
+        sys.stderr.flush()
+        os._exit(0)
+
+sys.addaudithook(first_access)
+entry = sys.argv[2]
+sys.argv = [entry] + sys.argv[1:2] + sys.argv[3:]
+with open(entry, "rb") as f:
+    code = compile(f.read(), entry, "exec")  # What `python3 ENTRY` does for __main__
+exec(code, {{"__name__": "__main__", "__file__": entry, "__builtins__": __builtins__}})
+"""
+
+
+def build_project(root: Path):
+    """Tiny tree: startup cost must not depend on project size"""
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("import os\n\n\ndef main():\n    return os.sep\n")
+    (root / "README.md").write_text("# demo\n")
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def parse_importtime(stderr: str):
+    """[(module, self_us, cumulative_us, depth)] in import order"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # Header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def run_once(entry: Path, project: Path, args: list, workdir: Path) -> dict:
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOTSTRAP, str(project), str(entry)] + args,
+        cwd=workdir, env=child_env(), capture_output=True, text=True, timeout=300,
+    )
+    marker = next((line for line in proc.stderr.splitlines() if line.startswith(MARKER)), None)
+    if marker is None:
+        raise RuntimeError(f"{entry.name}: no filesystem access seen (exit {proc.returncode})\n"
+                           + proc.stderr[-2000:])
+    _, stamp, event, path = marker.split(" ", 3)
+    imports = parse_importtime(proc.stderr)
+    return {
+        "ms": (float(stamp) - started) * 1000,
+        "event": event,
+        "path": path,
+        "imports": imports,
+    }
+
+
+def measure(repeat: int, args: list):
+    workdir = Path(tempfile.mkdtemp(prefix="mrfix-startup-"))
+    try:
+        project = workdir / "project"
+        build_project(project)
+        results = {}
+        for label, entry in ENTRIES.items():
+            run_once(entry, project, args, workdir)  # Warm-up (fills __pycache__)
+            runs = [run_once(entry, project, args, workdir) for _ in range(repeat)]
+            imported = {name for name, *_ in runs[-1]["imports"]}
+            top = sorted((row for row in runs[-1]["imports"] if row[3] == 0),
+                         key=lambda row: row[2], reverse=True)[:8]
+            results[label] = {
+                "median_ms": round(statistics.median(run["ms"] for run in runs), 1),
+                "min_ms": round(min(run["ms"] for run in runs), 1),
+                "first_access": f"{runs[-1]['event']} {runs[-1]['path']}",
+                "modules_imported": len(imported),
+                "deferred_imported": sorted(name for name in DEFERRED if name in imported),
+                "top_imports_ms": [(name, round(cumulative / 1000, 1)) for name, _, cumulative, _ in top],
+            }
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="cli median allowed until the first filesystem access")
+    parser.add_argument("--args", nargs=argparse.REMAINDER, default=["--format", "json"],
+                        help="analyzer flags after PROJECT (default: --format json)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = measure(args.repeat, args.args)
+    print(f"{'entry':>7} {'median (ms)':>12} {'min (ms)':>9} {'modules':>8}  first access")
+    for label, row in results.items():
+        print(f"{label:>7} {row['median_ms']:>12.1f} {row['min_ms']:>9.1f} "
+              f"{row['modules_imported']:>8}  {row['first_access']}")
+    print("\nslowest top-level imports before first access (cli, cumulative ms):")
+    for name, ms in results["cli"]["top_imports_ms"]:
+        print(f"  {name:<28} {ms:>6.1f}")
+
+    failures = []
+    cli = results["cli"]
+    if cli["median_ms"] > args.budget_ms:
+        failures.append(f"cli startup {cli['median_ms']:.1f} ms > budget {args.budget_ms:.0f} ms")
+    for label, row in results.items():
+        if row["deferred_imported"]:
+            failures.append(f"{label} imported deferred modules: {', '.join(row['deferred_imported'])}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(dict(results, budget_ms=args.budget_ms,
+                                                   failures=failures), indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print(f"\n✅ cli within {args.budget_ms:.0f} ms budget; no deferred module imported early")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Stage benchmark suite: time + peak memory per analyzer stage, with regression checks.
+
+Commands:
+    generate  build the deterministic synthetic trees (see synthetic_repo.py)
+    run       time each stage on each tree size and write a JSON baseline
+    compare   diff two baselines; exit 1 when any stage regressed past --threshold
+
+Every (size, stage) measurement runs in a fresh subprocess so peak RSS is the
+stage's own. Prerequisites a stage normally receives from the pipeline (the
+shared FileInventory, the dependency analysis feeding the HTML report) are
+built before the clock starts; the persistent analysis cache is disabled so
+every run measures cold compute.
+
+Usage:
+    python benchmarks/run_benchmarks.py generate --sizes 1000 10000 [--workdir DIR]
+    python benchmarks/run_benchmarks.py run --sizes 1000 10000 [--stages ...] [--repeat 3]
+                                            [--out benchmarks/results/baseline.json]
+    python benchmarks/run_benchmarks.py compare BASE.json NEW.json [--threshold 0.15]
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+from _mrfix import SCRIPT_PATH, load_mrfix  # noqa: E402
+from synthetic_repo import generate  # noqa: E402
+
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "mrfix-bench"
+DEFAULT_SIZES = [1000, 10000]
+ALL_SIZES = [1000, 10000, 100000, 1000000]
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ STAGES - setup (untimed) returns the callable that is timed                        ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+def _analyzers(mrfix, root):
+    """MrFixMyProjectPlease plus an UltraThinkMermaidMaximizer built the way the analyzer builds it"""
+    fixer = mrfix.MrFixMyProjectPlease(str(root))
+    return fixer, mrfix.UltraThinkMermaidMaximizer(fixer.project_path)
+
+
+def _shared_inventory(mrfix, root):
+    return mrfix.FileInventory.shared(Path(root).resolve())
+
+
+def stage_inventory(mrfix, root):
+    return lambda: mrfix.FileInventory(Path(root).resolve())
+
+
+def stage_surface_scan(mrfix, root):
+    _, ultra = _analyzers(mrfix, root)
+    return ultra.perform_optimized_surface_scan
+
+
+def stage_detect_duplicates(mrfix, root):
+    _, ultra = _analyzers(mrfix, root)
+    _shared_inventory(mrfix, root)
+    return ultra.detect_duplicates
+
+
+def stage_analyze_temporal_evolution(mrfix, root):
+    _, ultra = _analyzers(mrfix, root)
+    _shared_inventory(mrfix, root)
+    return ultra.analyze_temporal_evolution
+
+
+def stage_analyze_naming_patterns(mrfix, root):
+    _, ultra = _analyzers(mrfix, root)
+    _shared_inventory(mrfix, root)
+    return ultra.analyze_naming_patterns
+
+
+def stage_generate_dependency_analysis(mrfix, root):
+    fixer, _ = _analyzers(mrfix, root)
+    _shared_inventory(mrfix, root)
+    return fixer.generate_dependency_analysis
+
+
+def stage_generate_html_report(mrfix, root):
+    fixer, ultra = _analyzers(mrfix, root)
+    _shared_inventory(mrfix, root)
+    dependency_analysis = fixer.generate_dependency_analysis()
+    results = {
+        "project_name": Path(root).name,
+        "total_files": dependency_analysis.get("statistics", {}).get("total_files", 0),
+        "ultrathink_analysis": dependency_analysis,
+        "duplicate_analysis": ultra.detect_duplicates(),
+        "temporal_analysis": ultra.analyze_temporal_evolution(),
+        "score": 80,
+    }
+
+    def render():
+        results["dependency_map_html"] = fixer._generate_dependency_map_html(dependency_analysis)
+        return ultra.generate_html_report(results)
+
+    return render
+
+
+def stage_analyze_and_heal(mrfix, root):
+    fixer, _ = _analyzers(mrfix, root)
+    os.chdir(tempfile.mkdtemp(prefix="mrfix-bench-out-"))  # The report lands in cwd
+    return fixer.analyze_and_heal
+
+
+STAGES = {
+    "inventory": stage_inventory,
+    "surface_scan": stage_surface_scan,
+    "detect_duplicates": stage_detect_duplicates,
+    "analyze_temporal_evolution": stage_analyze_temporal_evolution,
+    "analyze_naming_patterns": stage_analyze_naming_patterns,
+    "generate_dependency_analysis": stage_generate_dependency_analysis,
+    "generate_html_report": stage_generate_html_report,
+    "analyze_and_heal": stage_analyze_and_heal,
+}
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ PEAK MEMORY - VmHWM reset after setup (Linux), ru_maxrss otherwise                 ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+def measure_stage(stage: str, root: str) -> dict:
+    """Runs inside the worker subprocess"""
+    mrfix = load_mrfix()
+    mrfix.AnalysisCache.enabled_by_default = False
+    with contextlib.redirect_stdout(sys.stderr):
+        func = STAGES[stage](mrfix, root)
+        peak_is_stage_only = _reset_peak_rss()
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+    peak = _peak_rss_mb()
+    return {
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+        "peak_includes_setup": not peak_is_stage_only,
+    }
+
+
+def run_stage_subprocess(stage: str, root: Path, timeout: float, verbose: bool) -> dict:
+    command = [sys.executable, str(Path(__file__).resolve()), "_stage", stage, str(root)]
+    try:
+        completed = subprocess.run(
+            command, capture_output=True, text=True, timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {"status": "timeout"}
+    if verbose and completed.stderr:
+        sys.stderr.write(completed.stderr)
+    if completed.returncode != 0:
+        return {"status": "error", "error": completed.stderr.strip().splitlines()[-1:]}
+    return dict(json.loads(completed.stdout.strip().splitlines()[-1]), status="ok")
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ COMMANDS                                                                           ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+def tree_for(workdir: Path, size: int, seed: int) -> Path:
+    root = workdir / f"repo_{size}_s{seed}"
+    manifest = generate(root, size, seed)
+    print(f"🌲 {root} ({manifest['files']:,} files, {manifest['total_bytes'] / 1024 / 1024:,.0f} MB)",
+          file=sys.stderr)
+    return root
+
+
+def command_generate(args):
+    for size in args.sizes:
+        tree_for(Path(args.workdir), size, args.seed)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "-C", str(SCRIPT_PATH.parent), "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def command_run(args):
+    stages = args.stages or list(STAGES)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        sys.exit(f"Unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+    baseline = {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        root = tree_for(Path(args.workdir), size, args.seed)
+        per_stage = baseline["results"][str(size)] = {}
+        for stage in stages:
+            runs = [run_stage_subprocess(stage, root, args.timeout, args.verbose)
+                    for _ in range(args.repeat)]
+            ok = [run for run in runs if run["status"] == "ok"]
+            if not ok:
+                per_stage[stage] = runs[-1]
+            else:
+                peaks = [run["peak_rss_mb"] for run in ok if run["peak_rss_mb"] is not None]
+                per_stage[stage] = {
+                    "status": "ok",
+                    "seconds": round(statistics.median(run["seconds"] for run in ok), 4),
+                    "runs": [run["seconds"] for run in ok],
+                    "peak_rss_mb": max(peaks) if peaks else None,
+                    "peak_includes_setup": ok[0]["peak_includes_setup"],
+                }
+            result = per_stage[stage]
+            shown = (f"{result['seconds']:>9.3f}s {result['peak_rss_mb'] or 0:>8.1f} MB"
+                     if result["status"] == "ok" else result["status"])
+            print(f"{size:>9,} {stage:<30} {shown}")
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(baseline, indent=2))
+    print(f"📄 Baseline written to {out}")
+
+
+def compare(base: dict, new: dict, threshold: float, min_seconds: float, min_mb: float) -> list:
+    """Rows for every (size, stage) in both files; regressed=True past the thresholds"""
+    rows = []
+    for size, stages in base.get("results", {}).items():
+        for stage, before in stages.items():
+            after = new.get("results", {}).get(size, {}).get(stage)
+            if not after or before.get("status") != "ok" or after.get("status") != "ok":
+                if after and before.get("status") == "ok" and after.get("status") != "ok":
+                    rows.append({"size": size, "stage": stage, "regressed": True,
+                                 "note": f"now {after.get('status')}"})
+                continue
+            time_delta = after["seconds"] - before["seconds"]
+            time_ratio = time_delta / before["seconds"] if before["seconds"] else 0.0
+            memory_ratio = memory_delta = None
+            if before.get("peak_rss_mb") and after.get("peak_rss_mb"):
+                memory_delta = after["peak_rss_mb"] - before["peak_rss_mb"]
+                memory_ratio = memory_delta / before["peak_rss_mb"]
+            slower = time_ratio > threshold and time_delta > min_seconds
+            bigger = memory_ratio is not None and memory_ratio > threshold and memory_delta > min_mb
+            rows.append({
+                "size": size,
+                "stage": stage,
+                "before_seconds": before["seconds"],
+                "after_seconds": after["seconds"],
+                "time_change": round(time_ratio, 4),
+                "before_mb": before.get("peak_rss_mb"),
+                "after_mb": after.get("peak_rss_mb"),
+                "memory_change": round(memory_ratio, 4) if memory_ratio is not None else None,
+                "regressed": slower or bigger,
+                "note": ", ".join(label for label, hit in (("slower", slower), ("more memory", bigger)) if hit),
+            })
+    return rows
+
+
+def command_compare(args):
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    rows = compare(base, new, args.threshold, args.min_seconds, args.min_mb)
+    print(f"{'size':>9} {'stage':<30} {'before':>9} {'after':>9} {'time':>8} {'memory':>8}")
+    for row in rows:
+        if "before_seconds" not in row:
+            print(f"{int(row['size']):>9,} {row['stage']:<30} {'':>9} {'':>9} {'':>8} {'':>8}  ❌ {row['note']}")
+            continue
+        memory = f"{row['memory_change']:+.0%}" if row["memory_change"] is not None else "n/a"
+        flag = f"  ❌ {row['note']}" if row["regressed"] else ""
+        print(
+            f"{int(row['size']):>9,} {row['stage']:<30} {row['before_seconds']:>8.3f}s "
+            f"{row['after_seconds']:>8.3f}s {row['time_change']:>+8.0%} {memory:>8}{flag}"
+        )
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "_stage":
+        print(json.dumps(measure_stage(sys.argv[2], sys.argv[3])))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="build synthetic trees")
+    gen.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                     help=f"file counts (suite covers {', '.join(f'{s:,}' for s in ALL_SIZES)})")
+    gen.add_argument("--workdir", default=str(DEFAULT_WORKDIR))
+    gen.add_argument("--seed", type=int, default=0)
+    gen.set_defaults(handler=command_generate)
+
+    run = commands.add_parser("run", help="time stages and write a baseline")
+    run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run.add_argument("--stages", nargs="+", help=f"subset of: {', '.join(STAGES)}")
+    run.add_argument("--repeat", type=int, default=3, help="runs per stage (median time, max memory)")
+    run.add_argument("--timeout", type=float, default=1800, help="seconds per stage run")
+    run.add_argument("--workdir", default=str(DEFAULT_WORKDIR))
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--out", default=str(BENCH_DIR / "results" / "baseline.json"))
+    run.add_argument("--verbose", action="store_true", help="show analyzer output")
+    run.set_defaults(handler=command_run)
+
+    cmp = commands.add_parser("compare", help="flag regressions between two baselines")
+    cmp.add_argument("base")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.15, help="relative change that counts")
+    cmp.add_argument("--min-seconds", type=float, default=0.05, help="ignore smaller time changes")
+    cmp.add_argument("--min-mb", type=float, default=5.0, help="ignore smaller memory changes")
+    cmp.set_defaults(handler=command_compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
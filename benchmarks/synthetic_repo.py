@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic repository generator for the benchmark suite.
+
+A tree of N files mixes every shape the analyzer has to cope with:
+    • wide    — flat feature folders with hundreds of sibling directories
+    • deep    — long nested chains (src/a/b/c/... 30+ levels)
+    • dupes   — exact copies (same size + content) and same-size near-copies
+    • binary  — a few large pseudo-random binaries (.png/.zip/.bin)
+    • big     — multi-thousand-line Python and JavaScript modules
+    • mixed   — .md/.json/.css/.yaml/.txt/.html alongside the code
+Python/TS files import each other so dependency analysis has real edges, and
+mtimes are spread over two years so temporal analysis finds sessions.
+
+Same (files, seed) → byte-identical tree. A manifest next to the tree records
+the parameters so an existing tree is reused instead of regenerated.
+
+Usage:
+    python benchmarks/synthetic_repo.py OUT_DIR --files 10000 [--seed 0] [--force]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import time
+from pathlib import Path
+
+GENERATOR_VERSION = 1
+EPOCH = 1_700_000_000  # Fixed base for deterministic mtimes (Nov 2023)
+
+# Share of files per shape (sums to 1.0)
+MIX = {
+    "wide": 0.40,
+    "deep": 0.15,
+    "dupes": 0.15,
+    "mixed": 0.25,
+    "big": 0.04,
+    "binary": 0.01,
+}
+WORDS = (
+    "user auth service controller model view config utils helper manager handler router "
+    "client server cache index api data schema spec main app component button modal table "
+    "form store reducer hook context provider account billing report session token widget"
+).split()
+MAX_BINARIES = 24  # 1-8 MB each
+MAX_BIG_MODULES = 400  # 2-5k lines each
+MAX_DUPE_GROUPS_BY_SIZE = {65536: 2000, 300_000: 100}  # Larger copies stop scaling
+DOC_EXTENSIONS = [".md", ".json", ".css", ".yaml", ".txt", ".html"]
+BINARY_EXTENSIONS = [".png", ".zip", ".bin"]
+
+
+def manifest_path(root: Path) -> Path:
+    return root.parent / f"{root.name}.manifest.json"
+
+
+def python_module(rng, name, imports, functions):
+    lines = [f'"""{name} module (synthetic)"""']
+    lines += [f"from {module} import {symbol}" for module, symbol in imports]
+    lines.append("import os")
+    lines.append("")
+    for i in range(functions):
+        word = rng.choice(WORDS)
+        lines += [
+            f"def {word}_{i}(value):",
+            f'    """Return the {word} for value"""',
+            f"    # {word} handling",
+            f"    return value * {i} + len(os.sep)",
+            "",
+        ]
+    lines += [f"class {name.title().replace('_', '')}:", "    pass", ""]
+    return "\n".join(lines) + "\n"
+
+
+def js_module(rng, name, imports, functions):
+    lines = [f"import {{ {symbol} }} from '{spec}';" for spec, symbol in imports]
+    for i in range(functions):
+        word = rng.choice(WORDS)
+        lines += [
+            f"// {word} helper",
+            f"export function {word}{i}(value) {{",
+            f"  return value * {i};",
+            "}",
+        ]
+    lines.append(f"export const {name} = () => null;")
+    return "\n".join(lines) + "\n"
+
+
+def plan(files: int, seed: int) -> list:
+    """[(rel_path, kind, payload)] — cheap to compute, fully determined by seed"""
+    rng = random.Random(seed)
+    counts = {shape: int(files * share) for shape, share in MIX.items()}
+    # Keep the tree on-disk size sane at 1M files: large blobs do not scale
+    counts["binary"] = min(counts["binary"], MAX_BINARIES)
+    counts["big"] = min(counts["big"], MAX_BIG_MODULES)
+    counts["wide"] += files - sum(counts.values())
+    entries = []
+    py_modules = []  # (dotted module, symbol)
+    ts_modules = []  # (rel path without extension, symbol)
+
+    # Wide: feature folders, 5 files each, 200 folders per group
+    for i in range(counts["wide"]):
+        folder = i // 5
+        rel_dir = f"src/group{folder // 200}/feature{folder}"
+        stem = f"{rng.choice(WORDS)}_{i}"
+        if i % 2:
+            rel = f"{rel_dir}/{stem}.py"
+            imports = rng.sample(py_modules, min(2, len(py_modules)))
+            entries.append((rel, "python", (stem, imports, 4)))
+            py_modules.append((rel[:-3].replace("/", "."), f"{stem.split('_')[0]}_0"))
+        else:
+            rel = f"{rel_dir}/{stem}.ts"
+            imports = []
+            for target, symbol in rng.sample(ts_modules, min(2, len(ts_modules))):
+                spec = os.path.relpath(target, rel_dir).replace(os.sep, "/")
+                imports.append((spec if spec.startswith(".") else "./" + spec, symbol))
+            entries.append((rel, "js", (stem, imports, 4)))
+            ts_modules.append((rel[:-3], f"{stem.split('_')[0]}0"))
+
+    # Deep: chains of 32 nested directories
+    for i in range(counts["deep"]):
+        chain, level = divmod(i, 32)
+        rel_dir = "lib/chain%d/" % chain + "/".join(f"l{k}" for k in range(level + 1))
+        stem = f"deep_{i}"
+        entries.append((f"{rel_dir}/{stem}.py", "python", (stem, [], 2)))
+
+    # Duplicates: groups of 2-5 identical files + same-size different content
+    i = 0
+    groups_by_size = dict.fromkeys(MAX_DUPE_GROUPS_BY_SIZE, 0)
+    while i < counts["dupes"]:
+        group = rng.randint(2, 5)
+        size = rng.choice([512, 4096, 65536, 300_000])
+        if size in groups_by_size:
+            groups_by_size[size] += 1
+            if groups_by_size[size] > MAX_DUPE_GROUPS_BY_SIZE[size]:
+                size = 4096
+        content_seed = rng.randrange(1 << 30)
+        for k in range(min(group, counts["dupes"] - i)):
+            kind = "dupe" if k < group - 1 or group == 2 else "near"
+            entries.append((f"assets/copies{i // 200}/copy_{i}.dat", kind, (size, content_seed)))
+            i += 1
+
+    # Mixed documents/configs
+    for i in range(counts["mixed"]):
+        ext = DOC_EXTENSIONS[i % len(DOC_EXTENSIONS)]
+        entries.append((f"docs/section{i // 100}/{rng.choice(WORDS)}_{i}{ext}", "text", (ext, 40)))
+
+    # Big modules: 2-5k lines
+    for i in range(counts["big"]):
+        stem = f"big_{i}"
+        functions = rng.randint(400, 1000)
+        if i % 2:
+            entries.append((f"src/big/{stem}.py", "python", (stem, [], functions)))
+        else:
+            entries.append((f"web/big/{stem}.js", "js", (stem, [], functions)))
+
+    # Large binaries: 1-8 MB
+    for i in range(counts["binary"]):
+        ext = BINARY_EXTENSIONS[i % len(BINARY_EXTENSIONS)]
+        entries.append((f"media/blob_{i}{ext}", "binary", (rng.randint(1, 8) << 20, rng.randrange(1 << 30))))
+    return entries
+
+
+def render(rng, kind, payload) -> bytes:
+    if kind == "python":
+        return python_module(rng, *payload).encode()
+    if kind == "js":
+        return js_module(rng, *payload).encode()
+    if kind == "text":
+        ext, lines = payload
+        words = " ".join(rng.choice(WORDS) for _ in range(lines * 6))
+        return f"# {ext} {words}\n".encode()
+    if kind in ("dupe", "near", "binary"):
+        size, content_seed = payload
+        data = bytearray(random.Random(content_seed).randbytes(size))
+        if kind == "near":
+            data[size // 2] ^= 0xFF  # Same size, different content
+        return bytes(data)
+    raise ValueError(kind)
+
+
+def generate(root, files: int, seed: int = 0, force: bool = False) -> dict:
+    """Create (or reuse) the tree at `root`; returns the manifest"""
+    root = Path(root)
+    wanted = {"version": GENERATOR_VERSION, "files": files, "seed": seed}
+    manifest_file = manifest_path(root)
+    if not force and root.is_dir() and manifest_file.exists():
+        manifest = json.loads(manifest_file.read_text())
+        if all(manifest.get(key) == value for key, value in wanted.items()):
+            return manifest
+    if root.exists():
+        shutil.rmtree(root)
+    started = time.time()
+    rng = random.Random(seed + 1)
+    total_bytes = 0
+    made_dirs = set()
+    entries = plan(files, seed)
+    span = 2 * 365 * 86400
+    for index, (rel, kind, payload) in enumerate(entries):
+        path = root / rel
+        parent = path.parent
+        if parent not in made_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(parent)
+        data = render(rng, kind, payload)
+        path.write_bytes(data)
+        total_bytes += len(data)
+        # Bursty mtimes: files in index order cluster into work sessions
+        mtime = EPOCH + (index * span // max(1, len(entries))) + rng.randrange(3600)
+        os.utime(path, (mtime, mtime))
+    manifest = dict(wanted, total_bytes=total_bytes, directories=len(made_dirs),
+                    generate_seconds=round(time.time() - started, 2))
+    manifest_file.write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("out_dir")
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="regenerate even if a matching tree exists")
+    args = parser.parse_args()
+    manifest = generate(args.out_dir, args.files, args.seed, args.force)
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Slim command-line entry for mr-fix-my-project-please.py.
+
+Running the 18k-line analyzer directly (`python3 mr-fix-my-project-please.py`)
+makes Python recompile it on every call: a script run as __main__ never uses the
+__pycache__ bytecode cache. This launcher imports the analyzer as a module, so
+after the first run its compiled bytecode is loaded from __pycache__ instead.
+The MCP server (mr-fix-mcp-server.ts) shells out once per request, so it calls
+this file.
+
+Same arguments and output as the analyzer:
+    python3 mr-fix-cli.py <project_path> [--html-only] [--jobs N] [...]
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+ANALYZER_PATH = Path(__file__).resolve().with_name("mr-fix-my-project-please.py")
+MODULE_NAME = "mr_fix_my_project_please"
+
+
+def load_analyzer():
+    """Import the analyzer (hyphenated file name) once per process, bytecode-cached"""
+    module = sys.modules.get(MODULE_NAME)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(MODULE_NAME, ANALYZER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[MODULE_NAME] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+if __name__ == "__mp_main__":
+    # --jobs N workers started with "spawn" (macOS/Windows) unpickle functions as
+    # mr_fix_my_project_please.<name>; register the module before they do
+    load_analyzer()
+
+if __name__ == "__main__":
+    load_analyzer().main()
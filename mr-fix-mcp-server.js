@@ -28,15 +28,125 @@
 import { Server } from '@modelcontextprotocol/sdk/server/index.js';
 import { StdioServerTransport } from '@modelcontextprotocol/sdk/server/stdio.js';
 import { CallToolRequestSchema, ListToolsRequestSchema, } from '@modelcontextprotocol/sdk/types.js';
-import { exec } from 'child_process';
+import { exec, spawn } from 'child_process';
 import { promisify } from 'util';
 import path from 'path';
 import { fileURLToPath } from 'url';
 const execAsync = promisify(exec);
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
-// Path to mr-fix-my-project-please.py
-const ANALYZER_PATH = path.join(__dirname, 'mr-fix-my-project-please.py');
+// Slim entry for mr-fix-my-project-please.py (loads the analyzer from cached bytecode)
+const ANALYZER_PATH = path.join(__dirname, 'mr-fix-cli.py');
+/**
+ * Long-lived analyzer process (`mr-fix-cli.py --serve`, JSON-RPC over stdio)
+ *
+ * Started on the first tool call and reused afterwards, so the analyzer is
+ * imported once and every project keeps its file inventory, parse cache and
+ * last results warm between calls. Restarted on the next call if it exits.
+ */
+class AnalysisWorker {
+    constructor() {
+        this.child = null;
+        this.buffer = '';
+        this.nextId = 1;
+        this.pending = new Map();
+    }
+    start() {
+        if (this.child) {
+            return this.child;
+        }
+        const child = spawn('python3', [ANALYZER_PATH, '--serve'], {
+            stdio: ['pipe', 'pipe', 'pipe'],
+        });
+        child.stdout.setEncoding('utf8');
+        child.stdout.on('data', (chunk) => this.onData(chunk));
+        // Analyzer progress goes to stderr; keep it in the MCP server log
+        child.stderr.on('data', (chunk) => process.stderr.write(chunk));
+        child.on('exit', (code) => {
+            this.child = null;
+            this.buffer = '';
+            for (const { reject } of this.pending.values()) {
+                reject(new Error(`Analysis worker exited (code ${code})`));
+            }
+            this.pending.clear();
+        });
+        child.on('error', (error) => console.error(`⚠️ Analysis worker error: ${error.message}`));
+        this.child = child;
+        return child;
+    }
+    onData(chunk) {
+        this.buffer += chunk;
+        let newline;
+        while ((newline = this.buffer.indexOf('\n')) >= 0) {
+            const line = this.buffer.slice(0, newline).trim();
+            this.buffer = this.buffer.slice(newline + 1);
+            if (!line) {
+                continue;
+            }
+            let message;
+            try {
+                message = JSON.parse(line);
+            }
+            catch (error) {
+                // A stray print on the worker's stdout must not take down the MCP server
+                console.error(`⚠️ Analysis worker sent a non-JSON line (${error.message}): ${line.slice(0, 200)}`);
+                continue;
+            }
+            const waiter = this.pending.get(message.id);
+            if (!waiter) {
+                continue;
+            }
+            this.pending.delete(message.id);
+            if (message.error) {
+                waiter.reject(new Error(message.error.message));
+            }
+            else {
+                waiter.resolve(message.result);
+            }
+        }
+    }
+    call(method, params, timeoutMs = 600000) {
+        const child = this.start();
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                // The worker is still running the request; callers must not race it (see terminate)
+                reject(Object.assign(new Error(`Analysis worker timed out after ${timeoutMs} ms (${method})`), { timedOut: true }));
+            }, timeoutMs);
+            this.pending.set(id, {
+                resolve: (value) => {
+                    clearTimeout(timer);
+                    resolve(value);
+                },
+                reject: (error) => {
+                    clearTimeout(timer);
+                    reject(error);
+                },
+            });
+            child.stdin.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+        });
+    }
+    stop() {
+        if (this.child) {
+            this.child.stdin.end(JSON.stringify({ jsonrpc: '2.0', id: 0, method: 'shutdown' }) + '\n');
+        }
+    }
+    /**
+     * Kill the worker (cancelling whatever it is running) and resolve once it has exited
+     */
+    terminate() {
+        const child = this.child;
+        if (!child) {
+            return Promise.resolve();
+        }
+        return new Promise((resolve) => {
+            child.once('exit', () => resolve());
+            child.kill('SIGTERM');
+        });
+    }
+}
+const worker = new AnalysisWorker();
 /**
  * Create and configure the MCP server
  */
@@ -89,6 +199,41 @@ function createServer() {
                         required: [],
                     },
                 },
+                {
+                    name: 'query_project',
+                    description: 'Query the last analysis of a project without re-running it (analyzes first if needed). Kinds: summary, file (imports/exports/dependencies/ripple of one source file), files (glob over the file inventory), critical_files, duplicates, stages (per-stage timings).',
+                    inputSchema: {
+                        type: 'object',
+                        properties: {
+                            projectPath: {
+                                type: 'string',
+                                description: 'Path to project directory (defaults to current directory)',
+                            },
+                            kind: {
+                                type: 'string',
+                                enum: ['summary', 'file', 'files', 'critical_files', 'duplicates', 'stages'],
+                                description: 'What to return. Default: summary',
+                            },
+                            path: {
+                                type: 'string',
+                                description: 'Project-relative source file (kind=file)',
+                            },
+                            pattern: {
+                                type: 'string',
+                                description: 'Glob over project-relative paths, e.g. "src/*.py" (kind=files)',
+                            },
+                            limit: {
+                                type: 'number',
+                                description: 'Maximum entries for files/critical_files. Default: 200',
+                            },
+                            refresh: {
+                                type: 'boolean',
+                                description: 'Re-check the tree and re-analyze changed files first. Default: false',
+                            },
+                        },
+                        required: [],
+                    },
+                },
             ],
         };
     });
@@ -103,6 +248,8 @@ function createServer() {
                     return await handleAnalyzeProject(args);
                 case 'quick_analysis':
                     return await handleQuickAnalysis(args);
+                case 'query_project':
+                    return await handleQueryProject(args);
                 default:
                     throw new Error(`Unknown tool: ${name}`);
             }
@@ -131,6 +278,30 @@ async function handleAnalyzeProject(args) {
     const projectPath = args?.projectPath || process.cwd();
     const htmlOnly = args?.htmlOnly || false;
     console.error(`🚀 Starting ULTRATHINK analysis for: ${projectPath}`);
+    // Full analysis goes through the warm worker; --html-only (MAX_Extract copy) and
+    // worker failures use a one-shot process
+    if (!htmlOnly) {
+        try {
+            const report = await worker.call('report', { project: projectPath, output_dir: projectPath });
+            console.error(`✅ Analysis complete: ${report.html_path}${report.cached ? ' (unchanged, cached)' : ''}`);
+            return analysisResponse(projectPath, report.html_path, {
+                total_files: report.total_files,
+                total_directories: report.total_dirs,
+                project_purpose: report.purpose || 'Unknown',
+                score: report.score,
+                cached: report.cached,
+                seconds: report.seconds,
+            });
+        }
+        catch (error) {
+            if (error.timedOut) {
+                // The timed-out job may still be writing .mrfix-cache; cancel it before a second writer starts
+                console.error('⏹️ Cancelling the timed-out worker job before the one-shot analysis');
+                await worker.terminate();
+            }
+            console.error(`⚠️ Analysis worker failed (${error.message}); running a one-shot analysis`);
+        }
+    }
     // Build command
     const flags = htmlOnly ? '--html-only' : '';
     const command = `python3 "${ANALYZER_PATH}" "${projectPath}" ${flags}`;
@@ -151,6 +322,16 @@ async function handleAnalyzeProject(args) {
     const totalDirs = dirsMatch ? parseInt(dirsMatch[1]) : 0;
     const projectPurpose = purposeMatch ? purposeMatch[1] : 'Unknown';
     console.error(`✅ Analysis complete: ${htmlPath}`);
+    return analysisResponse(projectPath, htmlPath, {
+        total_files: totalFiles,
+        total_directories: totalDirs,
+        project_purpose: projectPurpose,
+    });
+}
+/**
+ * Tool response for a finished analysis
+ */
+function analysisResponse(projectPath, htmlPath, statistics) {
     return {
         content: [
             {
@@ -159,11 +340,7 @@ async function handleAnalyzeProject(args) {
                     success: true,
                     project_path: projectPath,
                     html_report: htmlPath,
-                    statistics: {
-                        total_files: totalFiles,
-                        total_directories: totalDirs,
-                        project_purpose: projectPurpose,
-                    },
+                    statistics,
                     features: [
                         '🚀 ULTRATHINK Dependency Maps (5 Mermaid diagrams)',
                         '🔬 GPT-4O Purpose Discovery',
@@ -195,6 +372,25 @@ async function handleQuickAnalysis(args) {
     // Quick analysis is just analyze_project with htmlOnly=true
     return handleAnalyzeProject({ ...args, htmlOnly: true });
 }
+/**
+ * Handle query_project tool
+ */
+async function handleQueryProject(args) {
+    const { projectPath, kind, ...rest } = args || {};
+    const result = await worker.call('query', {
+        ...rest,
+        project: projectPath || process.cwd(),
+        kind: kind || 'summary',
+    });
+    return {
+        content: [
+            {
+                type: 'text',
+                text: JSON.stringify(result, null, 2),
+            },
+        ],
+    };
+}
 /**
  * Main entry point
  */
@@ -203,6 +399,7 @@ async function main() {
     const server = createServer();
     const transport = new StdioServerTransport();
     await server.connect(transport);
+    process.on('exit', () => worker.stop());
     console.error('✅ MCP Server ready!');
     console.error('📡 Listening for tool requests...');
 }
@@ -95,23 +95,36 @@ CHAPTER 5: UTILITY & MAIN (Lines 12943+)
 # Standard library imports
 import os  # File system operations
 import json  # JSON serialization/deserialization
-import hashlib  # File hashing for duplicate detection
 import datetime  # Timestamp handling
 import math  # Mathematical calculations
 import time  # Time tracking and performance measurement
-try:
-    import psutil  # System resource monitoring (optional)
-except ImportError:
-    psutil = None  # Graceful degradation: analysis continues without memory monitoring
 import threading  # Background processing
-import subprocess  # External command execution
+import contextlib  # No-op spans when tracing is disabled
 from pathlib import Path  # Modern path handling
 # Data structure imports
 from collections import defaultdict, Counter  # Data aggregation
 import re  # Regular expressions for pattern matching
-# Concurrency imports
-from concurrent.futures import ThreadPoolExecutor, as_completed  # Parallel processing
-from difflib import SequenceMatcher  # String similarity comparison
+from array import array  # Compact numeric columns (timestamp tables)
+# Deferred imports (startup budget, see benchmarks/bench_startup.py): ast, hashlib,
+# subprocess, difflib, concurrent.futures, asyncio and http.client are imported
+# inside the functions that use them (LLM calls go through LLMClient, no SDK);
+# optional dependencies load on first use through optional_import().
+#   psutil  — memory governor RSS (fallback: /proc or tracemalloc)
+#   xxhash  — duplicate content hashing (fallback: BLAKE2b from hashlib)
+#   numpy   — vectorized timestamp sorting (fallback: array columns + sorted())
+_OPTIONAL_MODULES = {}
+
+
+def optional_import(name: str):
+    """Import an optional dependency on first use; None when it is not installed"""
+    if name not in _OPTIONAL_MODULES:
+        try:
+            _OPTIONAL_MODULES[name] = __import__(name)
+        except ImportError:
+            _OPTIONAL_MODULES[name] = None
+    return _OPTIONAL_MODULES[name]
+
+
 # Logging configuration
 import logging
 logging.basicConfig(level=logging.ERROR, format="%(levelname)s: %(message)s")
@@ -304,7 +317,7 @@ def create_zone_marker(zone_num, zone_name, icon="📦", width=MAX_WIDTH):
 # ╚════════════════════════════════════════════════════════════════════════════════════╝
 from enum import Enum
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, NamedTuple, Optional
 
 class ColorSchema(Enum):
     """Available color schemas for enhanced HTML generation"""
@@ -2247,27 +2260,3499 @@ class SelfHealingCodeManager:
         map_content = self.generate_ascii_section_map()
         map_lines = map_content.splitlines()
 
-        start_marker = "# ASCII_SECTION_MAP_START"
-        end_marker = "# ASCII_SECTION_MAP_END"
+        start_marker = "# ASCII_SECTION_MAP_START"
+        end_marker = "# ASCII_SECTION_MAP_END"
+
+        start_idx = -1
+        end_idx = -1
+
+        for i, line in enumerate(self.lines):
+            if start_marker in line:
+                start_idx = i
+            elif end_marker in line:
+                end_idx = i
+                break
+        
+        if start_idx != -1 and end_idx != -1:
+            new_content_with_newlines = [line + '\n' for line in map_lines]
+            
+            current_content = self.lines[start_idx + 1 : end_idx]
+            if current_content != new_content_with_newlines:
+                self.lines[start_idx + 1 : end_idx] = new_content_with_newlines
+                self.modified = True
+                print("   🗺️ ASCII section map updated.")
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ IGNORE RULES - .gitignore / .git/info/exclude / .mrfixignore, compiled per level   ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+DEFAULT_SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__"})  # Never project content
+BUILD_SKIP_DIRS = DEFAULT_SKIP_DIRS | {"dist", "build"}  # + build output (sources, duplicates)
+
+
+class IgnoreMatcher:
+    """
+    🙈 COMPILED IGNORE MATCHER
+    PURPOSE: Let FileInventory prune what the project itself ignores (.venv, .turbo,
+             build caches, generated code) before descending into it, so no stage
+             lists, stats or hashes those entries
+    SOURCES (per directory, read in this order, later lines win like git):
+        • .git/info/exclude   when the directory holds a .git directory
+        • .gitignore
+        • .mrfixignore        analyzer-only rules, same syntax (may use !negation
+                              to bring back what .gitignore hides)
+    MECHANISM:
+        • Each directory with ignore files gets one IgnoreMatcher: every pattern is
+          translated to a regex and compiled on its own first (a line Python's re
+          rejects, e.g. "[z-a]", is dropped, as git never matches it). The rules
+          then become ONE compiled alternation per entry kind (directories: all
+          rules; files: rules without a trailing "/"), listed last rule first, so
+          the first alternative that matches is the rule git would apply (its
+          capture group says whether it was a !negation)
+        • A directory inherits its parent's chain of matchers; the deepest matcher
+          with a matching rule decides (nested .gitignore files override parents)
+        • Matching happens while the directory is listed: an ignored directory is
+          never scanned, so nothing below it can be re-included (git semantics)
+        • The .git directory itself is always pruned, as git never tracks it
+    """
+
+    SOURCES = (".git/info/exclude", ".gitignore", ".mrfixignore")
+    ALWAYS_IGNORED = frozenset({".git"})
+
+    __slots__ = ("base", "rules", "dirs", "files")
+
+    def __init__(self, base: str, patterns):
+        self.base = base  # Root-relative directory the patterns are relative to (os.sep)
+        rules = []
+        for pattern in patterns:
+            rule = self.translate(pattern)
+            if rule is None:
+                continue
+            try:
+                re.compile(rule[0], re.DOTALL)
+            except re.error:
+                continue  # Unparseable rule: matches nothing, must not stop the walk
+            rules.append(rule)
+        rules.reverse()  # Last rule first: the first alternative that matches is the one git applies
+        self.rules = len(rules)
+        self.dirs = self._alternation(rules)
+        self.files = self._alternation([rule for rule in rules if not rule[2]])
+
+    @staticmethod
+    def _alternation(rules: list) -> tuple:
+        """(compiled alternation or None, group number → rule was a !negation)"""
+        if not rules:
+            return None, [False]
+        regex = re.compile("|".join(f"({regex})" for regex, _, _ in rules), re.DOTALL)
+        return regex, [False] + [negate for _, negate, _ in rules]
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ translate - one gitignore line → regex over "path/to/entry"                        ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @staticmethod
+    def translate(line: str):
+        """(regex, negate, dir_only) for one pattern line, or None for blanks and comments"""
+        line = line.rstrip("\r\n")
+        while line.endswith(" ") and not line.endswith("\\ "):
+            line = line[:-1]  # Trailing spaces are ignored unless escaped
+        if not line or line.startswith("#"):
+            return None
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        anchored = "/" in line  # A slash anywhere but the end anchors to the base
+        line = line.lstrip("/")
+        parts = []
+        i, n = 0, len(line)
+        while i < n:
+            c = line[i]
+            if line.startswith("**", i) and (i == 0 or line[i - 1] == "/") and (i + 2 == n or line[i + 2] == "/"):
+                if i + 2 == n:
+                    parts.append(".+" if i else ".*")  # "dir/**": everything inside
+                else:
+                    parts.append("(?:.*/)?")  # "**/" and "/**/": zero or more directories
+                    i += 1  # Also consume the "/"
+                i += 2
+                continue
+            if c == "*":
+                parts.append("[^/]*")
+            elif c == "?":
+                parts.append("[^/]")
+            elif c == "\\" and i + 1 < n:
+                i += 1
+                parts.append(re.escape(line[i]))
+            elif c == "[":
+                end = line.find("]", i + 2 if line.startswith(("[!", "[^", "[]"), i) else i + 1)
+                if end == -1:
+                    parts.append(re.escape(c))
+                else:
+                    body = line[i + 1:end]
+                    if body[:1] in ("!", "^"):
+                        body = "^" + body[1:]
+                    parts.append("[" + body.replace("[", "\\[") + "]")
+                    i = end
+            else:
+                parts.append(re.escape(c))
+            i += 1
+        regex = "".join(parts)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+        return regex, negate, dir_only
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ load / directory_rules / ignored                                                   ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @classmethod
+    def load(cls, abs_dir: str, rel_dir: str, names, dir_names, sources: dict):
+        """
+        Matcher for the ignore files in one directory (None when it has none).
+        Every file read is recorded in `sources` (root-relative path → (size, mtime_ns))
+        so checkpoint fingerprints change when the rules do.
+        """
+        patterns = []
+        for source in cls.SOURCES:
+            present = ".git" in dir_names if source.startswith(".git/") else source in names
+            if not present:
+                continue
+            path = os.path.join(abs_dir, *source.split("/"))
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    patterns.extend(f.read().splitlines())
+                st = os.stat(path)
+            except OSError:
+                continue
+            sources[os.path.join(rel_dir, *source.split("/"))] = (st.st_size, st.st_mtime_ns)
+        if not patterns:
+            return None
+        matcher = cls(rel_dir, patterns)
+        return matcher if matcher.rules else None
+
+    @classmethod
+    def directory_rules(cls, abs_dir: str) -> tuple:
+        """Matcher chain of one directory's own ignore files, for listings made outside FileInventory"""
+        try:
+            with os.scandir(abs_dir) as it:
+                names = {entry.name: entry.is_dir() for entry in it}
+        except OSError:
+            return ()
+        dir_names = {".git"} if names.get(".git") else set()
+        matcher = cls.load(abs_dir, "", names, dir_names, {})
+        return (matcher,) if matcher is not None else ()
+
+    @staticmethod
+    def ignored(chain: tuple, rel: str, is_dir: bool) -> bool:
+        """True when the deepest matcher with a rule for `rel` ignores it"""
+        for matcher in reversed(chain):
+            sub = rel[len(matcher.base) + 1:] if matcher.base else rel
+            if os.sep != "/":
+                sub = sub.replace(os.sep, "/")
+            regex, negated = matcher.dirs if is_dir else matcher.files
+            match = regex.fullmatch(sub) if regex is not None else None
+            if match is not None:
+                return not negated[match.lastindex]
+        return False
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ SHARED FILE INVENTORY - One scandir traversal feeding every analysis stage         ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+_HAS_BIRTHTIME = hasattr(os.stat_result, "st_birthtime")  # macOS/BSD creation time
+
+
+def _path_suffix(name: str) -> str:
+    """Same rule as Path.suffix, without building a Path object"""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ""
+
+
+class InventoryEntry(NamedTuple):
+    """One directory entry captured by FileInventory (paths are root-relative)"""
+    path: str  # Relative path, os.sep separated ("" parent means project root)
+    name: str
+    ext: str  # Lower-cased Path.suffix
+    size: int  # -1 when the entry could not be stat'ed (broken symlink, EACCES)
+    mtime: float
+    ctime: float  # st_birthtime where available, st_ctime otherwise
+    is_dir: bool
+    depth: int  # Number of path components below the root
+    parent: str
+    ino: int = 0  # st_ino, used by AnalysisCache to detect replaced files
+
+
+class FileInventory:
+    """
+    📦 SHARED FILE INVENTORY
+    PURPOSE: Walk the project tree exactly once (os.scandir, one stat per file) and
+             let every stage filter the cached listing instead of re-walking disk
+    MECHANISM:
+        • Directory listings are stored per directory in scandir order
+        • walk() replays them in os.walk order (top-down or bottom-up) and applies
+          each stage's own skip list, so stage results stay identical
+        • Symlinked directories are listed but never descended (os.walk default)
+        • Entries matched by .gitignore / .git/info/exclude / .mrfixignore are
+          dropped while listing (IgnoreMatcher); ignored directories are never
+          scanned. stats["ignored_dirs"/"ignored_files"] count what was pruned
+          (--no-ignore lists everything, as before)
+        • --walk-threads N lists directories on N threads pulling from one queue
+          (for NFS/overlay filesystems where every scandir/stat is a round trip)
+        • Inventories are shared per root for the lifetime of one analysis run; a
+          walk cut short by should_stop (complete=False) is returned but never shared
+    """
+
+    _registry: Dict[str, "FileInventory"] = {}
+    _registry_lock = threading.Lock()
+    default_workers = 4  # Walker threads; main() sets this from --walk-threads
+    honor_ignore_files = True  # main() clears this for --no-ignore
+
+    def __init__(self, root, should_stop=None, workers=None, honor_ignore_files=None):
+        self.root = Path(root)
+        self.workers = self.default_workers if workers is None else workers
+        self.honor_ignore = self.honor_ignore_files if honor_ignore_files is None else honor_ignore_files
+        self.listings: Dict[str, tuple] = {}  # rel_dir -> (dir_entries, file_entries)
+        self.symlinked_dirs = set()
+        self.ignore_sources = {}  # Ignore files read: rel path -> (size, mtime_ns)
+        self._file_index = None
+        self.complete = True  # False when should_stop ended the walk early
+        self.stats = {
+            "directories": 0,
+            "files": 0,
+            "stat_errors": 0,
+            "unreadable_directories": 0,
+            "ignored_dirs": 0,
+            "ignored_files": 0,
+            "ignore_files": 0,
+            "build_time": 0.0,
+            "walk_threads": 1,
+        }
+        self._build(should_stop)
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ _build                                                                             ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _build(self, should_stop=None):
+        """Single scandir pass over the whole tree (serial or threaded)"""
+        build_start = time.time()
+        workers = max(1, int(self.workers or 1))
+        if workers > 1:
+            self._build_threaded(workers, should_stop)
+        else:
+            self._build_serial(should_stop)
+        self.stats["walk_threads"] = workers
+        self.stats["ignore_files"] = len(self.ignore_sources)
+        self.stats["build_time"] = time.time() - build_start
+
+    def _build_serial(self, should_stop=None):
+        counters = self._new_counters()
+        ext_cache = {}
+        stack = [("", str(self.root), 0, ())]
+        while stack:
+            if should_stop is not None and should_stop():
+                self.complete = False
+                break
+            rel_dir, abs_dir, depth, rules = stack.pop()
+            listed = self._list_directory(rel_dir, abs_dir, depth, counters, ext_cache, rules)
+            if listed is None:
+                continue
+            listing, rules = listed
+            self.listings[rel_dir] = listing
+            # Push in reverse so directories pop in listing order (pre-order like os.walk)
+            for entry in reversed(listing[0]):
+                if entry.path not in counters["symlinked_dirs"]:
+                    stack.append((entry.path, os.path.join(abs_dir, entry.name), depth + 1, rules))
+        self._merge_counters(counters)
+
+    def _build_threaded(self, workers: int, should_stop=None):
+        """
+        Latency-bound filesystems (NFS, overlayfs): `workers` threads pull
+        directories from one shared queue, so a deep branch never idles the
+        others. Each thread keeps its own listings/counters, merged at the end;
+        walk() replays listings in os.walk order, so the result is identical.
+        An unexpected error in any thread stops the walk; every task still
+        settles its outstanding count, so all threads exit, and the first
+        error is re-raised here.
+        """
+        import queue
+
+        pending = queue.SimpleQueue()
+        pending.put(("", str(self.root), 0, ()))
+        outstanding = [1]  # Directories queued or being listed
+        outstanding_lock = threading.Lock()
+        stopped = threading.Event()
+        results = []
+        errors = []  # Unexpected exceptions from the workers (first one is re-raised)
+
+        def worker():
+            counters = self._new_counters()
+            listings = {}
+            ext_cache = {}
+            results.append((listings, counters))
+            while True:
+                task = pending.get()
+                if task is None:
+                    return
+                rel_dir, abs_dir, depth, rules = task
+                children = []
+                try:
+                    if not stopped.is_set():
+                        if should_stop is not None and should_stop():
+                            stopped.set()
+                        else:
+                            listed = self._list_directory(rel_dir, abs_dir, depth, counters, ext_cache, rules)
+                            if listed is not None:
+                                listing, rules = listed
+                                listings[rel_dir] = listing
+                                children = [
+                                    (entry.path, os.path.join(abs_dir, entry.name), depth + 1, rules)
+                                    for entry in listing[0]
+                                    if entry.path not in counters["symlinked_dirs"]
+                                ]
+                except BaseException as e:  # Stop the walk; re-raised by the caller after join()
+                    errors.append(e)
+                    stopped.set()
+                    children = []
+                finally:
+                    # Always settle this task, or the other threads wait on pending.get() forever
+                    with outstanding_lock:
+                        outstanding[0] += len(children) - 1
+                        finished = outstanding[0] == 0
+                    for child in children:
+                        pending.put(child)
+                    if finished:
+                        for _ in range(workers):
+                            pending.put(None)
+
+        threads = [
+            threading.Thread(target=worker, name=f"inventory-walk-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        self.complete = not stopped.is_set()
+        for listings, counters in results:
+            self.listings.update(listings)
+            self._merge_counters(counters)
+
+    @staticmethod
+    def _new_counters() -> dict:
+        return {
+            "directories": 0,
+            "files": 0,
+            "stat_errors": 0,
+            "unreadable_directories": 0,
+            "ignored_dirs": 0,
+            "ignored_files": 0,
+            "symlinked_dirs": set(),
+            "ignore_sources": {},
+        }
+
+    def _merge_counters(self, counters: dict):
+        for key in ("directories", "files", "stat_errors", "unreadable_directories", "ignored_dirs", "ignored_files"):
+            self.stats[key] += counters[key]
+        self.symlinked_dirs.update(counters["symlinked_dirs"])
+        self.ignore_sources.update(counters["ignore_sources"])
+
+    def _list_directory(self, rel_dir, abs_dir, depth, counters, ext_cache, rules=()):
+        """
+        One os.scandir() listing → ((dir_entries, file_entries), rules for its
+        subdirectories), or None when the directory is unreadable.
+        DirEntry.stat() is the only stat per file. `rules` is the chain of
+        IgnoreMatchers inherited from the parents; ignored entries are left out.
+        """
+        dir_entries = []
+        file_entries = []
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = list(it)
+        except OSError:
+            # Same as os.walk(onerror=None): unreadable directories are skipped
+            counters["unreadable_directories"] += 1
+            return None
+        if self.honor_ignore:
+            entries, rules = self._apply_ignore_rules(rel_dir, abs_dir, entries, counters, rules)
+        for entry in entries:
+            name = entry.name
+            if not rel_dir and name == AnalysisCache.CACHE_DIR_NAME:
+                continue  # Our own cache is not part of the project
+            rel = name if not rel_dir else rel_dir + os.sep + name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                dir_entries.append(
+                    InventoryEntry(rel, name, "", 0, 0.0, 0.0, True, depth + 1, rel_dir)
+                )
+                if entry.is_symlink():
+                    counters["symlinked_dirs"].add(rel)
+                continue
+            suffix = _path_suffix(name)
+            ext = ext_cache.get(suffix)
+            if ext is None:
+                ext = ext_cache[suffix] = suffix.lower()
+            try:
+                st = entry.stat()
+                size = st.st_size
+                mtime = st.st_mtime
+                ctime = st.st_birthtime if _HAS_BIRTHTIME else st.st_ctime
+                ino = st.st_ino
+            except OSError:
+                size, mtime, ctime, ino = -1, -1.0, -1.0, 0
+                counters["stat_errors"] += 1
+            file_entries.append(
+                InventoryEntry(rel, name, ext, size, mtime, ctime, False, depth + 1, rel_dir, ino)
+            )
+        counters["directories"] += len(dir_entries)
+        counters["files"] += len(file_entries)
+        return (dir_entries, file_entries), rules
+
+    def _apply_ignore_rules(self, rel_dir, abs_dir, entries, counters, rules):
+        """Drop ignored DirEntries; extend the parent's matcher chain with this directory's files"""
+        names = {entry.name for entry in entries}
+        matcher = None
+        if names & {".gitignore", ".mrfixignore", ".git"}:
+            dir_names = {entry.name for entry in entries if entry.name == ".git" and entry.is_dir()}
+            matcher = IgnoreMatcher.load(abs_dir, rel_dir, names, dir_names, counters["ignore_sources"])
+        if matcher is not None:
+            rules = rules + (matcher,)
+        kept = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir and entry.name in IgnoreMatcher.ALWAYS_IGNORED:
+                ignored = True
+            elif rules:
+                rel = entry.name if not rel_dir else rel_dir + os.sep + entry.name
+                ignored = IgnoreMatcher.ignored(rules, rel, is_dir)
+            else:
+                ignored = False
+            if ignored:
+                counters["ignored_dirs" if is_dir else "ignored_files"] += 1
+            else:
+                kept.append(entry)
+        return kept, rules
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ walk                                                                               ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def walk(self, exclude=(), start: str = "", topdown: bool = True):
+        """
+        Replay the cached tree like os.walk(root/start).
+        Yields (rel_dir, dir_entries, file_entries); directories whose name is in
+        `exclude` are dropped from dir_entries and never descended into.
+        """
+        if start not in self.listings:
+            return
+        if topdown:
+            stack = [start]
+            while stack:
+                rel_dir = stack.pop()
+                dir_entries, file_entries = self.listings[rel_dir]
+                if exclude:
+                    dir_entries = [d for d in dir_entries if d.name not in exclude]
+                yield rel_dir, dir_entries, file_entries
+                for entry in reversed(dir_entries):
+                    if entry.path in self.listings:
+                        stack.append(entry.path)
+        else:
+            stack = [(start, False)]
+            while stack:
+                rel_dir, expanded = stack.pop()
+                dir_entries, file_entries = self.listings[rel_dir]
+                if exclude:
+                    dir_entries = [d for d in dir_entries if d.name not in exclude]
+                if expanded:
+                    yield rel_dir, dir_entries, file_entries
+                    continue
+                stack.append((rel_dir, True))
+                for entry in reversed(dir_entries):
+                    if entry.path in self.listings:
+                        stack.append((entry.path, False))
+
+    def iter_files(self, exclude=(), start: str = ""):
+        """All file entries in os.walk order, honoring a stage skip list"""
+        for _, _, file_entries in self.walk(exclude, start):
+            yield from file_entries
+
+    def is_empty_dir(self, entry: InventoryEntry):
+        """True/False for empty/non-empty, None when the directory cannot be listed"""
+        listing = self.listings.get(entry.path)
+        if listing is not None:
+            return not listing[0] and not listing[1]
+        if entry.path in self.symlinked_dirs:
+            try:
+                with os.scandir(os.path.join(str(self.root), entry.path)) as it:
+                    return next(it, None) is None
+            except OSError:
+                return None
+        return None
+
+    def absolute(self, rel_path: str) -> Path:
+        return self.root / rel_path if rel_path else self.root
+
+    def entry_for(self, file_path) -> Optional[InventoryEntry]:
+        """Inventory entry for an absolute or root-relative file path"""
+        if self._file_index is None:
+            self._file_index = {
+                entry.path: entry for entry in self.iter_files()
+            }
+        path_str = str(file_path)
+        if os.path.isabs(path_str):
+            path_str = os.path.relpath(path_str, str(self.root))
+        return self._file_index.get(path_str)
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ shared / covering / reset - per-run registry                                       ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @classmethod
+    def shared(cls, root, should_stop=None) -> "FileInventory":
+        """Inventory for `root`, built on first use and reused by every stage"""
+        key = os.path.abspath(str(root))
+        with cls._registry_lock:
+            inventory = cls._registry.get(key)
+            if inventory is None:
+                inventory = cls(key, should_stop)
+                if inventory.complete:  # A partial listing would pass for the whole tree
+                    cls._registry[key] = inventory
+            return inventory
+
+    @classmethod
+    def covering(cls, path):
+        """(inventory, rel_start) of an already-built inventory containing `path`"""
+        key = os.path.abspath(str(path))
+        with cls._registry_lock:
+            for root, inventory in cls._registry.items():
+                if key == root:
+                    return inventory, ""
+                if key.startswith(root.rstrip(os.sep) + os.sep):
+                    return inventory, os.path.relpath(key, root)
+        return None
+
+    @classmethod
+    def reset(cls, root=None):
+        """Forget inventories under `root` (or all) so the next run re-walks disk"""
+        with cls._registry_lock:
+            if root is None:
+                cls._registry.clear()
+                return
+            key = os.path.abspath(str(root))
+            prefix = key.rstrip(os.sep) + os.sep
+            for cached in list(cls._registry):
+                if cached == key or cached.startswith(prefix):
+                    del cls._registry[cached]
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ STRATIFIED SIZE ESTIMATION - Multi-project file totals with confidence intervals   ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class StratifiedFileEstimator:
+    """
+    📐 STRATIFIED FILE-COUNT ESTIMATOR
+    PURPOSE: Estimate the total file count of a multi-project ecosystem without
+             scanning every project, and say how wrong the estimate may be
+    MECHANISM:
+        • Probe: one os.scandir() per project → top-level entry count (size proxy)
+        • Stratify: projects sorted by probe size, cut into equal-count strata
+        • Allocate: samples per stratum ∝ projects × mean probe size (Neyman
+          allocation with std ∝ mean), at least 2 per stratum when possible
+        • Sample: random projects per stratum, round-robin, until the target or
+          the time budget is reached; a measurement cut off by the budget is
+          dropped (its partial count is only a lower bound)
+        • Estimate: stratified expansion (with finite population correction) for
+          strata with ≥2 samples, ratio estimate (files per top-level entry) for
+          the rest; Student-t confidence interval (df = samples − strata)
+    """
+
+    Z_VALUES = {0.90: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+    def __init__(self, projects, measure, budget_seconds: float = 30.0,
+                 max_strata: int = 4, confidence: float = 0.95, seed: int = 0):
+        self.projects = list(projects)
+        self.measure = measure  # Callable(project, should_stop) -> file count (None if cut off)
+        self.budget_seconds = budget_seconds
+        self.max_strata = max_strata
+        self.confidence = confidence
+        self.seed = seed
+
+    @staticmethod
+    def probe(project) -> int:
+        """Top-level entry count (+1 so empty projects still carry weight)"""
+        try:
+            with os.scandir(project) as it:
+                return 1 + sum(1 for _ in it)
+        except OSError:
+            return 1
+
+    def _strata(self, sizes: dict) -> list:
+        ordered = sorted(self.projects, key=lambda project: (sizes[project], str(project)))
+        count = max(1, min(self.max_strata, len(ordered) // 2))
+        bounds = [round(len(ordered) * h / count) for h in range(count + 1)]
+        return [ordered[bounds[h]:bounds[h + 1]] for h in range(count) if bounds[h] < bounds[h + 1]]
+
+    def _allocation(self, strata: list, sizes: dict, target: int) -> list:
+        weights = [len(stratum) * (sum(sizes[p] for p in stratum) / len(stratum)) for stratum in strata]
+        total_weight = sum(weights) or 1
+        allocation = [
+            min(len(stratum), max(min(2, len(stratum)), round(target * weight / total_weight)))
+            for stratum, weight in zip(strata, weights)
+        ]
+        return allocation
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ estimate                                                                           ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def estimate(self) -> dict:
+        import random
+        start = time.time()
+        deadline = start + self.budget_seconds
+        sizes = {project: self.probe(project) for project in self.projects}
+        probe_time = time.time() - start
+        strata = self._strata(sizes) if self.projects else []
+        target = min(len(self.projects), max(2 * len(strata), 12))
+        allocation = self._allocation(strata, sizes, target)
+
+        rng = random.Random(self.seed)
+        queues = []
+        for stratum in strata:
+            order = list(stratum)
+            rng.shuffle(order)
+            queues.append(order)
+
+        samples = [[] for _ in strata]  # (probe size, file count) per stratum
+        truncated = 0
+
+        def should_stop():
+            return time.time() > deadline
+
+        # Round-robin so an expensive stratum cannot starve the others
+        progress = True
+        while progress and not should_stop():
+            progress = False
+            for h, order in enumerate(queues):
+                if len(samples[h]) >= allocation[h] or not order or should_stop():
+                    continue
+                project = order.pop()
+                count = self.measure(project, should_stop)
+                progress = True
+                if count is None:
+                    truncated += 1
+                    continue
+                samples[h].append((sizes[project], count))
+
+        result = self._combine(strata, samples, sizes)
+        result.update({
+            "projects": len(self.projects),
+            "sampled": sum(len(s) for s in samples),
+            "truncated_samples": truncated,
+            "budget_seconds": self.budget_seconds,
+            "probe_seconds": round(probe_time, 3),
+            "elapsed_seconds": round(time.time() - start, 3),
+        })
+        return result
+
+    def _combine(self, strata: list, samples: list, sizes: dict) -> dict:
+        all_samples = [pair for stratum_samples in samples for pair in stratum_samples]
+        sampled_total = sum(y for _, y in all_samples)
+        x_sum = sum(x for x, _ in all_samples)
+        ratio = sampled_total / x_sum if x_sum else None
+        residual_var = None
+        if ratio is not None and len(all_samples) >= 2:
+            residual_var = sum((y - ratio * x) ** 2 for x, y in all_samples) / (len(all_samples) - 1)
+        x_mean = x_sum / len(all_samples) if all_samples else 0
+
+        total = 0.0
+        variance = 0.0
+        bounded = ratio is not None
+        strata_report = []
+        for stratum, stratum_samples in zip(strata, samples):
+            population = len(stratum)
+            n = len(stratum_samples)
+            ys = [y for _, y in stratum_samples]
+            if n >= 2:
+                mean = sum(ys) / n
+                s2 = sum((y - mean) ** 2 for y in ys) / (n - 1)
+                stratum_total = population * mean
+                stratum_var = population ** 2 * (1 - n / population) * s2 / n
+                method = "expansion"
+            elif ratio is not None:
+                # Observed units count as-is; the rest are predicted from the ratio
+                unobserved_x = sum(sizes[p] for p in stratum) - sum(x for x, _ in stratum_samples)
+                stratum_total = sum(ys) + ratio * unobserved_x
+                stratum_var = 0.0
+                if residual_var is not None:
+                    unobserved = population - n
+                    stratum_var = unobserved * residual_var + (
+                        unobserved_x ** 2 * residual_var / (len(all_samples) * x_mean ** 2)
+                    )
+                else:
+                    bounded = False
+                method = "ratio"
+            else:
+                stratum_total = float(sum(ys))
+                stratum_var = 0.0
+                method = "unsampled"
+            total += stratum_total
+            variance += stratum_var
+            strata_report.append({
+                "probe_range": [sizes[stratum[0]], sizes[stratum[-1]]],
+                "projects": population,
+                "sampled": n,
+                "estimate": round(stratum_total),
+                "method": method,
+            })
+
+        # Few samples per stratum: widen z to Student's t (Cornish-Fisher expansion)
+        z = self.Z_VALUES.get(self.confidence, 1.96)
+        df = max(1, len(all_samples) - len(strata))
+        t = z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        margin = t * math.sqrt(variance)
+        return {
+            "estimate": int(round(total)),
+            "ci_low": int(max(sampled_total, math.floor(total - margin))) if bounded else sampled_total,
+            "ci_high": int(math.ceil(total + margin)) if bounded else None,
+            "confidence": self.confidence,
+            "strata": strata_report,
+        }
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ RESERVOIR SAMPLING - Bounded-memory stratified file samples from the surface walk  ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+DEEP_SAMPLE_EXTENSIONS = frozenset({".py", ".js", ".ts", ".tsx", ".jsx", ".md", ".json"})
+
+
+class StratifiedReservoirSampler:
+    """
+    🎲 STREAMING STRATIFIED RESERVOIR
+    PURPOSE: Pick deep-analysis files uniformly from the whole walk (not the first
+             N in walk order) while holding at most capacity + strata items
+    MECHANISM:
+        • Every offered item draws a random key u ~ U(0, 1)
+        • Global bottom-k by key (max-heap) → a simple random sample of size k
+        • Per-stratum minimum key → every stratum (top-level dir × extension)
+          is represented even when it is too small to win a global slot
+        • Within each stratum the union is that stratum's bottom-n_h keys, i.e.
+          a simple random sample of it, so post-stratified estimates are unbiased
+        • items() is ordered by key: any prefix is itself a random sample
+    """
+
+    def __init__(self, capacity: int, seed=0):
+        import random
+        self.capacity = max(1, int(capacity))
+        self._random = random.Random(seed).random
+        self._heap = []  # (-key, seq, stratum, item): the capacity smallest keys
+        self._stratum_min = {}  # stratum -> (key, seq, item)
+        self.population = Counter()  # stratum -> items offered
+        self._seq = 0
+
+    def offer(self, item, stratum: str):
+        import heapq
+        key = self._random()
+        self._seq += 1
+        self.population[stratum] += 1
+        best = self._stratum_min.get(stratum)
+        if best is None or key < best[0]:
+            self._stratum_min[stratum] = (key, self._seq, item)
+        if len(self._heap) < self.capacity:
+            heapq.heappush(self._heap, (-key, self._seq, stratum, item))
+        elif key < -self._heap[0][0]:
+            heapq.heapreplace(self._heap, (-key, self._seq, stratum, item))
+
+    def items(self) -> list:
+        """[(item, stratum)] ordered by random key"""
+        chosen = {seq: (-neg_key, item, stratum) for neg_key, seq, stratum, item in self._heap}
+        for stratum, (key, seq, item) in self._stratum_min.items():
+            chosen.setdefault(seq, (key, item, stratum))
+        return [(item, stratum) for _, item, stratum in sorted(chosen.values(), key=lambda c: c[0])]
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ estimate_mean - post-stratified mean with sampling error                           ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @staticmethod
+    def estimate_mean(observations: list, population: dict, z: float = 1.96) -> dict:
+        """
+        observations: [(stratum, value)] for the analyzed sample
+        population:   {stratum: items in the walk}
+        Strata never observed are left out (reported as coverage < 1).
+        """
+        by_stratum = defaultdict(list)
+        for stratum, value in observations:
+            by_stratum[stratum].append(float(value))
+        if not by_stratum:
+            return {"mean": None, "standard_error": None, "ci_low": None, "ci_high": None,
+                    "samples": 0, "coverage": 0.0}
+        covered = sum(population.get(stratum, len(values)) for stratum, values in by_stratum.items())
+        total = sum(population.values()) or covered
+
+        # Strata with a single observation borrow the pooled within-stratum variance
+        pooled_num = pooled_den = 0.0
+        for values in by_stratum.values():
+            if len(values) >= 2:
+                mean = sum(values) / len(values)
+                pooled_num += sum((v - mean) ** 2 for v in values)
+                pooled_den += len(values) - 1
+        pooled = pooled_num / pooled_den if pooled_den else 0.0
+
+        estimate = 0.0
+        variance = 0.0
+        for stratum, values in by_stratum.items():
+            size = population.get(stratum, len(values))
+            weight = size / covered
+            n = len(values)
+            mean = sum(values) / n
+            s2 = sum((v - mean) ** 2 for v in values) / (n - 1) if n >= 2 else pooled
+            estimate += weight * mean
+            variance += weight ** 2 * max(0.0, 1 - n / size) * s2 / n
+        error = math.sqrt(variance)
+        return {
+            "mean": round(estimate, 4),
+            "standard_error": round(error, 4),
+            "ci_low": round(estimate - z * error, 4),
+            "ci_high": round(estimate + z * error, 4),
+            "samples": len(observations),
+            "coverage": round(covered / total, 4) if total else 0.0,
+        }
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ DUPLICATE CONTENT HASHING - xxhash when installed, BLAKE2b otherwise               ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+DUPLICATE_EDGE_BYTES = 64 * 1024  # Head/tail bytes hashed before a full read
+
+
+def duplicate_hash_name() -> str:
+    """Algorithm new_duplicate_hasher() uses (part of the content-hash cache key)"""
+    return "xxh3_128" if optional_import("xxhash") is not None else "blake2b"
+
+
+def new_duplicate_hasher():
+    """Fresh hasher for duplicate detection (digest stability only matters per run)"""
+    xxhash = optional_import("xxhash")
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    import hashlib
+    return hashlib.blake2b(digest_size=16)
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ SIMILAR NAME JOIN - Bigram prefix-filter candidates, SequenceMatcher verification  ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+def find_similar_name_pairs(names, threshold: float = 0.85):
+    """
+    🔤 INDEXED SIMILAR NAME DETECTION
+    PURPOSE: Same result as scoring every pair with SequenceMatcher(None, a, b).ratio()
+             and keeping threshold < ratio < 1.0, without scoring every pair
+    MECHANISM:
+        • ratio = 2M/T ≤ quick_ratio = 2I/T (I = shared characters counted as a
+          multiset, T = len(a) + len(b)) → a match needs I > threshold·T/2
+        • Each name becomes character-occurrence tokens ("e" #0, "e" #1, ...) ranked
+          rarest-first, so the multiset overlap I is a plain set overlap
+        • Prefix filter: two names with overlap ≥ t share a token among their first
+          (len − t + 1) tokens → inverted index over short prefixes only
+        • Positional filter: a candidate is dropped as soon as the tokens left after a
+          prefix match cannot reach t
+        • Survivors are verified with exact overlap → real_quick_ratio → ratio
+    Returns [(i, j, ratio)] with i < j indexes into `names`, in all-pairs loop order.
+    """
+    from difflib import SequenceMatcher
+    half = threshold / 2.0
+
+    def required_overlap(total_length):
+        # Smallest I with I > threshold·T/2 (never over-estimated)
+        return int(half * total_length - 1e-9) + 1
+
+    def shortest_partner(length):
+        # 2·min(len) > threshold·T ⇔ min(len) must itself reach the overlap bound
+        low = length
+        while low > 1 and low - 1 >= required_overlap(length + low - 1):
+            low -= 1
+        return low
+
+    # Character-occurrence tokens, ranked by global frequency (rarest = 0)
+    raw_tokens = []
+    frequency = Counter()
+    for name in names:
+        seen = Counter()
+        tokens = []
+        for char in name:
+            tokens.append((char, seen[char]))
+            seen[char] += 1
+        raw_tokens.append(tokens)
+        frequency.update(tokens)
+    rank = {
+        token: position
+        for position, token in enumerate(
+            sorted(frequency, key=lambda token: (frequency[token], token))
+        )
+    }
+    ranked = [sorted(rank[token] for token in tokens) for tokens in raw_tokens]
+    token_sets = [frozenset(tokens) for tokens in ranked]
+    lengths = [len(name) for name in names]
+    longest = max(lengths, default=0)
+    needed = [required_overlap(total) for total in range(2 * longest + 1)]
+    lowest = [0] + [shortest_partner(length) for length in range(1, longest + 1)]
+
+    pairs = []
+    # (token, name length) -> [(name index, position in its ranked tokens)]
+    index = defaultdict(list)
+    # Shortest first: each name probes the already-indexed names no longer than itself
+    for y in sorted(range(len(names)), key=lambda k: (lengths[k], k)):
+        tokens = ranked[y]
+        name_length = lengths[y]
+        low = lowest[name_length]
+        overlaps = {}
+        for other_length in range(low, name_length + 1):
+            target = needed[other_length + name_length] - 1
+            # Probe prefix sized for this partner length (longer partners need more overlap)
+            for position in range(max(0, name_length - target)):
+                postings = index.get((tokens[position], other_length))
+                if not postings:
+                    continue
+                left = name_length - position - 1
+                for x, x_position in postings:
+                    found = overlaps.get(x, 0)
+                    if found < 0:
+                        continue  # Already ruled out by the positional filter
+                    remaining = other_length - x_position - 1
+                    if found + (left if left < remaining else remaining) >= target:
+                        overlaps[x] = found + 1
+                    else:
+                        overlaps[x] = -1
+        y_tokens = token_sets[y]
+        for x, found in overlaps.items():
+            if found <= 0:
+                continue
+            if len(token_sets[x] & y_tokens) < needed[lengths[x] + name_length]:
+                continue
+            i, j = (x, y) if x < y else (y, x)
+            matcher = SequenceMatcher(None, names[i], names[j])
+            if matcher.real_quick_ratio() <= threshold:
+                continue
+            similarity = matcher.ratio()
+            if threshold < similarity < 1.0:
+                pairs.append((i, j, similarity))
+        # Index prefix: later (longer or equal) partners need overlap ≥ t(2·len)
+        for position in range(max(0, name_length - needed[2 * name_length] + 1)):
+            index[(tokens[position], name_length)].append((y, position))
+
+    pairs.sort()
+    return pairs
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ SPILLED STRING LIST - Disk-backed replacement for large lists of names             ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class SpilledStringList:
+    """
+    💽 DISK-BACKED STRING LIST
+    PURPOSE: Move a long list of strings (file names, paths) out of the heap when the
+             memory governor asks for a spill
+    MECHANISM:
+        • Strings are appended UTF-8 encoded to an anonymous temporary file
+        • An array('q') of offsets indexes them (8 bytes per string in memory)
+        • Indexing is one seek + read; iteration streams the file
+    Behaves like a read-mostly list: len(), [i], slicing, iteration and append().
+    """
+
+    WRITE_BATCH = 4096
+
+    def __init__(self, values=()):
+        import tempfile
+        self._file = tempfile.TemporaryFile()
+        self._offsets = array("q", [0])
+        self._lock = threading.Lock()
+        self.extend(values)
+
+    def append(self, value: str):
+        self.extend((value,))
+
+    def extend(self, values):
+        batch = []
+        for value in values:
+            batch.append(value.encode("utf-8", "surrogateescape"))
+            if len(batch) >= self.WRITE_BATCH:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, encoded: list):
+        with self._lock:
+            self._file.seek(self._offsets[-1])
+            self._file.write(b"".join(encoded))
+            end = self._offsets[-1]
+            for data in encoded:
+                end += len(data)
+                self._offsets.append(end)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SpilledStringList index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        with self._lock:
+            self._file.seek(start)
+            data = self._file.read(end - start)
+        return data.decode("utf-8", "surrogateescape")
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def nbytes(self) -> int:
+        """In-memory footprint (the offsets index)"""
+        return self._offsets.itemsize * len(self._offsets)
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ FILE TIMESTAMP TABLE - Columnar storage for temporal analysis                      ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class FileTimestampTable:
+    """
+    🗓️ COLUMNAR FILE TIMESTAMP TABLE
+    PURPOSE: Hold (path, mtime, ctime, size) for every file without one dict and two
+             datetime objects per file
+    MECHANISM:
+        • mtime / ctime / size live in array('d') / array('q') columns (8 bytes each)
+        • Paths are split into an interned parent-directory table + file name
+        • order_by_mtime() is a stable argsort (numpy when installed)
+        • sessions() cuts the sorted column wherever the gap exceeds the session gap,
+          in one pass (vectorized with numpy)
+        • bucket_counts() groups by local day/month with one datetime per bucket
+        • spill() moves the name column to disk when the memory governor asks
+    Rows are referenced by integer index; callers build dicts only for rows they render.
+    """
+
+    # 0 ≤ t < year 3000 always converts; anything else is checked with fromtimestamp
+    SAFE_TIMESTAMP_MAX = 32503680000.0
+    SORT_RUN = 65536  # Rows per in-memory sort run (pure-Python argsort)
+
+    def __init__(self):
+        self.directories = []  # Interned parent directory paths
+        self._directory_ids = {}
+        self.directory_id = array("I")
+        self.names = []
+        self.mtime = array("d")
+        self.ctime = array("d")
+        self.size = array("q")
+
+    def __len__(self):
+        return len(self.mtime)
+
+    @classmethod
+    def valid_timestamp(cls, value: float) -> bool:
+        """Same acceptance rule as datetime.fromtimestamp(value)"""
+        if 0.0 <= value < cls.SAFE_TIMESTAMP_MAX:
+            return True
+        try:
+            datetime.datetime.fromtimestamp(value)
+            return True
+        except (OSError, ValueError, OverflowError):
+            return False
+
+    def append(self, entry: InventoryEntry):
+        directory_id = self._directory_ids.get(entry.parent)
+        if directory_id is None:
+            directory_id = self._directory_ids[entry.parent] = len(self.directories)
+            self.directories.append(entry.parent)
+        self.directory_id.append(directory_id)
+        self.names.append(entry.name)
+        self.mtime.append(entry.mtime)
+        self.ctime.append(entry.ctime)
+        self.size.append(entry.size)
+
+    def path(self, row: int) -> str:
+        parent = self.directories[self.directory_id[row]]
+        return parent + os.sep + self.names[row] if parent else self.names[row]
+
+    def row(self, row: int) -> dict:
+        """Render-time dict for a single file (path, name, mtime, size)"""
+        return {
+            "path": self.path(row),
+            "name": self.names[row],
+            "mtime": self.mtime[row],
+            "size": self.size[row],
+        }
+
+    def nbytes(self) -> int:
+        """Approximate column memory (arrays + name/directory string tables)"""
+        import sys
+        columns = sum(
+            column.itemsize * len(column)
+            for column in (self.directory_id, self.mtime, self.ctime, self.size)
+        )
+        if isinstance(self.names, SpilledStringList):
+            strings = self.names.nbytes()
+        else:
+            strings = sum(sys.getsizeof(name) for name in self.names) + sys.getsizeof(self.names)
+        strings += sum(sys.getsizeof(directory) for directory in self.directories)
+        return columns + strings
+
+    def spill(self) -> int:
+        """Move the file-name column to disk (memory governor); returns bytes freed"""
+        if isinstance(self.names, SpilledStringList):
+            return 0
+        before = self.nbytes()
+        self.names = SpilledStringList(self.names)
+        return max(0, before - self.nbytes())
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ order_by_mtime / sessions                                                          ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def order_by_mtime(self, positive_only: bool = False):
+        """Row indexes sorted by mtime (stable: ties keep walk order)"""
+        if not len(self.mtime):
+            return array("l")
+        numpy = optional_import("numpy")
+        if numpy is not None:
+            mtimes = numpy.frombuffer(self.mtime, dtype=numpy.float64)
+            order = numpy.argsort(mtimes, kind="stable")
+            if positive_only:
+                order = order[mtimes[order] > 0]
+            return array("l", order.tolist())
+        # Sort fixed-size runs into compact arrays, then k-way merge them: the sort
+        # keys and int objects of only one run are alive at a time (merge is stable
+        # because runs are in row order and heapq.merge prefers earlier runs)
+        import heapq
+        key = self.mtime.__getitem__
+        count = len(self.mtime)
+        runs = [
+            array("l", sorted(range(start, min(start + self.SORT_RUN, count)), key=key))
+            for start in range(0, count, self.SORT_RUN)
+        ]
+        if len(runs) > 1:
+            order = array("l", heapq.merge(*runs, key=key))
+        else:
+            order = runs[0] if runs else array("l")
+        if positive_only:
+            mtime = self.mtime
+            order = array("l", (row for row in order if mtime[row] > 0))
+        return order
+
+    def sessions(self, order, gap_hours: float = 4, min_files: int = 3):
+        """
+        (start, end) half-open ranges over `order` (mtime-sorted rows) where each
+        consecutive modification is at most `gap_hours` after the previous one.
+        Only ranges with at least `min_files` files are returned.
+        """
+        count = len(order)
+        if not count:
+            return []
+        numpy = optional_import("numpy")
+        if numpy is not None:
+            mtimes = numpy.frombuffer(self.mtime, dtype=numpy.float64)[
+                numpy.frombuffer(order, dtype=numpy.dtype(f"i{order.itemsize}"))
+            ]
+            cuts = (numpy.flatnonzero(numpy.diff(mtimes) / 3600 > gap_hours) + 1).tolist()
+        else:
+            mtime = self.mtime
+            cuts = []
+            previous = mtime[order[0]]
+            for position in range(1, count):
+                current = mtime[order[position]]
+                if (current - previous) / 3600 > gap_hours:
+                    cuts.append(position)
+                previous = current
+        bounds = [0] + cuts + [count]
+        return [
+            (start, end)
+            for start, end in zip(bounds, bounds[1:])
+            if end - start >= min_files
+        ]
+
+    def bucket_counts(self, order, period: str = "day") -> dict:
+        """
+        {"YYYY-MM-DD" or "YYYY-MM": file count} over mtime-sorted rows.
+        One datetime per local-time bucket; rows in the last two hours of a bucket
+        are converted individually so DST shifts cannot misplace them.
+        """
+        counts = {}
+        fmt = "%Y-%m-%d" if period == "day" else "%Y-%m"
+        mtime = self.mtime
+        key = None
+        next_check = float("-inf")
+        for row in order:
+            stamp = mtime[row]
+            if stamp >= next_check:
+                moment = datetime.datetime.fromtimestamp(stamp)
+                key = moment.strftime(fmt)
+                try:
+                    if period == "day":
+                        following = datetime.datetime.combine(
+                            moment.date(), datetime.time()
+                        ) + datetime.timedelta(days=1)
+                    elif moment.month == 12:
+                        following = datetime.datetime(moment.year + 1, 1, 1)
+                    else:
+                        following = datetime.datetime(moment.year, moment.month + 1, 1)
+                    next_check = following.timestamp() - 7200
+                except (OverflowError, OSError, ValueError):
+                    next_check = float("-inf")  # Edge of the calendar: convert every row
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ PERSISTENT ANALYSIS CACHE - Incremental per-file results across runs               ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class AnalysisCache:
+    """
+    💾 PERSISTENT INCREMENTAL ANALYSIS CACHE
+    PURPOSE: Skip re-hashing / re-parsing files that did not change since last run
+    STORAGE: SQLite database in <project>/.mrfix-cache/analysis.sqlite3
+    VALIDATION: A cached row is only used when (size, mtime, inode) still match
+    KINDS:
+        • content_hash:<algo> → full-content hash used by duplicate detection
+        • deps     → AST / regex import & export extraction
+        • sniper   → sub-file entity scan
+        • lines    → line count for LOC statistics
+        • quality  → deep-analysis patterns + code-quality metrics
+    VERSIONING: SCHEMA_VERSION covers the table layout; PAYLOAD_VERSIONS covers what
+                each kind stores. A kind whose recorded version differs is dropped on
+                open, so bump its entry whenever the analyzer's payload shape changes.
+    Falls back to a disabled (always-miss) cache when the project is read-only.
+    Under memory pressure spill() drops the preloaded rows; get() then reads one row
+    per call from SQLite.
+    """
+
+    CACHE_DIR_NAME = ".mrfix-cache"
+    DB_NAME = "analysis.sqlite3"
+    SCHEMA_VERSION = "1"
+    PAYLOAD_VERSIONS = {
+        "content_hash": 2,  # Keyed by algorithm; seeded by ContentPipeline
+        "deps": 2,  # Java dotted imports
+        "sniper": 2,  # Entity spans + fingerprints
+        "lines": 2,  # Seeded by ContentPipeline
+        "quality": 2,  # ContentPipeline.quality_entry
+    }
+
+    _registry: Dict[str, "AnalysisCache"] = {}
+    _registry_lock = threading.Lock()
+    enabled_by_default = True  # main() flips this for --no-cache
+
+    def __init__(self, project_path, enabled: bool = True):
+        self.project_path = Path(project_path)
+        self.enabled = enabled
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self._preloaded: Dict[str, dict] = {}
+        self._spilled = False  # True after spill(): per-row SELECTs instead of preloads
+        self._lock = threading.Lock()
+        self._conn = None
+        if enabled:
+            self._open()
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ _open                                                                              ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _open(self):
+        """Open (or create) the cache database; disable the cache on any failure"""
+        try:
+            import sqlite3
+            cache_dir = self.project_path / self.CACHE_DIR_NAME
+            cache_dir.mkdir(exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(cache_dir / self.DB_NAME), check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+            if row is None or row[0] != self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS file_results")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (self.SCHEMA_VERSION,),
+                )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS file_results (
+                       kind TEXT NOT NULL,
+                       path TEXT NOT NULL,
+                       size INTEGER NOT NULL,
+                       mtime REAL NOT NULL,
+                       inode INTEGER NOT NULL,
+                       payload TEXT NOT NULL,
+                       PRIMARY KEY (kind, path)
+                   )"""
+            )
+            self._drop_stale_kinds()
+            self._conn.commit()
+        except Exception as e:
+            logger.error(f"Analysis cache disabled: {e}")
+            self._conn = None
+            self.enabled = False
+
+    def _drop_stale_kinds(self):
+        """Delete the rows of every kind whose payload version changed since they were written"""
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'payload_versions'"
+        ).fetchone()
+        recorded = json.loads(row[0]) if row is not None else {}
+        for kind, version in self.PAYLOAD_VERSIONS.items():
+            if recorded.get(kind) != version:
+                self._conn.execute(
+                    "DELETE FROM file_results WHERE kind = ? OR kind LIKE ?",
+                    (kind, kind + ":%"),
+                )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('payload_versions', ?)",
+            (json.dumps(self.PAYLOAD_VERSIONS, sort_keys=True),),
+        )
+
+    def _preload(self, kind: str) -> dict:
+        """Load every row of one kind in a single query (cheaper than N SELECTs)"""
+        rows = self._preloaded.get(kind)
+        if rows is None:
+            rows = {}
+            for path, size, mtime, inode, payload in self._conn.execute(
+                "SELECT path, size, mtime, inode, payload FROM file_results WHERE kind = ?",
+                (kind,),
+            ):
+                rows[path] = (size, mtime, inode, payload)
+            self._preloaded[kind] = rows
+        return rows
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ get / put                                                                          ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def get(self, kind: str, file_path, entry: Optional[InventoryEntry]):
+        """Cached value for `file_path`, or None when missing or stale"""
+        if not self.enabled or entry is None or entry.size < 0:
+            self.misses[kind] += 1
+            return None
+        with self._lock:
+            if self._spilled:
+                row = self._conn.execute(
+                    "SELECT size, mtime, inode, payload FROM file_results WHERE kind = ? AND path = ?",
+                    (kind, str(file_path)),
+                ).fetchone()
+            else:
+                row = self._preload(kind).get(str(file_path))
+        if row is not None and row[0] == entry.size and row[1] == entry.mtime and (
+            not row[2] or not entry.ino or row[2] == entry.ino
+        ):
+            self.hits[kind] += 1
+            return json.loads(row[3])
+        self.misses[kind] += 1
+        return None
+
+    def put(self, kind: str, file_path, entry: Optional[InventoryEntry], value):
+        """Store a fresh result (written on the next commit())"""
+        if not self.enabled or entry is None or entry.size < 0:
+            return
+        try:
+            payload = json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            return
+        row = (entry.size, entry.mtime, entry.ino, payload)
+        with self._lock:
+            if not self._spilled:
+                self._preload(kind)[str(file_path)] = row
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_results VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, str(file_path)) + row,
+            )
+
+    def commit(self):
+        if self._conn is not None:
+            with self._lock:
+                try:
+                    self._conn.commit()
+                except Exception as e:
+                    logger.error(f"Analysis cache commit failed: {e}")
+
+    def nbytes(self) -> int:
+        """Approximate size of the preloaded payloads"""
+        with self._lock:
+            return sum(
+                len(row[3]) for rows in self._preloaded.values() for row in rows.values()
+            )
+
+    def spill(self) -> int:
+        """Release the preloaded rows (memory governor); returns bytes freed"""
+        freed = self.nbytes()
+        with self._lock:
+            self._preloaded.clear()
+            self._spilled = self._conn is not None
+        return freed
+
+    def stats(self) -> dict:
+        """Hit/miss counters for performance_metrics"""
+        kinds = sorted(set(self.hits) | set(self.misses))
+        return {
+            "enabled": self.enabled,
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "by_kind": {
+                kind: {"hits": self.hits[kind], "misses": self.misses[kind]}
+                for kind in kinds
+            },
+        }
+
+    def reset_stats(self):
+        self.hits.clear()
+        self.misses.clear()
+
+    def get_meta(self, key: str, default=None):
+        """Run-level value stored alongside the per-file results"""
+        if self._conn is None:
+            return default
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def set_meta(self, key: str, value):
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value, default=str)),
+                )
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Analysis cache meta write failed: {e}")
+
+    @classmethod
+    def shared(cls, project_path) -> "AnalysisCache":
+        """One cache per project root per process"""
+        key = os.path.abspath(str(project_path))
+        with cls._registry_lock:
+            cache = cls._registry.get(key)
+            if cache is None:
+                cache = cls(key, enabled=cls.enabled_by_default)
+                cls._registry[key] = cache
+            return cache
+
+    @classmethod
+    def reset(cls, project_path=None):
+        """Commit, close and forget the cache of `project_path` (or all caches)"""
+        with cls._registry_lock:
+            if project_path is None:
+                caches = list(cls._registry.values())
+                cls._registry.clear()
+            else:
+                cache = cls._registry.pop(os.path.abspath(str(project_path)), None)
+                caches = [cache] if cache is not None else []
+        for cache in caches:
+            cache.close()
+
+    def close(self):
+        """Flush pending rows and release the connection (the cache then always misses)"""
+        if self._conn is not None:
+            self.commit()
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+                self._preloaded.clear()
+        self.enabled = False
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ LLM RESPONSE CACHE - Content-addressed OpenAI answers across runs                  ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class LLMResponseCache:
+    """
+    🧠 CONTENT-ADDRESSED LLM RESPONSE CACHE
+    PURPOSE: Skip the Doppler key lookup and the OpenAI round trip when a request is
+             identical to one already answered (unchanged project → zero network calls)
+    KEY: sha256 of the canonical request: model, sampling parameters and messages as
+         sorted-key JSON, with line endings normalized and trailing whitespace stripped
+    STORAGE: SQLite database in <project>/.mrfix-cache/llm.sqlite3
+    EVICTION: rows older than ttl_seconds are ignored and deleted (--llm-cache-ttl);
+              beyond max_bytes the least recently used rows go first
+    Callers put() only after the response parsed, so a malformed answer is retried on
+    the next run instead of being replayed.
+    """
+
+    DB_NAME = "llm.sqlite3"
+    SCHEMA_VERSION = "1"
+
+    _registry: Dict[str, "LLMResponseCache"] = {}
+    _registry_lock = threading.Lock()
+    enabled_by_default = True  # main() flips this for --no-cache
+    ttl_seconds = 7 * 86400  # main() sets this from --llm-cache-ttl HOURS
+    max_bytes = 32 * 1048576
+
+    def __init__(self, project_path, enabled: bool = True):
+        self.project_path = Path(project_path)
+        self.enabled = enabled
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+        self.seconds_saved = 0.0  # Original latency of every answer served from cache
+        self._lock = threading.Lock()
+        self._conn = None
+        if enabled:
+            self._open()
+
+    def _open(self):
+        """Open (or create) the cache database; disable the cache on any failure"""
+        try:
+            import sqlite3
+            cache_dir = self.project_path / AnalysisCache.CACHE_DIR_NAME
+            cache_dir.mkdir(exist_ok=True)
+            self._conn = sqlite3.connect(str(cache_dir / self.DB_NAME), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or row[0] != self.SCHEMA_VERSION:
+                self._conn.execute("DROP TABLE IF EXISTS responses")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (self.SCHEMA_VERSION,),
+                )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                       key TEXT PRIMARY KEY,
+                       label TEXT NOT NULL,
+                       model TEXT,
+                       content TEXT NOT NULL,
+                       seconds REAL NOT NULL,
+                       created REAL NOT NULL,
+                       last_used REAL NOT NULL,
+                       size INTEGER NOT NULL
+                   )"""
+            )
+            self._conn.commit()
+        except Exception as e:
+            logger.error(f"LLM response cache disabled: {e}")
+            self._conn = None
+            self.enabled = False
+
+    @classmethod
+    def canonical(cls, value):
+        """Request with cosmetic prompt differences (CRLF, trailing blanks) removed"""
+        if isinstance(value, str):
+            lines = value.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            return "\n".join(line.rstrip() for line in lines).strip()
+        if isinstance(value, dict):
+            return {str(key): cls.canonical(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls.canonical(item) for item in value]
+        return value
+
+    @classmethod
+    def key_for(cls, request: dict) -> str:
+        import hashlib
+        blob = json.dumps(cls.canonical(request), sort_keys=True, separators=(",", ":"),
+                          ensure_ascii=False, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ get / put                                                                          ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def get(self, label: str, request: dict) -> Optional[str]:
+        """Cached response text for `request`, or None when missing or expired"""
+        if not self.enabled:
+            self.misses[label] += 1
+            return None
+        key = self.key_for(request)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, seconds, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[2] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            elif row is not None:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        if row is None:
+            self.misses[label] += 1
+            return None
+        self.hits[label] += 1
+        self.seconds_saved += row[1]
+        print(f"   ♻️  LLM cache hit: {label} ({request.get('model')}, ~{row[1]:.1f}s saved)")
+        return row[0]
+
+    def put(self, label: str, request: dict, content: str, seconds: float):
+        """Store a parsed response and evict expired / least recently used rows"""
+        if not self.enabled or not isinstance(content, str):
+            return
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.key_for(request), label, request.get("model"), content,
+                     round(seconds, 3), now, now, size),
+                )
+                self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    stale = []
+                    for key, row_size in self._conn.execute(
+                        "SELECT key, size FROM responses ORDER BY last_used"
+                    ):
+                        if total <= self.max_bytes:
+                            break
+                        stale.append((key,))
+                        total -= row_size
+                    self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"LLM response cache write failed: {e}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters for performance_metrics"""
+        labels = sorted(set(self.hits) | set(self.misses))
+        return {
+            "enabled": self.enabled,
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "seconds_saved": round(self.seconds_saved, 2),
+            "by_call": {
+                label: {"hits": self.hits[label], "misses": self.misses[label]}
+                for label in labels
+            },
+        }
+
+    def reset_stats(self):
+        self.hits.clear()
+        self.misses.clear()
+        self.seconds_saved = 0.0
+
+    @classmethod
+    def shared(cls, project_path) -> "LLMResponseCache":
+        """One cache per project root per process"""
+        key = os.path.abspath(str(project_path))
+        with cls._registry_lock:
+            cache = cls._registry.get(key)
+            if cache is None:
+                cache = cls(key, enabled=cls.enabled_by_default)
+                cls._registry[key] = cache
+            return cache
+
+    @classmethod
+    def reset(cls, project_path=None):
+        """Close and forget the cache of `project_path` (or all caches)"""
+        with cls._registry_lock:
+            if project_path is None:
+                caches = list(cls._registry.values())
+                cls._registry.clear()
+            else:
+                cache = cls._registry.pop(os.path.abspath(str(project_path)), None)
+                caches = [cache] if cache is not None else []
+        for cache in caches:
+            cache.close()
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+        self.enabled = False
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ LLM CLIENT - One credential lookup, pooled connections, concurrent asyncio calls   ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class LLMUnavailable(RuntimeError):
+    """No OpenAI credentials; the message says why (callers skip their LLM step)"""
+
+
+class LLMError(RuntimeError):
+    """An LLM request failed after its retries (status is the last HTTP status, if any)"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMClient:
+    """
+    🌐 SHARED LLM CLIENT (one per process)
+    PURPOSE: One credential lookup and one pool of keep-alive connections for every
+             OpenAI call, instead of a `doppler` subprocess and a fresh client per call
+    CREDENTIALS: OPENAI_API_KEY from the environment, else Doppler (ai-tools/dev);
+                 resolved on first use and cached for the process; a failure is cached
+                 for CREDENTIAL_RETRY_SECONDS, so a daemon picks up a key set later
+    ENDPOINT: OPENAI_BASE_URL (default https://api.openai.com/v1); benchmarks point it
+              at a local stub server
+    CONCURRENCY: requests run as asyncio tasks on a private event-loop thread
+        • at most max_concurrency requests in flight (semaphore)
+        • per-attempt timeout (asyncio.wait_for + socket timeout)
+        • retries with exponential backoff and jitter on timeouts, connection
+          errors, 408/409/429 and 5xx
+    complete() blocks for one call, gather() runs a batch concurrently, and
+    background() overlaps a whole LLM stage with non-LLM work.
+    """
+
+    DEFAULT_BASE_URL = "https://api.openai.com/v1"
+    RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+    CREDENTIAL_RETRY_SECONDS = 60.0  # Lifetime of a cached credential failure
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, base_url: str = None, api_key: str = None, max_concurrency: int = 4,
+                 timeout: float = 120.0, retries: int = 2, backoff: float = 0.5):
+        from urllib.parse import urlsplit
+        self.base_url = (base_url or os.environ.get("OPENAI_BASE_URL") or self.DEFAULT_BASE_URL).rstrip("/")
+        endpoint = urlsplit(self.base_url)
+        self._secure = endpoint.scheme == "https"
+        self._host = endpoint.hostname
+        self._port = endpoint.port
+        self._path = endpoint.path + "/chat/completions"
+        self._api_key = api_key
+        self._credential_error = None
+        self._credential_failed_at = 0.0  # time.monotonic() of the last failed lookup
+        self._credentials_lock = threading.Lock()
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self._idle = []  # Keep-alive connections ready for reuse
+        self._idle_lock = threading.Lock()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._semaphore = None  # Created on the loop thread
+        self.stats = Counter()  # requests, retries, failures, connections, credential_lookups
+
+    @classmethod
+    def shared(cls) -> "LLMClient":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ credentials                                                                        ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def api_key(self) -> str:
+        """The process-wide API key (LLMUnavailable when there is none)"""
+        with self._credentials_lock:
+            if self._api_key is None and (
+                self._credential_error is None
+                or time.monotonic() - self._credential_failed_at >= self.CREDENTIAL_RETRY_SECONDS
+            ):
+                self.stats["credential_lookups"] += 1
+                self._api_key, self._credential_error = self._resolve_api_key()
+                self._credential_failed_at = time.monotonic()
+        if self._api_key is None:
+            raise LLMUnavailable(self._credential_error)
+        return self._api_key
+
+    @staticmethod
+    def _resolve_api_key():
+        """(key, None) or (None, reason)"""
+        key = os.environ.get("OPENAI_API_KEY", "").strip()
+        if key:
+            return key, None
+        import subprocess
+        try:
+            result = subprocess.run(
+                ["doppler", "secrets", "get", "OPENAI_API_KEY", "--project", "ai-tools",
+                 "--config", "dev", "--plain"],
+                capture_output=True, text=True, timeout=30,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None, "Doppler not configured (ai-tools/dev)"
+        if result.returncode != 0:
+            return None, "Doppler not configured (ai-tools/dev)"
+        key = result.stdout.strip()
+        if not key or key.startswith("Error"):
+            return None, "OPENAI_API_KEY not found in Doppler"
+        return key, None
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ pooled HTTP                                                                        ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _connection(self, timeout: float):
+        with self._idle_lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            import http.client
+            self.stats["connections"] += 1
+            factory = http.client.HTTPSConnection if self._secure else http.client.HTTPConnection
+            connection = factory(self._host, self._port, timeout=timeout)
+        elif connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection
+
+    def _post(self, api_key: str, body: bytes, timeout: float):
+        """One blocking POST on a pooled connection → (status, payload bytes)"""
+        connection = self._connection(timeout)
+        try:
+            connection.request("POST", self._path, body=body, headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            })
+            response = connection.getresponse()
+            payload = response.read()
+        except BaseException:
+            connection.close()  # Never return a half-used connection to the pool
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            with self._idle_lock:
+                self._idle.append(connection)
+        return response.status, payload
+
+    @staticmethod
+    def _error_message(payload: bytes) -> str:
+        try:
+            return json.loads(payload).get("error", {}).get("message", "Unknown error")
+        except (ValueError, AttributeError):
+            return payload[:200].decode("utf-8", "replace") or "Unknown error"
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ asyncio core                                                                       ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    async def acomplete(self, request: dict, timeout: float = None) -> str:
+        """Message content of one chat completion (bounded, timed out, retried)"""
+        import asyncio
+        import http.client
+        import random
+        timeout = timeout or self.timeout
+        api_key = await asyncio.to_thread(self.api_key)
+        body = json.dumps(request).encode("utf-8")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                self.stats["requests"] += 1
+                try:
+                    status, payload = await asyncio.wait_for(
+                        asyncio.to_thread(self._post, api_key, body, timeout), timeout
+                    )
+                except (asyncio.TimeoutError, OSError, http.client.HTTPException) as e:
+                    error = LLMError(f"{type(e).__name__}: {e}" if str(e) else f"timed out after {timeout:.0f}s")
+                else:
+                    if status == 200:
+                        return json.loads(payload)["choices"][0]["message"]["content"]
+                    error = LLMError(self._error_message(payload), status)
+                    if status not in self.RETRY_STATUSES:
+                        break
+                if attempt < self.retries:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random() / 2))
+        self.stats["failures"] += 1
+        raise error
+
+    def _event_loop(self):
+        import asyncio
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="mrfix-llm", daemon=True).start()
+            return self._loop
+
+    def _submit(self, coroutine):
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(coroutine, self._event_loop())
+
+    def complete(self, request: dict, timeout: float = None) -> str:
+        """Blocking form of acomplete()"""
+        return self._submit(self.acomplete(request, timeout)).result()
+
+    def gather(self, requests: dict, timeout: float = None) -> dict:
+        """{label: content or the exception it raised} for independent requests, run concurrently"""
+        import asyncio
+
+        async def run_all():
+            labels = list(requests)
+            answers = await asyncio.gather(
+                *(self.acomplete(requests[label], timeout) for label in labels), return_exceptions=True
+            )
+            return dict(zip(labels, answers))
+
+        return self._submit(run_all()).result()
+
+    def background(self, func, *args):
+        """Run a blocking LLM stage off the caller's thread; returns a concurrent Future"""
+        import asyncio
+        return self._submit(asyncio.to_thread(func, *args))
+
+    def summary(self) -> dict:
+        return {"endpoint": self.base_url, "max_concurrency": self.max_concurrency, **self.stats}
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ PROMPT COMPACTION - Token-budgeted LLM context, map-reduce chunks for huge trees   ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class PromptCompactor:
+    """
+    🗜️ TOKEN-BUDGETED PROMPT COMPACTION
+    PURPOSE: Layer 3 and GPT-5 prompts stay the same size whether the project has
+             1k or 1M files, so LLM latency and cost no longer follow tree size
+    MECHANISM (deterministic: same analysis → same prompt → LLMResponseCache hit):
+        • tokens ≈ ceil(chars / 4) of the compact JSON (no tokenizer dependency)
+        • directories ranked by priority, then files + 2 × subdirs, then path
+        • an unknown subtree collapses into its topmost unknown directory: one
+          aggregate {path, files, subdirs, dirs} instead of one row per folder
+        • repeated paths are dropped and shown relative to the project
+        • ranked sections are cut from the tail until the payload fits its budget;
+          "_omitted" tells the model how many items each section lost
+    MAP-REDUCE: items that need more than one chunk (very large trees) are split
+    into at most max_chunks chunks of chunk_tokens and sent together through
+    LLMClient.gather(); the caller merges the answers. The chunk count is capped,
+    so a run costs one round of parallel calls at any size.
+    """
+
+    budget_tokens = 3000  # main() sets this from --prompt-budget TOKENS
+    max_chunks = 4
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, budget_tokens: int = None, max_chunks: int = None):
+        self.budget_tokens = max(256, budget_tokens or type(self).budget_tokens)
+        self.chunk_tokens = self.budget_tokens // 2
+        self.max_chunks = max(1, max_chunks or type(self).max_chunks)
+        self.reports = {}  # label → what compaction did for that prompt
+
+    @classmethod
+    def shared(cls) -> "PromptCompactor":
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance.budget_tokens != max(256, cls.budget_tokens):
+                cls._instance = cls()
+            return cls._instance
+
+    def reset_stats(self):
+        self.reports = {}
+
+    def stats(self) -> dict:
+        return {"budget_tokens": self.budget_tokens, "max_chunks": self.max_chunks, **self.reports}
+
+    def record(self, label: str, **report):
+        self.reports.setdefault(label, {}).update(report)
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ measuring and ranking                                                              ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @staticmethod
+    def tokens(value) -> int:
+        text = value if isinstance(value, str) else json.dumps(value, separators=(",", ":"), default=str)
+        return (len(text) + 3) // 4
+
+    @staticmethod
+    def rank_directories(purposes: dict) -> list:
+        """[(path, info)] most important first (high priority, then size, then path)"""
+        return sorted(
+            purposes.items(),
+            key=lambda item: (
+                item[1].get("priority") != "high",
+                -(item[1].get("files", 0) + 2 * item[1].get("subdirs", 0)),
+                item[0],
+            ),
+        )
+
+    @staticmethod
+    def collapse_unknown(purposes: dict):
+        """
+        Fold every unknown directory into its topmost unknown ancestor
+        Returns (aggregates ranked by size, {aggregate path: [member paths]})
+        """
+        unknown = [path for path, info in purposes.items() if info.get("purpose") == "unknown"]
+        top = {}  # Parents first, so an unknown parent already knows its own top
+        members = defaultdict(list)
+        for path in sorted(unknown, key=lambda path: path.count(os.sep)):
+            top[path] = top.get(os.path.dirname(path), path)
+            members[top[path]].append(path)
+        aggregates = []
+        for top, paths in members.items():
+            paths.sort()
+            aggregate = {
+                "path": top,
+                "files": sum(purposes[path].get("files", 0) for path in paths),
+                "subdirs": purposes[top].get("subdirs", 0),
+            }
+            if len(paths) > 1:
+                aggregate["dirs"] = len(paths)
+            aggregates.append(aggregate)
+        aggregates.sort(key=lambda a: (-(a["files"] + 2 * a.get("dirs", 1)), a["path"]))
+        return aggregates, dict(members)
+
+    def directory_digest(self, purposes: dict) -> list:
+        """Ranked {path, purpose, files} rows; unknown subtrees come last, one row each"""
+        aggregates, members = self.collapse_unknown(purposes)
+        folded = {path for paths in members.values() for path in paths}
+        rows = [
+            {"path": path, "purpose": info.get("purpose", "unknown"), "files": info.get("files", 0)}
+            for path, info in self.rank_directories(purposes)
+            if path not in folded
+        ]
+        return rows + [dict(aggregate, purpose="unknown") for aggregate in aggregates]
+
+    @staticmethod
+    def dedupe_paths(paths, root=None, seen: set = None) -> list:
+        """Paths relative to root, first occurrence only (seen carries over between calls)"""
+        seen = set() if seen is None else seen
+        prefix = str(root).rstrip(os.sep) + os.sep if root else None
+        unique = []
+        for path in paths:
+            path = str(path)
+            if prefix and path.startswith(prefix):
+                path = path[len(prefix):]
+            if path not in seen:
+                seen.add(path)
+                unique.append(path)
+        return unique
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ fitting a payload into its budget                                                  ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def fit(self, payload: dict, trim_order: list, budget: int = None) -> dict:
+        """
+        Copy of payload within budget tokens: sections in trim_order (least valuable
+        first, each already ranked) keep their longest prefix that still fits
+        """
+        budget = budget or self.budget_tokens
+        payload = dict(payload)
+        omitted = {}
+        for section in trim_order:
+            items = payload.get(section)
+            if not isinstance(items, (list, dict)) or not items:
+                continue
+            pairs = list(items.items()) if isinstance(items, dict) else list(items)
+            # Every item costs at least 2 chars, so no more than 2 × budget can ever fit
+            pairs = pairs[: 2 * budget]
+
+            def prefix(count):
+                return dict(pairs[:count]) if isinstance(items, dict) else pairs[:count]
+
+            def fits(count):
+                payload[section] = prefix(count)
+                if count < len(items):
+                    omitted[section] = len(items) - count
+                    payload["_omitted"] = omitted
+                else:
+                    omitted.pop(section, None)
+                return self.tokens(payload) <= budget
+
+            if fits(len(pairs)) and len(pairs) == len(items):
+                break
+            low, high = 0, len(pairs)
+            while low < high:  # Longest prefix that fits
+                middle = (low + high + 1) // 2
+                if fits(middle):
+                    low = middle
+                else:
+                    high = middle - 1
+            if fits(low):
+                break
+        if not omitted:
+            payload.pop("_omitted", None)
+        return payload
+
+    def chunks(self, items: list, chunk_tokens: int = None, max_items: int = None):
+        """
+        Split ranked items into ≤ max_chunks chunks of ≤ chunk_tokens (and ≤ max_items,
+        which bounds the answer size) → (chunks, items left over)
+        """
+        chunk_tokens = chunk_tokens or self.chunk_tokens
+        chunks, current, size = [], [], 1
+        for index, item in enumerate(items):
+            cost = self.tokens(item) + 1
+            if current and (size + cost > chunk_tokens or len(current) == max_items):
+                chunks.append(current)
+                if len(chunks) == self.max_chunks:
+                    return chunks, len(items) - index
+                current, size = [], 1
+            current.append(item)
+            size += cost
+        if current:
+            chunks.append(current)
+        return chunks, 0
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ map step: one concurrent LLM round over the chunks                                 ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def map_chunks(self, label: str, chunks: list, build_request, parse, llm_cache=None):
+        """
+        Ask the LLM about every chunk at once
+        build_request(chunk, index, total) → request dict; parse(content) → result
+        Returns (results in chunk order, errors); cached answers are replayed, and
+        LLMUnavailable propagates (no credentials means no chunk can succeed)
+        """
+        requests = {index: build_request(chunk, index, len(chunks)) for index, chunk in enumerate(chunks)}
+        answers = {}
+        for index, request in requests.items():
+            content = llm_cache.get(label, request) if llm_cache is not None else None
+            if content is not None:
+                answers[index] = (content, None)
+        pending = {index: request for index, request in requests.items() if index not in answers}
+        if pending:
+            started = time.perf_counter()
+            fetched = LLMClient.shared().gather(pending)
+            seconds = time.perf_counter() - started
+            for index, content in fetched.items():
+                if isinstance(content, LLMUnavailable):
+                    raise content
+                answers[index] = (content, seconds)
+        results, errors = [], []
+        for index in sorted(answers):
+            content, seconds = answers[index]
+            if isinstance(content, Exception):
+                errors.append(f"chunk {index + 1}/{len(chunks)}: {content}")
+                continue
+            try:
+                results.append(parse(content))
+            except (ValueError, TypeError, AttributeError) as e:
+                errors.append(f"chunk {index + 1}/{len(chunks)}: unparseable answer ({e})")
+                continue
+            if seconds is not None and llm_cache is not None:
+                llm_cache.put(label, requests[index], content, seconds)
+        self.record(label, chunks=len(chunks), chunk_errors=len(errors), cached_chunks=len(chunks) - len(pending))
+        return results, errors
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ HEADLESS OUTPUT - --format json|ndjson stage records (no HTML rendering)           ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class StageRecordWriter:
+    """
+    📤 MACHINE-READABLE STAGE RECORDS
+    PURPOSE: Give CI the analysis numbers without building the HTML report
+    FORMATS:
+        • ndjson → one JSON object per line, flushed as each stage completes
+        • json   → a single document {project, stages[], summary} written at the end
+    Progress output goes to stderr while a writer is active (see main), so stdout
+    carries only records.
+    """
+
+    FORMATS = ("json", "ndjson")
+
+    def __init__(self, fmt: str, project: str, stream=None):
+        import sys
+        self.fmt = fmt
+        self.project = project
+        self.stream = stream if stream is not None else sys.stdout
+        self.records = []
+
+    def emit(self, stage: str, data, seconds: float):
+        record = {
+            "type": "stage",
+            "project": self.project,
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            "data": self.jsonable(data),
+        }
+        if self.fmt == "ndjson":
+            self._write(record)
+        else:
+            self.records.append(record)
+
+    def finish(self, summary: dict):
+        record = {"type": "summary", "project": self.project, **self.jsonable(summary)}
+        if self.fmt == "ndjson":
+            self._write(record)
+        else:
+            self.stream.write(
+                json.dumps(
+                    {"project": self.project, "stages": self.records, "summary": record},
+                    indent=2,
+                    default=str,
+                )
+                + "\n"
+            )
+            self.stream.flush()
+
+    @classmethod
+    def jsonable(cls, value):
+        """Stage results use Path keys and sets; make them JSON-encodable"""
+        if isinstance(value, dict):
+            return {
+                key if isinstance(key, (str, int, float, bool)) or key is None else str(key):
+                cls.jsonable(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return [cls.jsonable(item) for item in value]
+        return value
+
+    def _write(self, record: dict):
+        self.stream.write(json.dumps(record, default=str) + "\n")
+        self.stream.flush()
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ CHECKPOINTS - Persisted stage outputs for --resume                                 ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class CheckpointStore:
+    """
+    💾 STAGE CHECKPOINTS (--resume)
+    PURPOSE: Turn a run killed by the time limit or OOM into partial progress: every
+             completed stage's output is persisted, and --resume reuses it
+    STORAGE: <project>/.mrfix-cache/checkpoints/<flow>/<stage>.json + manifest.json
+    VALIDATION: one fingerprint per run = tree fingerprint (path, size, mtime of every
+                file; order-independent) + ignore files read + analysis configuration +
+                script hash.
+                A fresh run or a different fingerprint discards the old checkpoints.
+    SAVED ONLY WHEN COMPLETE: stages that finished after abort_analysis, past the time
+                limit or under memory-governor sampling reductions are not saved
+    ENCODING: tagged JSON (tuples, sets, Paths, defaultdicts, non-string keys,
+              timestamp tables), never pickle, so a checked-in cache cannot run code
+    A store built without a project path is a pass-through (run() just computes).
+    """
+
+    DIR_NAME = "checkpoints"
+    FORMAT_VERSION = 1
+    TREE_SKIP_DIRS = frozenset({AnalysisCache.CACHE_DIR_NAME, ".git"})  # Our own writes / VCS metadata
+    DEFAULT_FACTORIES = {"int": int, "float": float, "list": list, "dict": dict, "set": set, "str": str}
+
+    def __init__(self, project_path=None, flow: str = "run", fingerprint: str = None, resume: bool = False):
+        self.flow = flow
+        self.fingerprint = fingerprint
+        self.resume = resume
+        self.enabled = project_path is not None
+        self.directory = (
+            Path(project_path) / AnalysisCache.CACHE_DIR_NAME / self.DIR_NAME / flow
+            if self.enabled else None
+        )
+        self.restored = []
+        self.saved = []
+        self.skipped = {}  # stage -> reason it was not saved
+        self._lock = threading.Lock()
+        self._manifest = {"version": self.FORMAT_VERSION, "fingerprint": fingerprint, "stages": {}}
+        if self.enabled:
+            self._open()
+
+    def _open(self):
+        """Keep the previous manifest for --resume when it matches, else start over"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            manifest_file = self.directory / "manifest.json"
+            previous = None
+            if manifest_file.exists():
+                previous = json.loads(manifest_file.read_text(encoding="utf-8"))
+            if (
+                self.resume
+                and previous
+                and previous.get("version") == self.FORMAT_VERSION
+                and previous.get("fingerprint") == self.fingerprint
+            ):
+                self._manifest = previous
+            else:
+                if self.resume and previous:
+                    print("♻️  Checkpoints are stale (tree or configuration changed); starting over")
+                for stale in self.directory.glob("*.json"):
+                    stale.unlink()
+                self._write_manifest()
+        except (OSError, ValueError) as e:
+            logger.error(f"Checkpoints disabled: {e}")
+            self.enabled = False
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ fingerprint                                                                        ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @classmethod
+    def fingerprint_for(cls, inventory: "FileInventory", config: dict) -> str:
+        """Hash of the tree (sum of per-file hashes), its ignore rules, the configuration and this script"""
+        import hashlib
+        total = 0
+        count = 0
+        for entry in inventory.iter_files(cls.TREE_SKIP_DIRS):
+            key = f"{entry.path}\0{entry.size}\0{entry.mtime}".encode("utf-8", "surrogateescape")
+            total += int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+            count += 1
+        try:
+            with open(__file__, "rb") as f:
+                script = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+        except OSError:
+            script = None
+        document = {
+            "tree": f"{count}:{total & 0xFFFFFFFFFFFFFFFF:016x}",
+            "ignore": sorted(inventory.ignore_sources.items()) if inventory.honor_ignore else None,
+            "config": config,
+            "script": script,
+        }
+        return hashlib.blake2b(
+            json.dumps(document, sort_keys=True, default=str).encode(), digest_size=16
+        ).hexdigest()
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ load / save / run                                                                  ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def load(self, stage: str):
+        """(True, value) for a checkpoint this run may reuse, else (False, None)"""
+        if not (self.enabled and self.resume) or stage not in self._manifest["stages"]:
+            return False, None
+        try:
+            with open(self.directory / f"{stage}.json", encoding="utf-8") as f:
+                value = self.decode(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Checkpoint {stage} unreadable: {e}")
+            return False, None
+        with self._lock:
+            self.restored.append(stage)
+        return True, value
+
+    def save(self, stage: str, value, seconds: float = None):
+        if not self.enabled:
+            return
+        try:
+            payload = json.dumps(self.encode(value), separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            self.skip(stage, f"not serializable: {e}")
+            return
+        try:
+            target = self.directory / f"{stage}.json"
+            partial = target.with_suffix(".tmp")
+            partial.write_text(payload, encoding="utf-8")
+            os.replace(partial, target)  # Atomic: a kill mid-write leaves the old state
+            with self._lock:
+                self._manifest["stages"][stage] = {
+                    "saved_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "seconds": round(seconds, 3) if seconds is not None else None,
+                    "bytes": len(payload),
+                }
+                self.saved.append(stage)
+                self._write_manifest()
+        except OSError as e:
+            self.skip(stage, str(e))
+
+    def skip(self, stage: str, reason: str):
+        with self._lock:
+            self.skipped[stage] = reason
+
+    def _write_manifest(self):
+        manifest_file = self.directory / "manifest.json"
+        partial = manifest_file.with_suffix(".tmp")
+        partial.write_text(json.dumps(self._manifest, indent=2), encoding="utf-8")
+        os.replace(partial, manifest_file)
+
+    @staticmethod
+    def complete(owner) -> bool:
+        """A stage result is worth saving: no abort, time limit, or sampling reduction"""
+        if getattr(owner, "abort_analysis", False) or GOVERNOR.degraded("reduce"):
+            return False
+        check_time_limit = getattr(owner, "check_time_limit", None)
+        return not (check_time_limit is not None and check_time_limit())
+
+    def run(self, stage: str, compute, owner=None, attrs=()):
+        """
+        compute() or its checkpointed result. `attrs` are instance attributes of
+        `owner` the stage sets; they are saved and restored with the result.
+        """
+        found, saved = self.load(stage)
+        if found:
+            for name, value in saved["attrs"].items():
+                setattr(owner, name, value)
+            print(f"♻️  {stage}: restored from checkpoint")
+            if "result_attr" in saved:
+                return saved["attrs"][saved["result_attr"]]
+            return saved["result"]
+        started = time.time()
+        result = compute()
+        if not self.enabled:
+            return result
+        if not self.complete(owner):
+            self.skip(stage, "incomplete (aborted, time limit or reduced sampling)")
+            return result
+        snapshot = {"attrs": {name: getattr(owner, name) for name in attrs if hasattr(owner, name)}}
+        shared = next((name for name, value in snapshot["attrs"].items() if value is result), None)
+        if shared is not None:
+            snapshot["result_attr"] = shared  # Same object: store it once
+        else:
+            snapshot["result"] = result
+        self.save(stage, snapshot, time.time() - started)
+        return result
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "resume": self.resume,
+                "directory": str(self.directory) if self.directory else None,
+                "restored": list(self.restored),
+                "saved": list(self.saved),
+                "skipped": dict(self.skipped),
+            }
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ encode / decode                                                                    ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @classmethod
+    def encode(cls, value):
+        """Plain JSON for plain data; {"__t": tag, ...} for everything else"""
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, list):
+            return [cls.encode(item) for item in value]
+        if isinstance(value, dict):
+            if type(value) is dict and "__t" not in value and all(isinstance(key, str) for key in value):
+                return {key: cls.encode(item) for key, item in value.items()}
+            encoded = {
+                "__t": "dict",
+                "items": [[cls.encode(key), cls.encode(item)] for key, item in value.items()],
+            }
+            if isinstance(value, defaultdict):
+                factory = getattr(value.default_factory, "__name__", None)
+                if factory not in cls.DEFAULT_FACTORIES:
+                    raise TypeError(f"defaultdict({value.default_factory!r})")
+                encoded["default"] = factory
+            elif isinstance(value, Counter):
+                encoded["counter"] = True
+            return encoded
+        if isinstance(value, tuple):
+            return {"__t": "tuple", "items": [cls.encode(item) for item in value]}
+        if isinstance(value, (set, frozenset)):
+            return {"__t": "set", "items": [cls.encode(item) for item in value]}
+        if isinstance(value, Path):
+            return {"__t": "path", "value": str(value)}
+        if isinstance(value, datetime.datetime):
+            return {"__t": "datetime", "value": value.isoformat()}
+        if isinstance(value, FileTimestampTable):
+            return {
+                "__t": "timestamps",
+                "directories": value.directories,
+                "directory_id": value.directory_id.tolist(),
+                "names": list(value.names),
+                "mtime": value.mtime.tolist(),
+                "ctime": value.ctime.tolist(),
+                "size": value.size.tolist(),
+            }
+        raise TypeError(f"{type(value).__name__} is not checkpointable")
+
+    @classmethod
+    def decode(cls, value):
+        if isinstance(value, list):
+            return [cls.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        tag = value.get("__t")
+        if tag is None:
+            return {key: cls.decode(item) for key, item in value.items()}
+        if tag == "dict":
+            items = [(cls.decode(key), cls.decode(item)) for key, item in value["items"]]
+            if "default" in value:
+                return defaultdict(cls.DEFAULT_FACTORIES[value["default"]], items)
+            return Counter(dict(items)) if value.get("counter") else dict(items)
+        if tag == "tuple":
+            return tuple(cls.decode(item) for item in value["items"])
+        if tag == "set":
+            return {cls.decode(item) for item in value["items"]}
+        if tag == "path":
+            return Path(value["value"])
+        if tag == "datetime":
+            return datetime.datetime.fromisoformat(value["value"])
+        if tag == "timestamps":
+            table = FileTimestampTable()
+            table.directories = value["directories"]
+            table._directory_ids = {directory: i for i, directory in enumerate(table.directories)}
+            table.directory_id = array("I", value["directory_id"])
+            table.names = value["names"]
+            table.mtime = array("d", value["mtime"])
+            table.ctime = array("d", value["ctime"])
+            table.size = array("q", value["size"])
+            return table
+        raise ValueError(f"Unknown checkpoint tag: {tag}")
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ TRACING - Nested spans + counters, exported as Chrome trace_event JSON (--trace)   ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+def _current_rss_mb() -> Optional[float]:
+    """Resident set size; without psutil, the process high-water mark (ru_maxrss)"""
+    psutil = optional_import("psutil")
+    if psutil is not None:
+        try:
+            return psutil.Process().memory_info().rss / 1024 / 1024
+        except Exception:
+            return None
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024  # bytes vs KB
+    except Exception:
+        return None
+
+
+class _Span:
+    """One open span; closed by the with-statement that opened it"""
+
+    __slots__ = ("tracer", "name", "category", "args", "start", "rss_peak")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+        self.rss_peak = None
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.rss_peak = _current_rss_mb()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        rss = _current_rss_mb()
+        if rss is not None:
+            self.rss_peak = max(rss, self.rss_peak or 0.0)
+        stack = self.tracer._stack()
+        stack.pop()
+        if stack and self.rss_peak is not None:
+            parent = stack[-1]
+            parent.rss_peak = max(parent.rss_peak or 0.0, self.rss_peak)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self, end)
+        return False
+
+
+class Tracer:
+    """
+    ⏱️ SPAN / COUNTER TRACER
+    PURPOSE: Show which stage (hashing, AST parsing, sniper regexes, LLM calls,
+             HTML building) a slow run spent its time and memory in
+    MECHANISM:
+        • span(name) context manager / traced(name) decorator → nested,
+          per-thread spans with wall time and peak RSS
+        • count(files=..., bytes=...) adds counters to the innermost open span
+        • chrome_trace() → trace_event JSON (chrome://tracing, Perfetto)
+        • summary() → per-span-name totals for the report
+    Disabled (the default) span() returns one shared no-op context and count()
+    returns immediately, so instrumented hot paths cost a single flag check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._null = contextlib.nullcontext()
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self._origin = time.perf_counter()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ span / traced / count                                                              ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def span(self, name: str, category: str = "stage", **args):
+        if not self.enabled:
+            return self._null
+        return _Span(self, name, category, args)
+
+    def traced(self, name: str, category: str = "stage"):
+        """Decorator form of span()"""
+        def decorate(func):
+            import functools
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, category, {}):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, **counters):
+        """Add counters (files=, bytes=, ...) to the innermost open span"""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        if stack:
+            args = stack[-1].args
+            for key, value in counters.items():
+                args[key] = args.get(key, 0) + value
+
+    def _record(self, span: _Span, end: float):
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": round((span.start - self._origin) * 1e6, 1),
+            "dur": round((end - span.start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": dict(span.args),
+        }
+        if span.rss_peak is not None:
+            event["args"]["rss_peak_mb"] = round(span.rss_peak, 1)
+        with self._lock:
+            self.events.append(event)
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ chrome_trace / summary / write                                                     ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def chrome_trace(self) -> dict:
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+        threads = sorted({event["tid"] for event in events})
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+             "args": {"name": "main" if tid == threading.main_thread().ident else f"worker-{tid}"}}
+            for tid in threads
+        ]
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> list:
+        """[{name, calls, total_ms, max_ms, files, bytes, rss_peak_mb}] slowest first"""
+        rows = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            row = rows.setdefault(event["name"], {
+                "name": event["name"], "category": event["cat"], "calls": 0,
+                "total_ms": 0.0, "max_ms": 0.0, "files": 0, "bytes": 0, "rss_peak_mb": None,
+            })
+            duration = event["dur"] / 1000
+            row["calls"] += 1
+            row["total_ms"] += duration
+            row["max_ms"] = max(row["max_ms"], duration)
+            row["files"] += event["args"].get("files", 0)
+            row["bytes"] += event["args"].get("bytes", 0)
+            rss = event["args"].get("rss_peak_mb")
+            if rss is not None:
+                row["rss_peak_mb"] = max(row["rss_peak_mb"] or 0.0, rss)
+        for row in rows.values():
+            row["total_ms"] = round(row["total_ms"], 2)
+            row["max_ms"] = round(row["max_ms"], 2)
+        return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+    def write(self, path) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return str(path)
+
+
+TRACER = Tracer()  # Process-wide; main() enables it for --trace
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ MEMORY GOVERNOR - Per-stage budgets with stepwise degradation                      ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class MemoryGovernor:
+    """
+    🧯 BUDGET-DRIVEN MEMORY GOVERNOR
+    PURPOSE: Keep a run inside its memory budget by degrading in steps
+             (spill → reduce sampling → drop detail) instead of aborting everything
+    MECHANISM:
+        • start(budget_mb) picks the cheapest current-memory reading available:
+          psutil RSS → /proc/self/statm → tracemalloc (offset by the
+          resource.getrusage baseline; started only when nothing else works)
+        • stage(name) scopes a per-stage budget: a stage may grow at most
+          STAGE_SHARE of the run budget above the usage it started with
+        • register(name, size=, spill=, reduce=, drop=) → resident structures offer
+          actions; stages consult degraded(level) / sample_limit(n) for in-flight data
+        • checkpoint() (stage loops) escalates as usage crosses THRESHOLDS of the
+          tighter budget, running registered actions largest-first on the caller's thread
+        • The background sampler only tracks the peak, forces the next checkpoint when
+          over budget and calls on_abort once every level is spent and usage stayed over
+          budget for ABORT_GRACE seconds (immediately past HARD_LIMIT)
+        • report() lists every degradation for performance_metrics and the HTML report
+    Inactive (the default) stage() is a no-op context and checkpoint() returns at once.
+    """
+
+    LEVELS = ("spill", "reduce", "drop")
+    THRESHOLDS = {"spill": 0.70, "reduce": 0.85, "drop": 0.95}
+    SAMPLE_FACTORS = {"reduce": 0.5, "drop": 0.25}  # sample_limit() scale per level
+    STAGE_SHARE = 0.5  # Default per-stage growth budget (fraction of the run budget)
+    HARD_LIMIT = 1.25  # Abort past this multiple of the budget, degraded or not
+    ABORT_GRACE = 5.0  # Seconds over budget (every level applied) before aborting
+    CHECK_INTERVAL = 0.05  # Seconds between real readings in checkpoint()
+
+    def __init__(self):
+        self.active = False
+        self.budget_mb = None
+        self.source = None
+        self.level = None  # Highest degradation level applied (None = full fidelity)
+        self.peak_mb = 0.0
+        self.aborted = False
+        self.degradations = []
+        self.stage_budgets = {}  # Explicit per-stage budgets (MB), by stage name
+        self._stage_stats = {}
+        self._structures = {}
+        self._notes = set()
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._null = contextlib.nullcontext()
+        self._reader = None
+        self._on_abort = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._force_check = False
+        self._over_since = None
+        self._last_check = 0.0
+        self._started_at = 0.0
+        self._started_tracemalloc = False
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ start / stop                                                                       ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def start(self, budget_mb: float, on_abort=None, interval: float = 1.0):
+        self.stop()
+        with self._lock:
+            self.budget_mb = float(budget_mb)
+            self.level = None
+            self.aborted = False
+            self.degradations = []
+            self._stage_stats = {}
+            self._structures = {}
+            self._notes = set()
+            self._on_abort = on_abort
+            self._force_check = False
+            self._over_since = None
+            self._started_at = time.perf_counter()
+            self._reader, self.source = self._select_reader()
+            self.peak_mb = self._read() or 0.0
+            self.active = True
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._sample, args=(interval,), name="memory-governor", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """End the run: registered structures are released, the report is kept"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        with self._lock:
+            self.active = False
+            self._structures = {}
+        if self._started_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _select_reader(self):
+        """(reader, source name) → reader() returns current usage in MB"""
+        psutil = optional_import("psutil")
+        if psutil is not None:
+            process = psutil.Process()
+            return (lambda: process.memory_info().rss / 1048576), "psutil"
+        try:
+            page_size = os.sysconf("SC_PAGE_SIZE")
+            with open("/proc/self/statm", "rb") as f:
+                int(f.read().split()[1])
+
+            def read_statm():
+                with open("/proc/self/statm", "rb") as f:
+                    return int(f.read().split()[1]) * page_size / 1048576
+
+            return read_statm, "procfs"
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+        # Python-heap growth on top of the process high-water mark at start
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        offset = (_current_rss_mb() or 0.0) - tracemalloc.get_traced_memory()[0] / 1048576
+        return (lambda: offset + tracemalloc.get_traced_memory()[0] / 1048576), "tracemalloc"
+
+    def _read(self) -> Optional[float]:
+        try:
+            return self._reader() if self._reader is not None else None
+        except Exception:
+            return None
+
+    def _sample(self, interval: float):
+        """Background sampler: peak tracking and the last-resort abort"""
+        while not self._stop.wait(interval):
+            usage = self._read()
+            if usage is None:
+                continue
+            now = time.perf_counter()
+            with self._lock:
+                self.peak_mb = max(self.peak_mb, usage)
+                if usage < self.budget_mb or self.aborted:
+                    self._over_since = None
+                    continue
+                self._force_check = True  # Escalate at the next stage checkpoint
+                if self.level == self.LEVELS[-1] and self._over_since is None:
+                    self._over_since = now  # Give the last degradation time to work
+                spent = self._over_since is not None and now - self._over_since >= self.ABORT_GRACE
+                if spent or usage > self.budget_mb * self.HARD_LIMIT:
+                    self.aborted = True
+                    self._record("abort", None, usage, self.budget_mb, "budget",
+                                 detail="over budget after all degradations")
+                    print(f"⚠️ Memory limit exceeded: {usage:.0f} MB of {self.budget_mb:.0f} MB, aborting")
+                    on_abort = self._on_abort
+                else:
+                    on_abort = None
+            if on_abort is not None:
+                on_abort()
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ stage / register                                                                   ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name: str, budget_mb: float = None):
+        """Context scoping `name`'s budget (default: STAGE_SHARE of the run budget)"""
+        if not self.active:
+            return self._null
+        return self._stage_scope(name, budget_mb)
+
+    @contextlib.contextmanager
+    def _stage_scope(self, name: str, budget_mb: float = None):
+        if budget_mb is None:
+            budget_mb = self.stage_budgets.get(name, self.budget_mb * self.STAGE_SHARE)
+        entry_mb = self._read() or 0.0
+        stack = self._stack()
+        stack.append((name, entry_mb, budget_mb))
+        try:
+            self.checkpoint(force=True)
+            yield
+        finally:
+            stack.pop()
+            exit_mb = self._read() or entry_mb
+            with self._lock:
+                stats = self._stage_stats.setdefault(
+                    name, {"entry_mb": round(entry_mb, 1), "budget_mb": round(budget_mb, 1), "peak_mb": 0.0}
+                )
+                stats["peak_mb"] = round(max(stats["peak_mb"], exit_mb), 1)
+                stats["exit_mb"] = round(exit_mb, 1)
+
+    def register(self, name: str, size=None, spill=None, reduce=None, drop=None):
+        """
+        Offer a resident structure's degradation actions (zero-argument callables;
+        a returned int is taken as bytes freed). Actions run on whichever stage
+        thread crosses the threshold, so they must tolerate concurrent readers.
+        Registrations end with the run (stop()).
+        """
+        if not self.active:
+            return
+        actions = {"size": size, "spill": spill, "reduce": reduce, "drop": drop}
+        with self._lock:
+            self._structures[name] = actions
+            applied = [
+                level for level in self.LEVELS
+                if self._reached(level) and (level, name) not in self._notes
+            ]
+        # A structure registered after escalation catches up immediately
+        for level in applied:
+            if actions[level] is not None:
+                self._apply(name, actions, level, self._read() or 0.0, self.budget_mb, "late")
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ checkpoint / degraded / sample_limit / note                                        ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def checkpoint(self, force: bool = False) -> Optional[str]:
+        """Re-read usage and escalate if needed; returns the current level"""
+        if not self.active:
+            return self.level
+        now = time.perf_counter()
+        if not (force or self._force_check) and now - self._last_check < self.CHECK_INTERVAL:
+            return self.level
+        self._last_check = now
+        self._force_check = False
+        usage = self._read()
+        if usage is None:
+            return self.level
+        limit, scope = self.budget_mb, "budget"
+        stack = self._stack()
+        if stack:
+            name, entry_mb, budget_mb = stack[-1]
+            if entry_mb + budget_mb < limit:
+                limit, scope = entry_mb + budget_mb, f"stage:{name}"
+        pending = []
+        with self._lock:
+            self.peak_mb = max(self.peak_mb, usage)
+            for level in self.LEVELS:
+                if usage < limit * self.THRESHOLDS[level]:
+                    break
+                if not self._reached(level):
+                    self.level = level
+                    pending.append(level)
+            structures = list(self._structures.items())
+        for level in pending:
+            acting = [(name, actions) for name, actions in structures if actions[level] is not None]
+            acting.sort(key=lambda item: self._size(item[1]), reverse=True)
+            print(
+                f"🧯 Memory {usage:.0f} MB of {limit:.0f} MB ({scope}) → {level}: "
+                + (", ".join(name for name, _ in acting) or "stages notified")
+            )
+            if not acting:
+                with self._lock:
+                    self._record(level, None, usage, limit, scope, detail="level reached")
+            for name, actions in acting:
+                self._apply(name, actions, level, usage, limit, scope)
+        return self.level
+
+    def _reached(self, level: str) -> bool:
+        return self.level is not None and self.LEVELS.index(self.level) >= self.LEVELS.index(level)
+
+    def degraded(self, level: str) -> bool:
+        """True once `level` (or a later one) has been applied in this run"""
+        return self._reached(level)
+
+    def sample_limit(self, count: int, structure: str) -> int:
+        """`count` scaled down for the current level (unchanged below "reduce")"""
+        factor = self.SAMPLE_FACTORS.get(self.level, 1.0) if self.level else 1.0
+        limited = max(1, int(count * factor)) if factor < 1.0 else count
+        if limited < count:
+            self.note("reduce", structure, f"{count:,} → {limited:,}")
+        return limited
+
+    def note(self, level: str, structure: str, detail: str = None):
+        """Record a degradation a stage applied itself (once per level + structure)"""
+        with self._lock:
+            if (level, structure) in self._notes:
+                return
+            self._notes.add((level, structure))
+            usage = self._read() or self.peak_mb
+            self._record(level, structure, usage, self.budget_mb, "stage", detail=detail)
+
+    @staticmethod
+    def _size(actions: dict) -> int:
+        try:
+            return int(actions["size"]()) if actions["size"] is not None else 0
+        except Exception:
+            return 0
+
+    def _apply(self, name: str, actions: dict, level: str, usage: float, limit: float, scope: str):
+        before = self._size(actions)
+        try:
+            freed = actions[level]()
+        except Exception as e:
+            logger.error(f"Memory governor: {level} of {name} failed: {e}")
+            return
+        if not isinstance(freed, int):
+            freed = max(0, before - self._size(actions)) if actions["size"] is not None else None
+        with self._lock:
+            self._notes.add((level, name))
+            self._record(level, name, usage, limit, scope, freed_bytes=freed)
+
+    def _record(self, level, structure, usage, limit, scope, detail=None, freed_bytes=None):
+        """Append one degradation (caller holds the lock)"""
+        stack = self._stack()
+        self.degradations.append(
+            {
+                "level": level,
+                "structure": structure,
+                "stage": stack[-1][0] if stack else None,
+                "scope": scope,
+                "usage_mb": round(usage, 1),
+                "limit_mb": round(limit, 1),
+                "freed_mb": round(freed_bytes / 1048576, 2) if freed_bytes is not None else None,
+                "detail": detail,
+                "at_seconds": round(time.perf_counter() - self._started_at, 3),
+            }
+        )
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ report                                                                             ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "budget_mb": round(self.budget_mb, 1) if self.budget_mb else None,
+                "source": self.source,
+                "peak_mb": round(self.peak_mb, 1),
+                "level": self.level or "full",
+                "aborted": self.aborted,
+                "degradations": list(self.degradations),
+                "stages": {name: dict(stats) for name, stats in self._stage_stats.items()},
+            }
+
+
+GOVERNOR = MemoryGovernor()  # Process-wide; start_memory_monitor() starts it per run
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ STAGE GRAPH - Declared pipeline DAG with per-run memoization                       ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class StageGraph:
+    """
+    🧩 MEMOIZED STAGE DAG EXECUTOR
+    PURPOSE: Run each pipeline stage at most once per analysis run, no matter how
+             many consumers ask for its output
+    MECHANISM:
+        • add(name, func, deps) declares a stage; func receives its dependencies'
+          outputs as keyword arguments
+        • run(targets) executes the needed sub-graph, submitting every stage whose
+          dependencies are done to a thread pool (independent stages overlap)
+        • get(name) returns a memoized output, computing it (and its deps) on demand
+        • seed(name, value) installs an output restored from a checkpoint; its
+          dependencies are then only computed if another stage needs them
+        • Every request after the first is counted as "reused"
+    """
+
+    def __init__(self, max_workers: int = 4, on_complete=None):
+        self.max_workers = max(1, max_workers)
+        self.on_complete = on_complete  # Callback(name, value, seconds) per computed stage
+        self._stages = {}  # name -> (func, deps)
+        self._futures = {}  # name -> Future (memo of started/finished stages)
+        self._lock = threading.RLock()
+        self.metrics = {}  # name -> {"seconds", "computed", "reused"}
+
+    def add(self, name: str, func, deps=()):
+        self._stages[name] = (func, tuple(deps))
+        self.metrics.setdefault(name, {"seconds": 0.0, "computed": 0, "reused": 0})
+        return self
+
+    def seed(self, name: str, value):
+        """Mark `name` as computed with `value` (restored, not recomputed)"""
+        from concurrent.futures import Future
+        future = Future()
+        future.set_result(value)
+        with self._lock:
+            self._futures[name] = future
+            self.metrics[name]["restored"] = True
+        return self
+
+    def restore(self, targets, load) -> list:
+        """
+        Seed stages for which load(name) → (True, value), walking down from `targets`
+        and stopping at every restored stage (its own inputs are then not needed)
+        """
+        restored = []
+        seen = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            found, value = load(name)
+            if found:
+                self.seed(name, value)
+                restored.append(name)
+            else:
+                stack.extend(self._stages[name][1])
+        return restored
+
+    def _closure(self, targets) -> list:
+        """Targets plus everything they depend on, in topological order"""
+        order, state = [], {}
+        for target in targets:
+            stack = [(target, False)]
+            while stack:
+                name, expanded = stack.pop()
+                if expanded:
+                    if state.get(name) != "done":
+                        state[name] = "done"
+                        order.append(name)
+                    continue
+                if state.get(name) is not None:
+                    if state[name] == "visiting":
+                        raise ValueError(f"Stage cycle through {name}")
+                    continue
+                if name not in self._stages:
+                    raise KeyError(f"Unknown stage: {name}")
+                if name in self._futures:
+                    state[name] = "done"  # Started or seeded: its deps are not needed
+                    order.append(name)
+                    continue
+                state[name] = "visiting"
+                stack.append((name, True))
+                for dep in reversed(self._stages[name][1]):
+                    if state.get(dep) != "done":
+                        stack.append((dep, False))
+        return order
+
+    def _execute(self, name: str):
+        func, deps = self._stages[name]
+        inputs = {dep: self._futures[dep].result() for dep in deps}
+        for dep in deps:
+            self._count(dep)
+        stage_start = time.time()
+        with TRACER.span(name), GOVERNOR.stage(name):
+            value = func(**inputs)
+        seconds = time.time() - stage_start
+        with self._lock:
+            self.metrics[name]["seconds"] = round(seconds, 4)
+            self.metrics[name]["computed"] += 1
+        if self.on_complete is not None:
+            with self._lock:  # Callbacks (record writers) are not thread-safe
+                self.on_complete(name, value, seconds)
+        return value
+
+    def _count(self, name: str):
+        """A consumer asked for `name`: the first request computes, the rest reuse"""
+        with self._lock:
+            requests = self.metrics[name].setdefault("_requests", 0) + 1
+            self.metrics[name]["_requests"] = requests
+            if requests > 1:
+                self.metrics[name]["reused"] += 1
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ run / get                                                                          ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def run(self, targets):
+        """
+        Compute `targets` (and their deps), submitting each stage as soon as its
+        dependencies are done. A failed stage fails its dependents only; read
+        outputs with get(), which re-raises the stage's exception.
+        """
+        from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+        with self._lock:
+            pending = [name for name in self._closure(targets) if name not in self._futures]
+        if not pending:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = set()
+            while pending or running:
+                scheduled = True
+                while scheduled:
+                    scheduled = False
+                    for name in list(pending):
+                        dep_futures = [self._futures.get(dep) for dep in self._stages[name][1]]
+                        if not all(future is not None and future.done() for future in dep_futures):
+                            continue
+                        pending.remove(name)
+                        scheduled = True
+                        failed = next((f for f in dep_futures if f.exception() is not None), None)
+                        with self._lock:
+                            if failed is not None:
+                                future = self._futures[name] = Future()
+                                future.set_exception(failed.exception())
+                            else:
+                                future = self._futures[name] = pool.submit(self._execute, name)
+                                running.add(future)
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+
+    def get(self, name: str):
+        """Memoized output of one stage (computed serially on first use)"""
+        from concurrent.futures import Future
+        with self._lock:
+            future = self._futures.get(name)
+        if future is None:
+            for stage in self._closure([name]):
+                with self._lock:
+                    if stage in self._futures:
+                        continue
+                    future = self._futures[stage] = Future()
+                try:
+                    future.set_result(self._execute(stage))
+                except Exception as e:
+                    future.set_exception(e)
+            future = self._futures[name]
+        self._count(name)
+        return future.result()
+
+    def summary(self) -> dict:
+        """Per-stage wall time and computed/reused counters for results"""
+        stages = {
+            name: {key: value for key, value in metric.items() if not key.startswith("_")}
+            for name, metric in self.metrics.items()
+        }
+        return {
+            "stages": stages,
+            "computed": sum(metric["computed"] for metric in stages.values()),
+            "reused": sum(metric["reused"] for metric in stages.values()),
+        }
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ LAZY PATTERN TABLES - Regex tables compiled on first use, not at import            ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class LazyPatterns:
+    """
+    📐 CLASS-LEVEL REGEX TABLE, COMPILED ON FIRST ACCESS
+    PURPOSE: Keep import cheap. Compiling ~30 entity patterns at class creation cost
+             ~20 ms on every start, even for runs that never scan a file
+    MECHANISM:
+        • Holds (pattern, label[, flags]) specs; the first attribute read compiles
+          them into [(compiled_regex, label)] and keeps that list for every instance
+        • Compiling twice under a race is harmless (same result, last write wins)
+    """
+
+    def __init__(self, *specs):
+        self.specs = specs
+        self.compiled = None
+
+    def __get__(self, instance, owner=None):
+        if self.compiled is None:
+            self.compiled = [(re.compile(pattern, *flags), label) for pattern, label, *flags in self.specs]
+        return self.compiled
+
+
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ READ-ONCE CONTENT PIPELINE - One read per file, bytes fanned out to analyzers      ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class FileContent:
+    """One file's bytes (bytes, or an mmap for large files), text decoded on first use"""
+
+    __slots__ = ("path", "suffix", "data", "size", "mapped", "error", "_text", "_text_error", "_lossy")
+
+    def __init__(self, path, data=None, mapped: bool = False, error: Exception = None, lossy: str = None):
+        self.path = Path(path)
+        self.suffix = self.path.suffix
+        self.data = data
+        self.size = len(data) if data is not None else 0
+        self.mapped = mapped
+        self.error = error
+        self._text = None
+        self._text_error = None
+        self._lossy = lossy
+
+    @staticmethod
+    def _universal_newlines(text: str) -> str:
+        return text.replace("\r\n", "\n").replace("\r", "\n") if "\r" in text else text
+
+    @property
+    def text(self) -> str:
+        """What open(path, "r", encoding="utf-8").read() returns (same exceptions too)"""
+        if self._text is None:
+            if self.error is not None:
+                raise self.error
+            if self._text_error is not None:
+                raise self._text_error
+            try:
+                self._text = self._universal_newlines(str(self.data, "utf-8"))
+            except UnicodeDecodeError as e:
+                self._text_error = e
+                raise
+        return self._text
+
+    @property
+    def lossy_text(self) -> str:
+        """Same, with errors="ignore" (undecodable bytes dropped)"""
+        if self._lossy is None:
+            if self.error is not None:
+                raise self.error
+            self._lossy = self._universal_newlines(str(self.data, "utf-8", "ignore"))
+        return self._lossy
+
+    def close(self):
+        if self.mapped:
+            self.data.close()
+        self.data = None
+
+
+class ContentPipeline:
+    """
+    📖 READ-ONCE CONTENT PIPELINE
+    PURPOSE: Every analyzed file is opened and read once per run, and the same bytes
+             go to each registered analyzer (the parse stage used to read a source
+             file twice, then the LOC count read it a third time)
+    READING: one read() below MMAP_THRESHOLD, a read-only mmap above it. Text is
+             decoded once, on first use, with the open(..., "r") semantics the
+             analyzers had before (strict UTF-8, universal newlines).
+             When every selected analyzer only looks at a prefix (patterns,
+             quality), just that prefix is read.
+    ANALYZERS (ContentPipeline.register(name) → function(pipeline, FileContent)):
+        • hash      full-content duplicate digest   → content_hash:<algo> cache
+        • loc       line count (readlines() semantics) → lines cache
+        • imports   import/export extraction          → deps cache
+        • entities  sniper entity scan                → sniper cache
+        • patterns  deep-analysis patterns, first 10 KB ┐→ quality cache
+        • quality   code-quality metrics, first 10 KB   ┘
+    ACCOUNTING: run() returns what it read. The process that owns the run sums it
+                with account(), so --jobs N workers are counted too. summary()
+                compares bytes_read with the inventory size of the files read:
+                read_amplification 1.0 means every byte was read exactly once.
+    """
+
+    MMAP_THRESHOLD = 1024 * 1024
+    QUALITY_PREFIX_CHARS = 10240  # perform_deep_analysis has always looked at 10 KB
+    DEFAULT_ANALYZERS = ("hash", "loc", "imports", "entities", "patterns", "quality")
+    ANALYZERS = {}  # name → function(pipeline, content)
+    PREFIX_CHARS = {}  # name → chars it needs, for analyzers that only read a prefix
+
+    @classmethod
+    def register(cls, name: str, prefix_chars: int = None):
+        def decorator(func):
+            cls.ANALYZERS[name] = func
+            if prefix_chars:
+                cls.PREFIX_CHARS[name] = prefix_chars
+            return func
+        return decorator
+
+    def __init__(self, analyzers=None, helper=None):
+        self.analyzers = tuple(analyzers or self.DEFAULT_ANALYZERS)
+        self.helper = helper
+        self._helpers = {}
+        self.stats = Counter()  # files_read, bytes_read, tree_bytes, mmap_files, read_errors
+        self.analyzer_seconds = Counter()
+
+    def helper_for(self, method: str):
+        """The caller's analyzer when it has `method`, else a stateless instance of its class"""
+        if hasattr(self.helper, method):
+            return self.helper
+        helper = self._helpers.get(method)
+        if helper is None:
+            owner = MrFixMyProjectPlease if hasattr(MrFixMyProjectPlease, method) else UltraThinkMermaidMaximizer
+            helper = self._helpers[method] = owner.__new__(owner)  # Helpers are stateless; skip __init__
+        return helper
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ read / run                                                                         ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def read(self, path, prefix_chars: int = None) -> FileContent:
+        """The file's bytes in one read (mmap when large), or its first prefix_chars of text"""
+        try:
+            if prefix_chars:
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    text = f.read(prefix_chars)
+                    content = FileContent(path, lossy=text)
+                    content.size = f.buffer.tell()
+                    return content
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size >= self.MMAP_THRESHOLD:
+                    import mmap
+                    try:
+                        return FileContent(path, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), mapped=True)
+                    except (ValueError, OSError):
+                        pass  # Special file or mmap unsupported: plain read
+                return FileContent(path, f.read())
+        except OSError as e:
+            return FileContent(path, error=e)
+
+    def run(self, path, analyzers=None):
+        """Read `path` once, run the analyzers on it → ({name: result}, read info)"""
+        analyzers = tuple(analyzers or self.analyzers)
+        prefix = None
+        if all(name in self.PREFIX_CHARS for name in analyzers):
+            prefix = max(self.PREFIX_CHARS[name] for name in analyzers)
+        content = self.read(path, prefix)
+        outputs = {}
+        seconds = {}
+        try:
+            for name in analyzers:
+                started = time.perf_counter()
+                try:
+                    outputs[name] = self.ANALYZERS[name](self, content)
+                except Exception:
+                    outputs[name] = None  # Analyzers report their own errors; None = no result
+                seconds[name] = time.perf_counter() - started
+        finally:
+            content.close()
+        read = {"bytes": content.size, "mmap": content.mapped, "error": content.error is not None,
+                "seconds": seconds}
+        return outputs, read
+
+    @staticmethod
+    def quality_entry(outputs: dict) -> Optional[dict]:
+        """The "quality" cache row perform_deep_analysis stores (None without both analyzers)"""
+        patterns, quality = outputs.get("patterns"), outputs.get("quality")
+        if patterns is None or quality is None:
+            return None
+        return {"content_length": quality["char_count"], "patterns": patterns, "quality": quality}
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ accounting                                                                         ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def account(self, read: dict, tree_bytes: int = None):
+        self.stats["files_read"] += 1
+        self.stats["bytes_read"] += read["bytes"]
+        self.stats["tree_bytes"] += max(0, tree_bytes or 0)
+        self.stats["mmap_files"] += read["mmap"]
+        self.stats["read_errors"] += read["error"]
+        self.analyzer_seconds.update(read["seconds"])
+
+    def summary(self) -> dict:
+        stats = self.stats
+        return {
+            "analyzers": list(self.analyzers),
+            "files_read": stats["files_read"],
+            "bytes_read": stats["bytes_read"],
+            "tree_bytes": stats["tree_bytes"],
+            "read_amplification": (
+                round(stats["bytes_read"] / stats["tree_bytes"], 3) if stats["tree_bytes"] else None
+            ),
+            "mmap_files": stats["mmap_files"],
+            "read_errors": stats["read_errors"],
+            "analyzer_ms": {name: round(seconds * 1000, 1) for name, seconds in self.analyzer_seconds.items()},
+        }
+
+
+@ContentPipeline.register("hash")
+def _content_hash(pipeline: ContentPipeline, content: FileContent) -> str:
+    if content.error is not None:
+        return None
+    digest = new_duplicate_hasher()
+    digest.update(content.data)
+    return digest.hexdigest()
+
+
+@ContentPipeline.register("loc")
+def _content_lines(pipeline: ContentPipeline, content: FileContent) -> int:
+    try:
+        text = content.text
+    except (OSError, UnicodeDecodeError):
+        return None  # Not counted, as before (readlines() raised)
+    return text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+
+
+@ContentPipeline.register("imports")
+def _content_imports(pipeline: ContentPipeline, content: FileContent) -> dict:
+    return pipeline.helper_for("_analyze_file_dependencies")._analyze_file_dependencies(content.path, content)
+
+
+@ContentPipeline.register("entities")
+def _content_entities(pipeline: ContentPipeline, content: FileContent) -> dict:
+    return pipeline.helper_for("_sniper_entity_scan")._sniper_entity_scan(content.path, content)
+
+
+@ContentPipeline.register("patterns", prefix_chars=ContentPipeline.QUALITY_PREFIX_CHARS)
+def _content_patterns(pipeline: ContentPipeline, content: FileContent) -> list:
+    text = content.lossy_text[: ContentPipeline.QUALITY_PREFIX_CHARS]
+    return pipeline.helper_for("detect_patterns").detect_patterns(text, content.suffix)
+
+
+@ContentPipeline.register("quality", prefix_chars=ContentPipeline.QUALITY_PREFIX_CHARS)
+def _content_quality(pipeline: ContentPipeline, content: FileContent) -> dict:
+    text = content.lossy_text[: ContentPipeline.QUALITY_PREFIX_CHARS]
+    return pipeline.helper_for("analyze_code_quality").analyze_code_quality(text, content.suffix)
+
 
-        start_idx = -1
-        end_idx = -1
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ PARALLEL SOURCE PARSING - Process-pool workers for --jobs N                        ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+_PARSE_WORKER_PIPELINE = None
+
+
+def _parse_source_batch(batch: list, analyzer=None) -> list:
+    """
+    Read and analyze one chunk of source files → [(path_str, outputs, read), ...]
+    outputs holds one result per ContentPipeline analyzer; read is what the single
+    read of that file cost. Runs inside ProcessPoolExecutor workers (analyzer=None)
+    or inline on the main thread for --jobs 1. Only plain dicts/lists/strings cross
+    the process boundary so results stay small and picklable.
+    """
+    global _PARSE_WORKER_PIPELINE
+    if analyzer is None:
+        if _PARSE_WORKER_PIPELINE is None:
+            # No analyzer instance: the pipeline builds stateless helpers (no __init__)
+            _PARSE_WORKER_PIPELINE = ContentPipeline()
+        pipeline = _PARSE_WORKER_PIPELINE
+    else:
+        pipeline = ContentPipeline(helper=analyzer)
+    return [(path_str, *pipeline.run(path_str)) for path_str in batch]
 
-        for i, line in enumerate(self.lines):
-            if start_marker in line:
-                start_idx = i
-            elif end_marker in line:
-                end_idx = i
-                break
-        
-        if start_idx != -1 and end_idx != -1:
-            new_content_with_newlines = [line + '\n' for line in map_lines]
-            
-            current_content = self.lines[start_idx + 1 : end_idx]
-            if current_content != new_content_with_newlines:
-                self.lines[start_idx + 1 : end_idx] = new_content_with_newlines
-                self.modified = True
-                print("   🗺️ ASCII section map updated.")
 
 # ASCII_SECTION_MAP_START
 # ASCII_SECTION_MAP_END
@@ -2298,6 +5783,7 @@ class MrFixMyProjectPlease:
         - Interactive HTML report with dark theme and responsive design
         - Bilingual support (EN/PT) with automatic language detection
         - Machine-readable JSON data for programmatic access
+        - Headless JSON / NDJSON stage records (--format json|ndjson, no HTML)
         - Actionable insights and prioritized recommendations
         - ULTRATHINK dependency visualization suite
 
@@ -2353,13 +5839,12 @@ class MrFixMyProjectPlease:
         # Project path resolution
         self.project_path = Path(project_path).resolve()
         # Internationalization system
-        self.current_lang = "en"  # Default language
-        self.translations = self.get_translations()
+        self.current_lang = "en"  # Default language (tables load on first t(); see translations)
         # ╔════════════════════════════════════════════════════════════════════════════════════╗
         # ║ PERFORMANCE CONSTRAINTS                                                            ║
         # ╚════════════════════════════════════════════════════════════════════════════════════╝
         self.MAX_ANALYSIS_TIME = 180  # Maximum analysis time: 3 minutes
-        self.MAX_MEMORY_GB = 2.0  # Maximum memory usage: 2GB
+        self.MAX_MEMORY_GB = 2.0  # Memory budget: 2GB (--memory-budget MB); see MemoryGovernor
         self.MAX_FILES_FOR_DEEP_ANALYSIS = (
             2000  # Files to analyze deeply before sampling
         )
@@ -2373,6 +5858,16 @@ class MrFixMyProjectPlease:
         self.COMPREHENSIVE_THRESHOLD = (
             5000  # Auto-enable comprehensive if <5000 files detected
         )
+        self.MAX_WORKERS = 1  # --jobs N: worker processes for per-file parsing
+        self.DEEP_SAMPLE_SIZE = None  # Deep-analysis files per project (None = scale with time budget)
+        self.RIPPLE_MAX_DEPTH = None  # Transitive impact hops (None = unbounded)
+        self.stage_writer = None  # --format json|ndjson: StageRecordWriter, skips HTML
+        self.stage_graph = None  # StageGraph of the running analyze_and_heal (memoized stages)
+        self.resume = False  # --resume: reuse checkpointed stages whose fingerprint matches
+        self.checkpoints = None  # CheckpointStore of the running analysis
+        self.render_html = True  # False: skip the HTML report (--serve analyze requests)
+        self.report_dir = None  # Directory for the HTML report (None = current directory)
+        self.reuse_inventory = False  # --serve: the daemon walked the tree right before this run
         # ╔════════════════════════════════════════════════════════════════════════════════════╗
         # ║ [%] ANALYSIS STATE TRACKING                                                        ║
         # ╚════════════════════════════════════════════════════════════════════════════════════╝
@@ -2437,6 +5932,19 @@ class MrFixMyProjectPlease:
             "scale_efficiency": 10,
         }
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ translations                                                                       ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    _translations_table = None  # Built by the first instance that needs it, then shared
+
+    @property
+    def translations(self) -> dict:
+        """EN/PT string tables, built on first lookup (not per instance at startup)"""
+        table = MrFixMyProjectPlease._translations_table
+        if table is None:
+            table = MrFixMyProjectPlease._translations_table = self.get_translations()
+        return table
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ get_translations                                                                   ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
     def get_translations(self):
@@ -2714,40 +6222,23 @@ class MrFixMyProjectPlease:
     def start_memory_monitor(self):
         """
         🛡️ MEMORY PROTECTION SYSTEM
-        PURPOSE: Monitor memory usage and prevent system overload by automatically
-                 aborting analysis when memory limits are exceeded
+        PURPOSE: Keep the run inside self.MAX_MEMORY_GB by degrading step by step
+                 (spill → reduce sampling → drop detail) before giving up
         MECHANISM:
-            • Background thread runs every 5 seconds
-            • Monitors RSS (Resident Set Size) memory usage
-            • Triggers graceful abort when self.MAX_MEMORY_GB (2GB) exceeded
-            • Daemon thread exits automatically when main program ends
-        SAFETY: Prevents system memory exhaustion during large project analysis
-        CRITICAL FIX #3: Graceful degradation when psutil not installed
-        """
-        # CRITICAL FIX #3: Check if psutil available
-        if psutil is None:
-            print("⚠️  psutil not installed; memory monitoring disabled")
-            print("   Install with: pip install psutil")
-            return
-        def monitor():
-            """Inner monitoring function - runs in background thread"""
-            while not self.abort_analysis:
-                try:
-                    # Get current process memory usage in GB
-                    process = psutil.Process()
-                    memory_gb = process.memory_info().rss / 1024 / 1024 / 1024
-                    # Emergency abort if memory limit exceeded
-                    if memory_gb > self.MAX_MEMORY_GB:
-                        print(f"⚠️ Memory limit exceeded: {memory_gb:.1f}GB")
-                        self.abort_analysis = True
-                    # Check every 5 seconds
-                    time.sleep(5)
-                except:
-                    # Exit monitoring on any error (process termination, etc.)
-                    break
-        # Start daemon thread (auto-cleans when program exits)
-        self.memory_monitor_thread = threading.Thread(target=monitor, daemon=True)
-        self.memory_monitor_thread.start()
+            • Starts the process-wide MemoryGovernor with this run's budget
+            • Registers the analysis cache's preloaded rows as spillable
+            • Stages register their own structures and call GOVERNOR.checkpoint()
+            • abort_analysis is raised only once every degradation is spent
+        CRITICAL FIX #3: Works without psutil (/proc or tracemalloc readings);
+        performance_metrics["memory"] reports which degradations happened.
+        """
+        def abort():
+            self.abort_analysis = True
+
+        self.abort_analysis = False
+        self.memory_monitor_thread = GOVERNOR.start(self.MAX_MEMORY_GB * 1024, on_abort=abort)
+        cache = AnalysisCache.shared(self.project_path)
+        GOVERNOR.register("analysis_cache", size=cache.nbytes, spill=cache.spill)
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ check_time_limit                                                                   ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
@@ -3051,32 +6542,58 @@ class MrFixMyProjectPlease:
         """
         print("🚀 Starting MAXIMUM INFORMATION EXTRACTION...")
         self.start_time = time.time()
+        # Fresh run → fresh shared inventory (built lazily by the first stage)
+        FileInventory.reset(self.project_path)
+        AnalysisCache.shared(self.project_path).reset_stats()
+        LLMResponseCache.shared(self.project_path).reset_stats()
+        PromptCompactor.shared().reset_stats()
         # Start monitoring
         self.start_memory_monitor()
         try:
+            # Completed stages are persisted as they finish; --resume restores them
+            checkpoints = self._open_checkpoints("max_extraction")
             # Stage 1: Surface scan (always optimized)
             print("[?] Stage 1: Surface Mapping...")
-            self.surface_scan = self.perform_optimized_surface_scan()
+            with TRACER.span("surface_scan"), GOVERNOR.stage("surface_scan"):
+                self.surface_scan = checkpoints.run(
+                    "surface_scan", self.perform_optimized_surface_scan, self
+                )
+                TRACER.count(files=self.surface_scan.get("summary", {}).get("total_files", 0))
             # Stage 1.5: EMERGENT PURPOSE DISCOVERY (NEW!)
+            # Reads only root files; its LLM round trip overlaps stages 2-4, and
+            # Stage 5 (Layer 2) is the first reader of initial_purpose_map
             print("🔬 Stage 1.5: Intelligent Purpose Discovery...")
-            self.initial_purpose_map = self.discover_emergent_purpose_layer1()
+            purpose_layer1 = LLMClient.shared().background(
+                checkpoints.run, "purpose_layer1", self.discover_emergent_purpose_layer1, self
+            )
             # Stage 2: Strategy determination
             print("🧠 Stage 2: Strategy Determination...")
-            strategy = self.determine_analysis_strategy(self.surface_scan)
+            with TRACER.span("strategy"):
+                strategy = checkpoints.run(
+                    "strategy", lambda: self.determine_analysis_strategy(self.surface_scan), self
+                )
             print(
                 f"📋 Strategy: {strategy['strategy']} (Confidence: {strategy['confidence']:.0%})"
             )
             # Stage 3: Adaptive execution
             print("⚡ Stage 3: Adaptive Execution...")
-            analysis_results = self.execute_adaptive_analysis(strategy)
+            with TRACER.span("adaptive_execution", strategy=strategy["strategy"]), GOVERNOR.stage("adaptive_execution"):
+                analysis_results = checkpoints.run(
+                    "adaptive_execution", lambda: self.execute_adaptive_analysis(strategy), self
+                )
             # Stage 4: Maximum insight generation
             print("💡 Stage 4: Maximum Insight Generation...")
-            self.ecosystem_intelligence = self.generate_maximum_insights(
-                self.surface_scan, analysis_results, strategy
-            )
+            with TRACER.span("insights"):
+                self.ecosystem_intelligence = checkpoints.run(
+                    "insights",
+                    lambda: self.generate_maximum_insights(self.surface_scan, analysis_results, strategy),
+                    self,
+                )
+            self.initial_purpose_map = purpose_layer1.result()
             # Stage 5: Advanced Analysis (NEW!)
             print("🔬 Stage 5: Advanced Analysis...")
-            self.run_advanced_analysis()
+            with TRACER.span("advanced_analysis"):
+                self.run_advanced_analysis()
             # Performance metrics
             total_time = time.time() - self.start_time
             self.performance_metrics = self.calculate_performance_metrics(total_time)
@@ -3085,6 +6602,8 @@ class MrFixMyProjectPlease:
             print(f"❌ Analysis error: {e}")
             # Emergency fallback
             self.execute_emergency_fallback(e)
+        finally:
+            GOVERNOR.stop()
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ ZONE 5: CORE ANALYSIS PIPELINE                                                     ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
@@ -3096,6 +6615,7 @@ class MrFixMyProjectPlease:
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ EMERGENT PURPOSE DISCOVERY SYSTEM (3-LAYER ANALYSIS)                               ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @TRACER.traced("llm:purpose_layer1", "llm")
     def discover_emergent_purpose_layer1(self) -> dict:
         """
         🔬 LAYER 1: SUPERFICIAL LLM-GUIDED SCREENING
@@ -3120,8 +6640,6 @@ class MrFixMyProjectPlease:
             }
         """
         try:
-            import subprocess
-            from openai import OpenAI
             from pathlib import Path
             print("   📂 Reading strategic root files...")
             # STEP 1: Identify strategic files to read
@@ -3163,13 +6681,15 @@ class MrFixMyProjectPlease:
                             files_read += 1
                     except:
                         pass
-            # Get root-level folder names
+            # Get root-level folder names (own listing: runs alongside the inventory walk)
+            rules = IgnoreMatcher.directory_rules(str(self.project_path)) if FileInventory.honor_ignore_files else ()
             root_folders = []
             for item in self.project_path.iterdir():
                 if (
                     item.is_dir()
                     and not item.name.startswith(".")
-                    and item.name not in ["node_modules", "__pycache__"]
+                    and item.name not in DEFAULT_SKIP_DIRS
+                    and not IgnoreMatcher.ignored(rules, item.name, True)
                 ):
                     root_folders.append(item.name)
             if not strategic_files_content:
@@ -3181,31 +6701,7 @@ class MrFixMyProjectPlease:
                 }
             print(f"   ✅ Read {files_read} strategic files")
             print("   🤖 Asking LLM for initial purpose map...")
-            # STEP 2: LLM Analysis
-            result = subprocess.run(
-                [
-                    "doppler",
-                    "secrets",
-                    "get",
-                    "OPENAI_API_KEY",
-                    "--project",
-                    "ai-tools",
-                    "--config",
-                    "dev",
-                    "--plain",
-                ],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                return {
-                    "root_purpose": "Unknown - Doppler not configured",
-                    "folder_purposes": {},
-                    "strategic_files_read": list(strategic_files_content.keys()),
-                    "confidence": 0.0,
-                }
-            api_key = result.stdout.strip()
-            client = OpenAI(api_key=api_key)
+            # STEP 2: LLM Analysis (replayed from LLMResponseCache for an identical prompt)
             prompt = f"""Analyze this project's PURPOSE using strategic files and folder names.
 **STRATEGIC FILES CONTENT:**
 {json.dumps(strategic_files_content, indent=2)[:3000]}
@@ -3223,21 +6719,37 @@ class MrFixMyProjectPlease:
   "confidence": 0.85
 }}
 Keep descriptions CONCISE and PURPOSE-FOCUSED."""
-            response = client.chat.completions.create(
-                model="gpt-4o",  # 🚀 UPGRADED TO GPT-4O (LATEST MODEL)
-                messages=[
+            request = {
+                "model": "gpt-4o",  # 🚀 UPGRADED TO GPT-4O (LATEST MODEL)
+                "messages": [
                     {
                         "role": "system",
                         "content": "You are an expert at understanding project structure and purpose through strategic file analysis. Respond ONLY with valid JSON.",
                     },
                     {"role": "user", "content": prompt},
                 ],
-                temperature=0.3,
-                max_tokens=800,
-                response_format={"type": "json_object"},
-            )
-            response_text = response.choices[0].message.content
+                "temperature": 0.3,
+                "max_tokens": 800,
+                "response_format": {"type": "json_object"},
+            }
+            llm_cache = LLMResponseCache.shared(self.project_path)
+            response_text = llm_cache.get("purpose_layer1", request)
+            fetch_seconds = None
+            if response_text is None:
+                started = time.perf_counter()
+                try:
+                    response_text = LLMClient.shared().complete(request)
+                except LLMUnavailable as e:
+                    return {
+                        "root_purpose": f"Unknown - {e}",
+                        "folder_purposes": {},
+                        "strategic_files_read": list(strategic_files_content.keys()),
+                        "confidence": 0.0,
+                    }
+                fetch_seconds = time.perf_counter() - started
             purpose_map = json.loads(response_text.strip())
+            if fetch_seconds is not None:
+                llm_cache.put("purpose_layer1", request, response_text, fetch_seconds)
             purpose_map["strategic_files_read"] = list(strategic_files_content.keys())
             print(
                 f"   ✅ Purpose map created (confidence: {purpose_map.get('confidence', 0):.0%})"
@@ -3253,84 +6765,14 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
             }
 
     def generate_dependency_analysis(self) -> dict:
-        """Generate REAL dependency analysis by scanning actual codebase"""
+        """
+        Generate REAL dependency analysis by scanning actual codebase.
+        During analyze_and_heal this is the run's memoized "dependency_analysis"
+        stage, so every caller (headless records, HTML map) shares one computation.
+        """
         try:
-            import ast
-            from pathlib import Path
-
-            project_path = Path(self.project_path)
-
-            # Scan all source files
-            source_files = self._scan_source_files(project_path)
-
-            # Parse dependencies for each file
-            file_dependencies = {}
-            all_imports = set()
-            all_exports = {}
-
-            for file_path in source_files:
-                deps = self._analyze_file_dependencies(file_path)
-                file_dependencies[file_path] = deps
-                all_imports.update(deps.get('imports', []))
-                if deps.get('exports'):
-                    all_exports[file_path] = deps['exports']
-
-                # 🔫 SNIPER GUN: Deep entity scanning for sub-file analysis
-                entity_scan = self._sniper_entity_scan(file_path)
-                file_dependencies[file_path]['sniper_entities'] = entity_scan
-
-            # Build dependency graph
-            dependency_graph = self._build_dependency_graph(file_dependencies, all_exports)
-
-            # Calculate ripple effects
-            ripple_analysis = self._calculate_ripple_effects(dependency_graph, all_exports)
-
-            # Identify critical files
-            critical_files = self._identify_critical_files(dependency_graph, ripple_analysis)
-
-            # Risk assessment based on real metrics
-            risk_assessment = self._assess_real_risk(source_files, dependency_graph)
-
-            # Statistics
-            statistics = {
-                "total_files": len(source_files),
-                "direct_dependencies": len(all_imports),
-                "indirect_dependencies": sum(len(deps) for deps in dependency_graph.values()),
-                "critical_files": len(critical_files),
-                "risk_level": risk_assessment["level"],
-                "complexity_score": risk_assessment["score"],
-                "lines_of_code": self._count_total_lines(source_files),
-                "estimated_impact": risk_assessment["impact"],
-                "ripple_score": ripple_analysis["max_impact_score"]
-            }
-
-            return {
-                "feature_node": {
-                    "name": project_path.name,
-                    "type": "project_root",
-                    "description": f"Project dependency analysis for {len(source_files)} files",
-                    "complexity": risk_assessment["complexity"],
-                    "impact": risk_assessment["impact"]
-                },
-                "direct_dependencies": [
-                    {"name": imp, "type": self._classify_dependency(imp), "strength": self._assess_strength(imp)}
-                    for imp in sorted(all_imports)
-                ],
-                "indirect_dependencies": self._find_indirect_dependencies(dependency_graph, all_imports),
-                "critical_files": critical_files,
-                "dependency_graph": dependency_graph,
-                "ripple_analysis": ripple_analysis,
-                "file_analysis": file_dependencies,
-                "statistics": statistics,
-                "risk_assessment": risk_assessment,
-                "analysis_metadata": {
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "analyzer": "REAL_DEPENDENCY_ANALYZER",
-                    "version": "2.0.0",
-                    "scanned_files": len(source_files)
-                }
-            }
-
+            stages = self.stage_graph if self.stage_graph is not None else self._build_stage_graph()
+            return stages.get("dependency_analysis")
         except Exception as e:
             return {
                 "feature_node": {"name": "error", "type": "error"},
@@ -3347,6 +6789,288 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
                 "error": str(e)
             }
 
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ PIPELINE STAGES - inventory → parse → graph → ripple → diagrams → HTML             ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    # Stages persisted for --resume. dependency_analysis embeds the graph and ripple
+    # outputs; per-file parse results already live in the AnalysisCache.
+    CHECKPOINT_STAGES = ("purpose_discovery", "dependency_analysis")
+    # Settings that change stage outputs (MAX_ANALYSIS_TIME deliberately excluded:
+    # raising the time limit is the usual reason to resume)
+    CHECKPOINT_CONFIG_KEYS = (
+        "COMPREHENSIVE_MODE",
+        "COMPREHENSIVE_THRESHOLD",
+        "MAX_FILES_FOR_DEEP_ANALYSIS",
+        "SAMPLING_RATE_LARGE",
+        "SAMPLING_RATE_MEGA",
+        "DEEP_SAMPLE_SIZE",
+        "RIPPLE_MAX_DEPTH",
+        "current_lang",
+    )
+
+    def tree_fingerprint(self, flow: str) -> str:
+        """Fingerprint of the project tree + output-changing settings for `flow`"""
+        config = {name: getattr(self, name, None) for name in self.CHECKPOINT_CONFIG_KEYS}
+        config["flow"] = flow
+        return CheckpointStore.fingerprint_for(FileInventory.shared(self.project_path), config)
+
+    def _open_checkpoints(self, flow: str) -> CheckpointStore:
+        """Checkpoint store for this run (a pass-through store with --no-cache)"""
+        if not AnalysisCache.enabled_by_default:
+            self.checkpoints = CheckpointStore(flow=flow)
+            return self.checkpoints
+        fingerprint = self.tree_fingerprint(flow)
+        self.checkpoints = CheckpointStore(self.project_path, flow, fingerprint, resume=self.resume)
+        return self.checkpoints
+
+    def _build_stage_graph(self, on_complete=None) -> StageGraph:
+        """Declare the analysis pipeline; each stage runs at most once per graph"""
+        stages = StageGraph(max_workers=4, on_complete=on_complete)
+        stages.add("inventory", self._stage_inventory)
+        stages.add("duplicate_names", self._stage_duplicate_names, ["inventory"])
+        stages.add("purpose_discovery", self._stage_purpose_discovery)
+        stages.add("source_files", self._stage_source_files, ["inventory"])
+        stages.add("parse", self._stage_parse, ["source_files"])
+        stages.add("graph", self._stage_dependency_graph, ["source_files", "parse"])
+        stages.add("ripple", self._stage_ripple, ["graph"])
+        stages.add(
+            "dependency_analysis",
+            self._stage_dependency_analysis,
+            ["source_files", "parse", "graph", "ripple"],
+        )
+        stages.add("diagrams", self._stage_diagrams, ["dependency_analysis"])
+        return stages
+
+    def _stage_inventory(self) -> dict:
+        """One shared traversal: totals and extension counts"""
+        inventory = FileInventory.shared(Path(self.project_path))
+        total_files = 0
+        total_dirs = 0
+        file_types = {}
+        for rel_dir, dirs, files in inventory.walk():
+            total_dirs += len(dirs)
+            for entry in files:
+                total_files += 1
+                file_types[entry.ext] = file_types.get(entry.ext, 0) + 1
+        return {
+            "total_files": total_files,
+            "total_dirs": total_dirs,
+            "file_types": file_types,
+            "inventory": inventory.stats,
+        }
+
+    def _stage_duplicate_names(self, inventory: dict) -> dict:
+        """Same-named files within one directory listing"""
+        project_path = Path(self.project_path)
+        duplicate_files = {}
+        for rel_dir, dirs, files in FileInventory.shared(project_path).walk():
+            file_dict = {}
+            for entry in files:
+                file = entry.name
+                full_path = os.path.join(str(project_path), entry.path)
+                if file in file_dict:
+                    if file not in duplicate_files:
+                        duplicate_files[file] = []
+                    duplicate_files[file].append(full_path)
+                else:
+                    file_dict[file] = full_path
+        return duplicate_files
+
+    def _stage_purpose_discovery(self) -> dict:
+        """🚀 GPT-4O PURPOSE DISCOVERY (independent of the parse chain)"""
+        print("🔬 Running GPT-4O purpose discovery...")
+        try:
+            purpose_map = self.discover_emergent_purpose_layer1()
+            print(f"✅ GPT-4O analysis complete: {purpose_map.get('root_purpose', 'Unknown')[:100]}")
+        except Exception as purpose_error:
+            print(f"⚠️  GPT-4O purpose discovery failed: {purpose_error}")
+            purpose_map = {
+                "root_purpose": "GPT analysis unavailable",
+                "folder_purposes": {},
+                "confidence": 0.0
+            }
+        return purpose_map
+
+    def _stage_source_files(self, inventory: dict = None) -> list:
+        return self._scan_source_files(Path(self.project_path))
+
+    def _stage_parse(self, source_files: list) -> dict:
+        """
+        Read each changed source file once and run every ContentPipeline analyzer on
+        it (unchanged files come from the cache). Besides deps and sniper entities,
+        the line count, duplicate hash and deep-analysis quality row are cached, so
+        the LOC count, detect_duplicates and perform_deep_analysis do not read
+        these files again.
+        """
+        project_path = Path(self.project_path)
+        inventory = FileInventory.shared(project_path)
+        cache = AnalysisCache.shared(project_path)
+
+        parsed = {}
+        to_parse = []
+        for file_path in source_files:
+            entry = inventory.entry_for(file_path)
+            deps = cache.get("deps", file_path, entry)
+            # 🔫 SNIPER GUN: Deep entity scanning for sub-file analysis
+            entity_scan = cache.get("sniper", file_path, entry)
+            if deps is None or entity_scan is None:
+                to_parse.append(str(file_path))
+            else:
+                deps["exports"] = [tuple(export) for export in deps.get("exports", [])]
+                parsed[str(file_path)] = (deps, entity_scan)
+
+        if TRACER.enabled:
+            entries = [inventory.entry_for(path_str) for path_str in to_parse]
+            TRACER.count(
+                files=len(to_parse),
+                bytes=sum(entry.size for entry in entries if entry and entry.size > 0),
+                files_from_cache=len(source_files) - len(to_parse),
+            )
+        sniper_times = []
+        pipeline = ContentPipeline(helper=self)
+        hash_kind = f"content_hash:{duplicate_hash_name()}"
+        lines = {}  # path_str → line count (None: undecodable) for the LOC statistic
+        for path_str, outputs, read in self._parse_source_files(to_parse):
+            deps = outputs.get("imports") or {"imports": [], "exports": [], "error": "analysis failed"}
+            entity_scan = outputs.get("entities") or {"file_path": path_str, "entity_count": 0, "entities": {}}
+            sniper_times.append((entity_scan.get("scan_time_ms", 0.0), path_str))
+            entry = inventory.entry_for(path_str)
+            pipeline.account(read, entry.size if entry else None)
+            cache.put("deps", path_str, entry, deps)
+            cache.put("sniper", path_str, entry, entity_scan)
+            lines[path_str] = outputs.get("loc")
+            if lines[path_str] is not None:
+                cache.put("lines", path_str, entry, lines[path_str])
+            if outputs.get("hash") is not None:
+                cache.put(hash_kind, path_str, entry, outputs["hash"])
+            quality = ContentPipeline.quality_entry(outputs)
+            if quality is not None:
+                cache.put("quality", path_str, entry, quality)
+            if GOVERNOR.checkpoint() and GOVERNOR.degraded("drop"):
+                self._drop_entity_detail(entity_scan)  # The cache keeps the full scan
+                GOVERNOR.note("drop", "sniper_entities", "entity lists → per-type counts")
+            parsed[path_str] = (deps, entity_scan)
+        cache.commit()
+
+        def drop_entity_lists():
+            for _, scan in list(parsed.values()):
+                self._drop_entity_detail(scan)
+
+        # Resident through the graph/diagram stages: entity lists can be dropped later
+        GOVERNOR.register("sniper_entities", drop=drop_entity_lists)
+        sniper_metrics = {
+            "files_scanned": len(sniper_times),
+            "files_from_cache": len(source_files) - len(to_parse),
+            "total_ms": round(sum(t for t, _ in sniper_times), 3),
+            "max_ms": max((t for t, _ in sniper_times), default=0.0),
+            "slowest_files": [
+                {"file": path_str, "scan_time_ms": t}
+                for t, path_str in sorted(sniper_times, reverse=True)[:5]
+            ],
+        }
+        if isinstance(getattr(self, "performance_metrics", None), dict):
+            self.performance_metrics["sniper_scan"] = sniper_metrics
+        return {"parsed": parsed, "sniper_metrics": sniper_metrics, "lines": lines, "content_pipeline": pipeline}
+
+    @staticmethod
+    def _drop_entity_detail(entity_scan: dict):
+        """Memory governor "drop": keep per-type entity counts, release the entity lists"""
+        entities = entity_scan.get("entities") if isinstance(entity_scan, dict) else None
+        if entities:
+            entity_scan["entity_type_counts"] = {
+                kind: len(items) for kind, items in entities.items()
+            }
+            entity_scan["entities"] = {}
+
+    def _stage_dependency_graph(self, source_files: list, parse: dict) -> dict:
+        """Deterministic merge (sorted source_files order) + dependency graph"""
+        file_dependencies = {}
+        all_imports = set()
+        all_exports = {}
+        parsed = parse["parsed"]
+        for file_path in source_files:
+            deps, entity_scan = parsed.get(
+                str(file_path),
+                ({"imports": [], "exports": [], "error": "analysis aborted"}, {}),
+            )
+            file_dependencies[file_path] = deps
+            all_imports.update(deps.get('imports', []))
+            if deps.get('exports'):
+                all_exports[file_path] = deps['exports']
+            file_dependencies[file_path]['sniper_entities'] = entity_scan
+
+        return {
+            "file_dependencies": file_dependencies,
+            "all_imports": all_imports,
+            "all_exports": all_exports,
+            "dependency_graph": self._build_dependency_graph(file_dependencies, all_exports),
+        }
+
+    def _stage_ripple(self, graph: dict) -> dict:
+        return self._calculate_ripple_effects(graph["dependency_graph"], graph["all_exports"])
+
+    def _stage_dependency_analysis(self, source_files: list, parse: dict, graph: dict, ripple: dict) -> dict:
+        """Critical files, risk and statistics on top of graph + ripple"""
+        project_path = Path(self.project_path)
+        file_dependencies = graph["file_dependencies"]
+        all_imports = graph["all_imports"]
+        dependency_graph = graph["dependency_graph"]
+        ripple_analysis = ripple
+        sniper_metrics = parse["sniper_metrics"]
+        pipeline = parse.get("content_pipeline") or ContentPipeline(("loc",), helper=self)
+        lines_of_code = self._count_total_lines(source_files, parse.get("lines"), pipeline)
+
+        # Identify critical files
+        critical_files = self._identify_critical_files(dependency_graph, ripple_analysis)
+
+        # Risk assessment based on real metrics
+        risk_assessment = self._assess_real_risk(source_files, dependency_graph)
+
+        # Statistics
+        statistics = {
+            "total_files": len(source_files),
+            "direct_dependencies": len(all_imports),
+            "indirect_dependencies": sum(len(deps) for deps in dependency_graph.values()),
+            "critical_files": len(critical_files),
+            "risk_level": risk_assessment["level"],
+            "complexity_score": risk_assessment["score"],
+            "lines_of_code": lines_of_code,
+            "estimated_impact": risk_assessment["impact"],
+            "ripple_score": ripple_analysis["max_impact_score"]
+        }
+
+        return {
+            "feature_node": {
+                "name": project_path.name,
+                "type": "project_root",
+                "description": f"Project dependency analysis for {len(source_files)} files",
+                "complexity": risk_assessment["complexity"],
+                "impact": risk_assessment["impact"]
+            },
+            "direct_dependencies": [
+                {"name": imp, "type": self._classify_dependency(imp), "strength": self._assess_strength(imp)}
+                for imp in sorted(all_imports)
+            ],
+            "indirect_dependencies": self._find_indirect_dependencies(dependency_graph, all_imports),
+            "critical_files": critical_files,
+            "dependency_graph": dependency_graph,
+            "ripple_analysis": ripple_analysis,
+            "file_analysis": file_dependencies,
+            "statistics": statistics,
+            "risk_assessment": risk_assessment,
+            "performance_metrics": {"sniper_scan": sniper_metrics, "content_pipeline": pipeline.summary()},
+            "analysis_metadata": {
+                "timestamp": datetime.datetime.now().isoformat(),
+                "analyzer": "REAL_DEPENDENCY_ANALYZER",
+                "version": "2.0.0",
+                "scanned_files": len(source_files)
+            }
+        }
+
+    def _stage_diagrams(self, dependency_analysis: dict) -> str:
+        """ULTRATHINK dependency map section (HTML runs only)"""
+        return self._generate_dependency_map_html(dependency_analysis)
+
     def analyze_and_heal(self) -> dict:
         """🔫 SNIPER GUN: Complete project analysis with ULTRATHINK integration"""
         try:
@@ -3357,46 +7081,60 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
             project_path = Path(self.project_path)
             start_time = time.time()
 
-            # Basic file analysis
-            total_files = 0
-            total_dirs = 0
-            file_types = {}
-            duplicate_files = {}
-
-            # Scan directory structure
-            for root, dirs, files in os.walk(project_path):
-                total_dirs += len(dirs)
-                for file in files:
-                    total_files += 1
-                    ext = Path(file).suffix.lower()
-                    file_types[ext] = file_types.get(ext, 0) + 1
-
-            # Simple duplicate detection
-            for root, dirs, files in os.walk(project_path):
-                file_dict = {}
-                for file in files:
-                    full_path = os.path.join(root, file)
-                    if file in file_dict:
-                        if file not in duplicate_files:
-                            duplicate_files[file] = []
-                        duplicate_files[file].append(full_path)
-                    else:
-                        file_dict[file] = full_path
+            # Declared pipeline for this run: every stage computes once, and
+            # independent stages (purpose discovery vs. parsing) overlap
+            if not self.reuse_inventory:
+                FileInventory.reset(project_path)
+            cache = AnalysisCache.shared(project_path)
+            cache.reset_stats()
+            llm_cache = LLMResponseCache.shared(project_path)
+            llm_cache.reset_stats()
+            PromptCompactor.shared().reset_stats()
+            self.start_memory_monitor()
+            writer = self.stage_writer
+            record_formats = {
+                "inventory": lambda value: value,
+                "duplicate_names": lambda value: {"duplicates": value},
+                "purpose_discovery": lambda value: value,
+                "dependency_analysis": lambda value: value,
+            }
 
-            # 🚀 GPT-4O PURPOSE DISCOVERY (INTELLIGENT PROJECT UNDERSTANDING)
-            print("🔬 Running GPT-4O purpose discovery...")
-            try:
-                purpose_map = self.discover_emergent_purpose_layer1()
-                print(f"✅ GPT-4O analysis complete: {purpose_map.get('root_purpose', 'Unknown')[:100]}")
-            except Exception as purpose_error:
-                print(f"⚠️  GPT-4O purpose discovery failed: {purpose_error}")
-                purpose_map = {
-                    "root_purpose": "GPT analysis unavailable",
-                    "folder_purposes": {},
-                    "confidence": 0.0
-                }
+            checkpoints = self._open_checkpoints("analyze_and_heal")
+
+            def on_stage_complete(name, value, seconds):
+                if name in self.CHECKPOINT_STAGES:
+                    if CheckpointStore.complete(self):
+                        checkpoints.save(name, value, seconds)
+                    else:
+                        checkpoints.skip(name, "incomplete (aborted or reduced sampling)")
+                if writer and name in record_formats:
+                    writer.emit(name, record_formats[name](value), seconds)
+
+            def restore_stage(name):
+                if name not in self.CHECKPOINT_STAGES:
+                    return False, None
+                found, value = checkpoints.load(name)
+                if found and writer and name in record_formats:
+                    writer.emit(name, record_formats[name](value), 0.0)
+                return found, value
+
+            stages = self._build_stage_graph(on_complete=on_stage_complete)
+            self.stage_graph = stages
+            targets = ["inventory", "duplicate_names", "purpose_discovery", "dependency_analysis"]
+            restored = stages.restore(targets, restore_stage)
+            if restored:
+                print(f"♻️  Restored from checkpoint: {', '.join(restored)}")
+            stages.run(targets)
+            inventory_stats = stages.get("inventory")
+            total_files = inventory_stats["total_files"]
+            total_dirs = inventory_stats["total_dirs"]
+            file_types = inventory_stats["file_types"]
+            duplicate_files = stages.get("duplicate_names")
+            purpose_map = stages.get("purpose_discovery")
+            dependency_analysis = self.generate_dependency_analysis()
 
             # Generate comprehensive results
+            analysis_time = time.time() - start_time
             results = {
                 'project_name': project_path.name,
                 'total_files': total_files,
@@ -3404,15 +7142,50 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
                 'file_types': file_types,
                 'duplicates': duplicate_files,
                 'score': max(60, 100 - len(duplicate_files) * 2),  # Simple scoring
-                'analysis_time': time.time() - start_time,
-                'ultrathink_analysis': self.generate_dependency_analysis(),
-                'dependency_map_html': self._generate_dependency_map_html(),  # 🚀 ULTRATHINK diagrams
+                'analysis_time': analysis_time,
+                'ultrathink_analysis': dependency_analysis,
                 'purpose_map': purpose_map,  # 🚀 GPT-4O intelligent purpose discovery
+                'performance_metrics': {
+                    'total_time': analysis_time,
+                    'files_processed': total_files,
+                    'processing_rate': total_files / analysis_time if analysis_time > 0 else 0,
+                    'cache': cache.stats(),
+                    'llm_cache': llm_cache.stats(),
+                    'prompt_compaction': PromptCompactor.shared().stats(),
+                    'sniper_scan': dependency_analysis.get('performance_metrics', {}).get('sniper_scan'),
+                    'content_pipeline': dependency_analysis.get('performance_metrics', {}).get('content_pipeline'),
+                    'stages': stages.summary(),
+                    'memory': GOVERNOR.report(),
+                    'checkpoints': checkpoints.summary(),
+                },
                 'status': 'completed'
             }
+            if TRACER.enabled:
+                results['performance_metrics']['trace'] = TRACER.summary()
+
+            if writer or not self.render_html:
+                # Headless: no Mermaid diagrams, no HTML report. The time saved is the
+                # render time recorded by the last HTML run of this project (if any).
+                skipped = cache.get_meta("last_html_render_seconds")
+                results['performance_metrics']['html_render'] = {
+                    'skipped': True,
+                    'estimated_seconds_saved': skipped,
+                }
+                if writer:
+                    writer.finish(
+                        {
+                            'total_files': total_files,
+                            'total_dirs': total_dirs,
+                            'score': results['score'],
+                            'analysis_time': analysis_time,
+                            'performance_metrics': results['performance_metrics'],
+                            'status': 'completed',
+                        }
+                    )
+                return results
 
             # Generate and save HTML report with TIMESTAMP NAMING
-            html_content = self.generate_html_report(results)
+            render_start = time.time()
 
             # NEW: ProjectName_Hour_Weekday_Day_Month_Year naming convention
             import datetime
@@ -3421,10 +7194,40 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
             month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
             timestamp_name = f"{project_path.name}_{now.hour:02d}{weekday_names[now.weekday()]}{now.day}{month_names[now.month-1]}{now.year}.html"
-            html_file = timestamp_name
-
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            html_file = str(Path(self.report_dir) / timestamp_name) if self.report_dir else timestamp_name
+            results['html_file'] = html_file
+            rendered = {}  # Report text until written (the governor may write it early)
+
+            def write_report():
+                html_content = rendered.pop('html', None)
+                if html_content is None:
+                    return 0
+                with open(html_file, 'w', encoding='utf-8') as f:
+                    f.write(html_content)
+                return len(html_content)
+
+            def render_report(diagrams):
+                results['dependency_map_html'] = diagrams  # 🚀 ULTRATHINK diagrams
+                rendered['html'] = self.generate_html_report(results)
+                # Resident until written: spilling writes the report file now
+                GOVERNOR.register("html_report", size=lambda: len(rendered.get('html') or ''), spill=write_report)
+                return html_file
+
+            stages.add("html", render_report, ["diagrams"])
+            stages.run(["html"])
+            stages.get("html")
+            results['performance_metrics']['stages'] = stages.summary()
+            results['performance_metrics']['memory'] = GOVERNOR.report()
+            results['performance_metrics']['checkpoints'] = checkpoints.summary()
+            results['performance_metrics']['llm_cache'] = llm_cache.stats()  # + action-plan enrichment
+            results['performance_metrics']['prompt_compaction'] = PromptCompactor.shared().stats()
+            if TRACER.enabled:
+                results['performance_metrics']['trace'] = TRACER.summary()
+
+            write_report()
+            render_time = time.time() - render_start
+            results['performance_metrics']['html_render'] = {'skipped': False, 'seconds': render_time}
+            cache.set_meta("last_html_render_seconds", round(render_time, 3))
 
             print(f"✅ Complete analysis saved to: {html_file}")
             print(f"📊 Found {total_files} files, {total_dirs} directories")
@@ -3434,6 +7237,8 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
 
         except Exception as e:
             print(f"❌ Analysis error: {e}")
+            if self.stage_writer:
+                self.stage_writer.finish({'status': 'failed', 'error': str(e)})
             return {
                 'project_name': Path(self.project_path).name,
                 'total_files': 0,
@@ -3443,13 +7248,18 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
                 'error': str(e),
                 'status': 'failed'
             }
+        finally:
+            self.stage_graph = None  # Memoized outputs live for one run only
+            self.checkpoints = None
+            GOVERNOR.stop()
 
     def generate_html_report(self, results: dict) -> str:
         """🔫 SNIPER GUN: Delegate to REAL MR-FIX HTML generator"""
         maximizer = UltraThinkMermaidMaximizer(self.project_path)
         return maximizer.generate_html_report(results)
 
-    def _generate_dependency_map_html(self) -> str:
+    @TRACER.traced("html:dependency_map", "html")
+    def _generate_dependency_map_html(self, dependency_analysis: dict = None) -> str:
         """
         Generate ULTRATHINK 5-diagram interactive dependency map with maximum insights.
 
@@ -3457,6 +7267,10 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
         diagrams for dependency visualization. Integrates dependency analysis with
         ULTRATHINK diagram generator for optimal pattern recognition.
 
+        Args:
+            dependency_analysis: Result of generate_dependency_analysis(); the
+                "diagrams" stage passes the run's memoized copy.
+
         Returns:
             str: HTML section with 5 Mermaid diagrams in 2-column uniform grid.
 
@@ -3465,8 +7279,9 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
             Falls back to simple diagram if data incomplete.
         """
         try:
-            # Get dependency analysis results
-            dependency_analysis = self.generate_dependency_analysis()
+            # Get dependency analysis results (memoized during analyze_and_heal)
+            if dependency_analysis is None:
+                dependency_analysis = self.generate_dependency_analysis()
 
             # Initialize ULTRATHINK diagram generator
             maximizer = UltraThinkMermaidMaximizer(self.project_path)
@@ -3499,10 +7314,15 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
             }
 
             for file_deps in file_analysis.values():
-                entities = file_deps.get('sniper_entities', {}).get('entities', {})
-                for entity_type, entity_list in entities.items():
+                sniper_entities = file_deps.get('sniper_entities', {})
+                # Lists dropped under memory pressure leave per-type counts behind
+                type_counts = sniper_entities.get('entity_type_counts') or {
+                    entity_type: len(entity_list)
+                    for entity_type, entity_list in sniper_entities.get('entities', {}).items()
+                }
+                for entity_type, count in type_counts.items():
                     if entity_type in entity_counts:
-                        entity_counts[entity_type] += len(entity_list)
+                        entity_counts[entity_type] += count
 
             # Generate ULTRATHINK diagrams HTML
             diagrams_html = ""
@@ -4001,17 +7821,21 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
             all_imports = {}
             all_exports = {}
 
-            # Scan source files
-            source_files = list(Path(self.project_path).rglob("*.ts")) + \
-                          list(Path(self.project_path).rglob("*.tsx")) + \
-                          list(Path(self.project_path).rglob("*.js")) + \
-                          list(Path(self.project_path).rglob("*.jsx")) + \
-                          list(Path(self.project_path).rglob("*.py"))
+            # Reuse the already-parsed source files (node_modules/build dirs are
+            # excluded by _scan_source_files) instead of re-reading the tree
+            file_analysis = dependency_analysis.get("file_analysis", {})
+            extension_order = ['.ts', '.tsx', '.js', '.jsx', '.py']
+            source_files = sorted(
+                (file_path for file_path in file_analysis
+                 if Path(file_path).suffix in extension_order),
+                key=lambda file_path: extension_order.index(Path(file_path).suffix),
+            )
 
             for file_path in source_files[:50]:  # Limit for performance
                 try:
+                    deps = file_analysis[file_path]
+                    file_path = Path(file_path)
                     file_path_str = str(file_path)
-                    deps = self._analyze_file_dependencies(file_path)  # Pass Path object, not string
 
                     # Extract imports
                     imports = []
@@ -4433,26 +8257,103 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
 
 
 
+    def _parse_source_files(self, paths: list):
+        """
+        ⚡ PER-FILE PARSING FAN-OUT
+        PURPOSE: Read each of `paths` once and run the ContentPipeline analyzers
+                 (hash, LOC, imports/exports, sniper scan, patterns, quality)
+        MECHANISM:
+            • --jobs 1 (default): inline, same code path as the workers
+            • --jobs N: chunked batches on a ProcessPoolExecutor
+            • abort_analysis / check_time_limit are polled after every chunk;
+              pending chunks are cancelled and their files reported as aborted
+        YIELDS: (path_str, analyzer outputs, read info) in completion order
+        """
+        if not paths:
+            return
+        jobs = max(1, int(getattr(self, "MAX_WORKERS", 1) or 1))
+        chunk_size = max(8, min(256, len(paths) // (jobs * 4) or 1))
+        batches = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        done = 0
+
+        def report_progress():
+            print(f"   🔧 Parsed {done:,}/{len(paths):,} source files...", end="\r")
+
+        def should_stop():
+            return getattr(self, "abort_analysis", False) or (
+                getattr(self, "start_time", None) and self.check_time_limit()
+            )
+
+        if jobs > 1 and len(batches) > 1:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            pending_batches = list(batches)
+            try:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    futures = {
+                        executor.submit(_parse_source_batch, batch): batch
+                        for batch in batches
+                    }
+                    for future in as_completed(futures):
+                        batch_results = future.result()
+                        pending_batches.remove(futures[future])
+                        done += len(batch_results)
+                        report_progress()
+                        yield from batch_results
+                        if should_stop():
+                            print(f"\n⚠️ Parsing stopped early: {done:,}/{len(paths):,} files")
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            return
+                print()
+                return
+            except Exception as e:
+                # Pool unavailable (sandbox, pickling) → finish remaining work inline
+                logger.error(f"Parallel parsing failed, continuing serially: {e}")
+                batches = pending_batches
+
+        for batch in batches:
+            batch_results = _parse_source_batch(batch, analyzer=self)
+            done += len(batch_results)
+            yield from batch_results
+            if len(paths) > chunk_size:
+                report_progress()
+            if should_stop():
+                print(f"\n⚠️ Parsing stopped early: {done:,}/{len(paths):,} files")
+                return
+        if len(paths) > chunk_size:
+            print()
+
     def _scan_source_files(self, project_path: Path) -> list:
         """Scan project for all analyzable source files"""
         source_extensions = {'.py', '.js', '.jsx', '.ts', '.tsx', '.vue', '.java', '.cpp', '.c', '.h'}
         source_files = []
 
-        for file_path in project_path.rglob('*'):
-            if file_path.is_file() and file_path.suffix in source_extensions:
-                # Skip common non-source directories
-                if any(part.startswith('.') or part in ['node_modules', '__pycache__', 'dist', 'build']
-                       for part in file_path.parts):
+        # Skip common non-source directories (checked on the full path, root included)
+        if any(part.startswith('.') or part in BUILD_SKIP_DIRS for part in Path(project_path).parts):
+            return source_files
+
+        inventory = FileInventory.shared(project_path)
+        for rel_dir, dirs, files in inventory.walk():
+            if rel_dir and any(part.startswith('.') or part in BUILD_SKIP_DIRS
+                               for part in rel_dir.split(os.sep)):
+                continue
+            for entry in files:
+                suffix = entry.name[-len(entry.ext):] if entry.ext else ''
+                if entry.size < 0 or suffix not in source_extensions:
+                    continue
+                if entry.name.startswith('.'):
                     continue
-                source_files.append(file_path)
+                source_files.append(inventory.absolute(entry.path))
 
         return sorted(source_files)
 
-    def _analyze_file_dependencies(self, file_path: Path) -> dict:
-        """Analyze a single file for imports and exports"""
+    def _analyze_file_dependencies(self, file_path: Path, source: FileContent = None) -> dict:
+        """Analyze a single file for imports and exports (source: the pipeline's one read)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if source is not None:
+                content = source.text
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
 
             suffix = file_path.suffix
 
@@ -4468,6 +8369,7 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
 
     def _analyze_python_dependencies(self, content: str, file_path: Path) -> dict:
         """Analyze Python file dependencies using AST"""
+        import ast
         try:
             tree = ast.parse(content)
             imports = []
@@ -4541,6 +8443,7 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
         patterns = [
             r'#include\s*[<"]([^>"]+)[>"]',  # C/C++
             r'import\s+[<"]([^>"]+)[>"]',   # Java/C#
+            r'(?m)^\s*import\s+(?:static\s+)?([\w.]+(?:\.\*)?)\s*;',  # Java dotted
             r'using\s+([^;]+);'             # C#
         ]
 
@@ -4557,53 +8460,211 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
     def _build_dependency_graph(self, file_dependencies: dict, all_exports: dict) -> dict:
         """Build dependency graph showing which files depend on which"""
         graph = {}
+        index = self._build_symbol_index(file_dependencies, all_exports)
 
         for file_path, deps in file_dependencies.items():
-            imports = deps.get('imports', [])
-            file_deps = []
-
-            for imp in imports:
-                # Find which file exports this import
-                for export_file, exports in all_exports.items():
-                    for export_type, export_name in exports:
-                        if imp.endswith(export_name) or export_name in imp:
-                            file_deps.append(str(export_file))
-                            break
+            importer = str(file_path)
+            file_deps = set()
+
+            for imp in deps.get('imports', []):
+                # Resolve the import to its defining file(s) via the index
+                file_deps.update(self._resolve_import(imp, importer, index))
 
-            graph[str(file_path)] = list(set(file_deps))
+            graph[importer] = sorted(file_deps)
 
         return graph
 
+    # Import strings that name a file path rather than a dotted module
+    PATH_IMPORT_EXTENSIONS = {
+        '.js', '.jsx', '.ts', '.tsx', '.vue', '.java', '.c', '.cpp', '.h', '.hpp',
+        '.css', '.scss', '.json',
+    }
+
+    def _build_symbol_index(self, file_paths, all_exports: dict) -> dict:
+        """
+        🗂️ MODULE-PATH + SYMBOL INDEX
+        PURPOSE: Resolve imports with dict lookups instead of scanning every export
+        INDEXES:
+            • modules → dotted Python module / Java class suffixes ("pkg.mod", "mod") → files
+            • packages → dotted Java package suffixes → files, for "pkg.*" imports
+            • files   → root-relative path, with and without extension → files
+                        (directory path for index.* files) for JS relative imports
+            • paths   → every "/" suffix of those keys, for aliased / include paths
+            • symbols → exported name → defining files
+        """
+        root = str(getattr(self, "project_path", "") or "")
+        index = {
+            "rel": {},
+            "modules": defaultdict(list),
+            "packages": defaultdict(list),
+            "files": defaultdict(list),
+            "paths": defaultdict(list),
+            "symbols": defaultdict(list),
+            "defines": {},
+        }
+        for file_path in file_paths:
+            key = str(file_path)
+            rel = os.path.relpath(key, root) if root and os.path.isabs(key) else key
+            rel = rel.replace(os.sep, "/")
+            index["rel"][key] = rel
+            stem, ext = os.path.splitext(rel)
+            parts = stem.split("/")
+            if ext == ".py":
+                module_parts = parts[:-1] if parts[-1] == "__init__" else parts
+                for i in range(len(module_parts)):
+                    index["modules"][".".join(module_parts[i:])].append(key)
+                continue
+            if ext == ".java":
+                # src/main/java/com/acme/Foo.java → "com.acme.Foo"; package "com.acme"
+                for i in range(len(parts)):
+                    index["modules"][".".join(parts[i:])].append(key)
+                for i in range(len(parts) - 1):
+                    index["packages"][".".join(parts[i:-1])].append(key)
+            path_keys = [stem, rel]
+            if parts[-1] == "index" and len(parts) > 1:
+                path_keys.append("/".join(parts[:-1]))
+            for path_key in path_keys:
+                index["files"][path_key].append(key)
+                key_parts = path_key.split("/")
+                for i in range(len(key_parts)):
+                    index["paths"]["/".join(key_parts[i:])].append(key)
+
+        for file_path, exports in all_exports.items():
+            key = str(file_path)
+            names = set()
+            for export_type, export_name in exports:
+                # JS "export { a, b as c }" arrives as one comma-separated string
+                for name in str(export_name).split(","):
+                    name = name.strip().split(" as ")[-1].strip()
+                    if name:
+                        names.add(name)
+            index["defines"][key] = names
+            for name in names:
+                index["symbols"][name].append(key)
+        return index
+
+    def _resolve_import(self, imp: str, importer: str, index: dict) -> list:
+        """Files an import string refers to (empty for external packages)"""
+        if imp.startswith("./") or imp.startswith("../"):
+            import posixpath
+            base = posixpath.dirname(index["rel"].get(importer, ""))
+            target = posixpath.normpath(posixpath.join(base, imp))
+            candidates = index["files"].get(target) or index["files"].get(
+                posixpath.splitext(target)[0], []
+            )
+            return [c for c in candidates if c != importer]
+
+        if "/" in imp or os.path.splitext(imp)[1] in self.PATH_IMPORT_EXTENSIONS:
+            # Aliased ("@/lib/x", "~/x") or include-style ("net/socket.h") paths;
+            # "@scope/pkg" keeps its "@" and stays an external package
+            target = imp
+            for alias in ("~/", "@/"):
+                if target.startswith(alias):
+                    target = target[len(alias):]
+                    break
+            candidates = index["paths"].get(target) or index["paths"].get(
+                os.path.splitext(target)[0], []
+            )
+            return self._closest_candidates(importer, candidates, index)
+
+        candidates = index["modules"].get(imp)
+        if candidates:
+            return self._closest_candidates(importer, candidates, index)
+
+        if imp.endswith(".*"):
+            # Java on-demand import: every class of the package
+            return [c for c in index["packages"].get(imp[:-2], []) if c != importer]
+
+        if "." in imp:
+            # "pkg.mod.Symbol" from `from pkg.mod import Symbol`
+            module_name, symbol = imp.rsplit(".", 1)
+            owners = index["modules"].get(module_name)
+            if owners:
+                definers = [f for f in owners if symbol in index["defines"].get(f, ())]
+                if not definers:
+                    # Re-exported from a submodule of the package
+                    package_dirs = tuple(
+                        index["rel"][f][: -len("__init__.py")]
+                        for f in owners
+                        if index["rel"][f].endswith("__init__.py")
+                    )
+                    if package_dirs:
+                        definers = [
+                            f for f in index["symbols"].get(symbol, [])
+                            if index["rel"][f].startswith(package_dirs)
+                        ]
+                return self._closest_candidates(importer, definers or owners, index)
+        return []
+
+    def _closest_candidates(self, importer: str, candidates: list, index: dict) -> list:
+        """Disambiguate same-named modules by longest shared directory prefix"""
+        candidates = [c for c in candidates if c != importer]
+        if len(candidates) <= 1:
+            return candidates
+        base = index["rel"].get(importer, "").split("/")[:-1]
+
+        def shared_depth(candidate):
+            depth = 0
+            for a, b in zip(base, index["rel"][candidate].split("/")[:-1]):
+                if a != b:
+                    break
+                depth += 1
+            return depth
+
+        scores = [shared_depth(c) for c in candidates]
+        best = max(scores)
+        return [c for c, score in zip(candidates, scores) if score == best]
+
     def _calculate_ripple_effects(self, dependency_graph: dict, all_exports: dict) -> dict:
-        """Calculate ripple effects for changing each file"""
+        """
+        Calculate ripple effects for changing each file
+        MECHANISM:
+            • Reverse adjacency (file → files importing it) built once: O(N+E)
+            • direct / indirect (2-level) dependents read straight from it
+            • transitive dependents: SCC condensation of the reverse graph +
+              DAG DP over node bitsets (unbounded), or a depth-limited BFS
+              when RIPPLE_MAX_DEPTH is set
+        """
         ripple_scores = {}
+        exports_by_file = {str(path): exports for path, exports in all_exports.items()}
+
+        # Reverse edges, in graph order so dependent lists stay stable
+        dependents = {file_path: [] for file_path in dependency_graph}
+        for importer, deps in dependency_graph.items():
+            for dep in deps:
+                if dep in dependents:
+                    dependents[dep].append(importer)
+
+        max_depth = getattr(self, "RIPPLE_MAX_DEPTH", None)
+        if max_depth:
+            transitive_counts = self._bounded_transitive_dependents(dependents, max_depth)
+            cycle_count = None
+        else:
+            transitive_counts, cycle_count = self._transitive_dependents(dependents)
 
         for file_path in dependency_graph:
             # Files that directly depend on this file
-            direct_dependents = [
-                f for f, deps in dependency_graph.items()
-                if file_path in deps
-            ]
+            direct_dependents = dependents[file_path]
 
             # Files that indirectly depend (second level)
-            indirect_dependents = set()
+            indirect_dependents = {}
             for dependent in direct_dependents:
-                for f, deps in dependency_graph.items():
-                    if dependent in deps:
-                        indirect_dependents.add(f)
+                for f in dependents[dependent]:
+                    indirect_dependents[f] = None
 
             # Calculate impact score
             impact_score = len(direct_dependents) * 10 + len(indirect_dependents) * 5
 
             # Check if file exports many things
-            exports_count = len(all_exports.get(file_path, []))
+            exports_count = len(exports_by_file.get(file_path, []))
             impact_score += exports_count * 2
 
             ripple_scores[file_path] = {
-                "direct_dependents": direct_dependents,
+                "direct_dependents": list(direct_dependents),
                 "indirect_dependents": list(indirect_dependents),
                 "impact_score": impact_score,
-                "total_affected": len(direct_dependents) + len(indirect_dependents)
+                "total_affected": len(direct_dependents) + len(indirect_dependents),
+                "transitive_dependents": transitive_counts.get(file_path, 0),
             }
 
         max_impact = max(scores["impact_score"] for scores in ripple_scores.values()) if ripple_scores else 0
@@ -4611,9 +8672,122 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
         return {
             "ripple_scores": ripple_scores,
             "max_impact_score": max_impact,
-            "highest_impact_file": max(ripple_scores.items(), key=lambda x: x[1]["impact_score"])[0] if ripple_scores else None
+            "highest_impact_file": max(ripple_scores.items(), key=lambda x: x[1]["impact_score"])[0] if ripple_scores else None,
+            "max_transitive_dependents": max(transitive_counts.values()) if transitive_counts else 0,
+            "transitive_depth": max_depth or "unbounded",
+            "dependency_cycles": cycle_count,
         }
 
+    def _transitive_dependents(self, dependents: dict):
+        """
+        Exact transitive dependent counts for every file.
+        Tarjan SCC (iterative) on the reverse graph emits components children
+        first, so each component's reach bitset is its own nodes OR'ed with the
+        already-final reach of the components it points to. Bitsets are freed
+        as soon as every parent component has consumed them.
+        RETURNS: ({file: transitive_dependent_count}, cycle_count)
+        """
+        nodes = list(dependents)
+        node_id = {node: i for i, node in enumerate(nodes)}
+        adjacency = [[node_id[d] for d in dependents[node] if d in node_id] for node in nodes]
+
+        # ── Tarjan SCC ──────────────────────────────────────────────────────────────
+        index_of = [-1] * len(nodes)
+        lowlink = [0] * len(nodes)
+        on_stack = [False] * len(nodes)
+        component_of = [-1] * len(nodes)
+        components = []
+        stack = []
+        counter = 0
+        for root in range(len(nodes)):
+            if index_of[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, edge_pos = work.pop()
+                if edge_pos == 0:
+                    index_of[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                recurse = False
+                edges = adjacency[node]
+                while edge_pos < len(edges):
+                    child = edges[edge_pos]
+                    edge_pos += 1
+                    if index_of[child] == -1:
+                        work.append((node, edge_pos))
+                        work.append((child, 0))
+                        recurse = True
+                        break
+                    if on_stack[child]:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+                if recurse:
+                    continue
+                if lowlink[node] == index_of[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component_of[member] = len(components)
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(members)
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+        # ── DAG DP over the condensation (components arrive children-first) ──
+        children = [set() for _ in components]
+        pending_parents = [0] * len(components)
+        for node, edges in enumerate(adjacency):
+            source = component_of[node]
+            for child in edges:
+                target = component_of[child]
+                if target != source and target not in children[source]:
+                    children[source].add(target)
+                    pending_parents[target] += 1
+
+        reach = {}
+        counts = {}
+        for comp_id, members in enumerate(components):
+            mask = 0
+            for member in members:
+                mask |= 1 << member
+            for child in children[comp_id]:
+                mask |= reach[child]
+                pending_parents[child] -= 1
+                if pending_parents[child] == 0:
+                    del reach[child]  # Last consumer: release the bitset
+            total = bin(mask).count("1")
+            for member in members:
+                counts[nodes[member]] = total - 1  # Exclude the file itself
+            if pending_parents[comp_id]:
+                reach[comp_id] = mask
+
+        cycle_count = sum(1 for members in components if len(members) > 1)
+        return counts, cycle_count
+
+    def _bounded_transitive_dependents(self, dependents: dict, max_depth: int) -> dict:
+        """Dependents reachable within `max_depth` import hops (BFS per file)"""
+        counts = {}
+        for file_path in dependents:
+            seen = {file_path}
+            frontier = [file_path]
+            for _ in range(max_depth):
+                next_frontier = []
+                for node in frontier:
+                    for dependent in dependents.get(node, ()):
+                        if dependent not in seen:
+                            seen.add(dependent)
+                            next_frontier.append(dependent)
+                if not next_frontier:
+                    break
+                frontier = next_frontier
+            counts[file_path] = len(seen) - 1
+        return counts
+
     def _identify_critical_files(self, dependency_graph: dict, ripple_analysis: dict) -> list:
         """Identify critical files based on dependency impact"""
         critical_files = []
@@ -4703,22 +8877,104 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
 
         return [{"name": dep, "type": "indirect", "strength": "weak"} for dep in sorted(indirect)]
 
-    def _count_total_lines(self, source_files: list) -> int:
-        """Count total lines of code"""
+    def _count_total_lines(self, source_files: list, counted: dict = None, pipeline: ContentPipeline = None) -> int:
+        """
+        Count total lines of code
+        counted: line counts the parse stage already took from its read of each file;
+        only files it did not read (cached parses) are read here, through `pipeline`
+        """
         total = 0
+        counted = counted or {}
+        pipeline = pipeline or ContentPipeline(("loc",), helper=self)
+        inventory = FileInventory.shared(self.project_path)
+        cache = AnalysisCache.shared(self.project_path)
         for file_path in source_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    total += len(f.readlines())
-            except:
-                pass
+            if str(file_path) in counted:
+                total += counted[str(file_path)] or 0
+                continue
+            entry = inventory.entry_for(file_path)
+            line_count = cache.get("lines", file_path, entry)
+            if line_count is not None:
+                total += line_count
+                continue
+            outputs, read = pipeline.run(file_path, ("loc",))
+            pipeline.account(read, entry.size if entry else None)
+            line_count = outputs["loc"]
+            if line_count is not None:
+                total += line_count
+                cache.put("lines", file_path, entry, line_count)
+        cache.commit()
         return total
 
-    def _sniper_entity_scan(self, file_path: Path) -> dict:
-        """🔫 MULTI-INDEXER SNIPER TAGGER QUERY GUN - Sub-file entity analysis"""
+    # 🔫 SNIPER patterns, compiled on first scan and shared by every file scanned
+    SNIPER_FUNCTION_PATTERNS = LazyPatterns(
+        (r'def\s+(\w+)\s*\(', "python_function"),
+        (r'async\s+def\s+(\w+)\s*\(', "python_async_function"),
+        (r'function\s+(\w+)\s*\(', "javascript_function"),
+        (r'const\s+(\w+)\s*=\s*\(', "javascript_arrow_function"),
+        (r'(\w+)\s*\([^)]*\)\s*\{', "javascript_method"),
+        (r'@\w+.*\ndef\s+(\w+)\s*\(', "python_decorated_function"),
+        (r'self\.(\w+)\s*=\s*def\s+.*:', "python_method_definition"),
+    )
+    SNIPER_CLASS_PATTERNS = LazyPatterns(
+        (r'class\s+(\w+)[\s\(.*\)]*:', "python_class"),
+        (r'class\s+(\w+)\s+extends\s+(\w+)', "javascript_class_extends"),
+        (r'export\s+class\s+(\w+)', "javascript_export_class"),
+        (r'react\.(FC|memo)\((\w+)', "react_functional_component"),
+        (r'type\s+(\w+)\s*=', "typescript_interface"),
+    )
+    SNIPER_REACT_PATTERNS = LazyPatterns(
+        (r'react\.(createElement|FC)\([^,]*,\s*(\w+)', "react_component"),
+        (r'export\s+(?:default\s+)?(?:const|let|var)\s+(\w+)\s*=\s*\(\s*<', "react_component"),
+        (r'function\s+(\w+)\s*\([^)]*\)\s*\{\s*return\s*<', "react_function_component"),
+        (r'const\s+(\w+)\s*=\s*\(\s*\([^)]*\)\s*\{\s*return\s*<', "react_arrow_component"),
+    )
+    SNIPER_API_PATTERNS = LazyPatterns(
+        (r'@app\.(get|post|put|delete|patch)\([\'"]([^\'"]+)[\'"]', "flask_endpoint"),
+        (r'router\.(get|post|put|delete|patch)\([\'"]([^\'"]+)[\'"]', "fastapi_endpoint"),
+        (r'app\.(get|post|put|delete|patch)\([\'"]([^\'"]+)[\'"]', "express_route"),
+        (r'function\s+(\w+)\s*\([^)]*\)\s*\{[^}]*res\.(json|send|status)', "nodejs_api_function"),
+    )
+    SNIPER_DB_PATTERNS = LazyPatterns(
+        (r'(CREATE|DROP|ALTER)\s+TABLE', "sql_ddl", re.IGNORECASE),
+        (r'(INSERT|UPDATE|DELETE|SELECT)\s+INTO|FROM', "sql_dml", re.IGNORECASE),
+        (r'\.execute\([\'"]\s*(SELECT|INSERT|UPDATE|DELETE)', "database_execute", re.IGNORECASE),
+        (r'\.query\([\'"]\s*(SELECT|INSERT|UPDATE|DELETE)', "database_query", re.IGNORECASE),
+        (r'async\s+def\s+\w+.*:.*await\s+(cursor\.|connection\.)', "async_database_operation", re.IGNORECASE),
+    )
+    SNIPER_HTML_PATTERNS = LazyPatterns(
+        (r'def\s+_(generate_?\w*_html)', "python_html_generator"),
+        (r'innerHTML\s*=\s*[\'"]([^\'"]*)', "javascript_inner_html"),
+        (r'createElement\([\'"]\w+[\'"]', "javascript_create_element"),
+        (r'<(\w+)(?:\s[^>]*)?[^>]*>', "html_tag"),
+        (r'react\.createElement\([\'"]\w+[\'"]', "react_create_element"),
+    )
+    SNIPER_NEWLINE = re.compile(r'\n')
+
+    def _sniper_entity_scan(self, file_path: Path, source: FileContent = None) -> dict:
+        """
+        🔫 MULTI-INDEXER SNIPER TAGGER QUERY GUN - Sub-file entity analysis
+        Line numbers come from match offsets mapped through a newline-offset
+        table (bisect), so each match costs O(log lines) instead of a split +
+        linear search of the whole file. `source` is the ContentPipeline's read
+        of the file (decoded once for every analyzer).
+        """
+        from bisect import bisect_left
+        scan_start = time.perf_counter()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if source is not None:
+                content = source.text
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+            newline_offsets = [m.start() for m in self.SNIPER_NEWLINE.finditer(content)]
+
+            def line_of(match, group=0):
+                offset = match.start(group)
+                if offset < 0:  # Optional group did not participate
+                    offset = match.start()
+                return bisect_left(newline_offsets, offset) + 1
 
             entities = {
                 "functions": [],
@@ -4733,141 +8989,85 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
                 "react_components": [],
                 "event_handlers": []
             }
+            file_str = str(file_path)
 
             # Function/Method detection (SNIPER PRECISION)
-            function_patterns = [
-                (r'def\s+(\w+)\s*\(', "python_function"),
-                (r'async\s+def\s+(\w+)\s*\(', "python_async_function"),
-                (r'function\s+(\w+)\s*\(', "javascript_function"),
-                (r'const\s+(\w+)\s*=\s*\(', "javascript_arrow_function"),
-                (r'(\w+)\s*\([^)]*\)\s*\{', "javascript_method"),
-                (r'@\w+.*\ndef\s+(\w+)\s*\(', "python_decorated_function"),
-                (r'self\.(\w+)\s*=\s*def\s+.*:', "python_method_definition")
-            ]
-
-            for pattern, entity_type in function_patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    line_number = content.split('\n').index([line for line in content.split('\n') if match in line][0]) + 1 if match in content else 0
+            for pattern, entity_type in self.SNIPER_FUNCTION_PATTERNS:
+                for m in pattern.finditer(content):
+                    name = m.group(1)
                     entities["functions"].append({
-                        "name": match,
+                        "name": name,
                         "type": entity_type,
-                        "line": line_number,
-                        "file": str(file_path),
-                        "complexity": self._calculate_function_complexity(content, match)
+                        "line": line_of(m, 1),
+                        "file": file_str,
+                        "complexity": self._calculate_function_complexity(content, name)
                     })
 
             # Class detection (SNIPER PRECISION)
-            class_patterns = [
-                (r'class\s+(\w+)[\s\(.*\)]*:', "python_class"),
-                (r'class\s+(\w+)\s+extends\s+(\w+)', "javascript_class_extends"),
-                (r'export\s+class\s+(\w+)', "javascript_export_class"),
-                (r'react\.(FC|memo)\((\w+)', "react_functional_component"),
-                (r'type\s+(\w+)\s*=', "typescript_interface")
-            ]
-
-            for pattern, entity_type in class_patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        match = match[0]
-                    line_number = content.split('\n').index([line for line in content.split('\n') if match in line][0]) + 1 if match in content else 0
+            for pattern, entity_type in self.SNIPER_CLASS_PATTERNS:
+                for m in pattern.finditer(content):
+                    name = m.group(1)
                     entities["classes"].append({
-                        "name": match,
+                        "name": name,
                         "type": entity_type,
-                        "line": line_number,
-                        "file": str(file_path),
-                        "methods": self._extract_class_methods(content, match)
+                        "line": line_of(m, 1),
+                        "file": file_str,
+                        "methods": self._extract_class_methods(content, name)
                     })
 
             # React Component detection (SNIPER PRECISION)
-            react_patterns = [
-                (r'react\.(createElement|FC)\([^,]*,\s*(\w+)', "react_component"),
-                (r'export\s+(?:default\s+)?(?:const|let|var)\s+(\w+)\s*=\s*\(\s*<', "react_component"),
-                (r'function\s+(\w+)\s*\([^)]*\)\s*\{\s*return\s*<', "react_function_component"),
-                (r'const\s+(\w+)\s*=\s*\(\s*\([^)]*\)\s*\{\s*return\s*<', "react_arrow_component")
-            ]
-
-            for pattern, entity_type in react_patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    line_number = content.split('\n').index([line for line in content.split('\n') if match in line][0]) + 1 if match in content else 0
+            component_props = None  # Props extraction does not depend on the name
+            for pattern, entity_type in self.SNIPER_REACT_PATTERNS:
+                for m in pattern.finditer(content):
+                    group = pattern.groups  # Component name is the last group
+                    if component_props is None:
+                        component_props = self._extract_component_props(content, m.group(group))
                     entities["react_components"].append({
-                        "name": match,
+                        "name": m.group(group),
                         "type": entity_type,
-                        "line": line_number,
-                        "file": str(file_path),
-                        "props": self._extract_component_props(content, match)
+                        "line": line_of(m, group),
+                        "file": file_str,
+                        "props": list(component_props)
                     })
 
             # API Endpoint detection (SNIPER PRECISION)
-            api_patterns = [
-                (r'@app\.(get|post|put|delete|patch)\([\'"]([^\'"]+)[\'"]', "flask_endpoint"),
-                (r'router\.(get|post|put|delete|patch)\([\'"]([^\'"]+)[\'"]', "fastapi_endpoint"),
-                (r'app\.(get|post|put|delete|patch)\([\'"]([^\'"]+)[\'"]', "express_route"),
-                (r'function\s+(\w+)\s*\([^)]*\)\s*\{[^}]*res\.(json|send|status)', "nodejs_api_function")
-            ]
-
-            for pattern, entity_type in api_patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        line_number = content.split('\n').index([line for line in content.split('\n') if match[1] in line][0]) + 1 if match[1] in content else 0
-                        entities["api_endpoints"].append({
-                            "name": match[1],
-                            "type": entity_type,
-                            "line": line_number,
-                            "file": str(file_path),
-                            "method": match[0]
-                        })
+            for pattern, entity_type in self.SNIPER_API_PATTERNS:
+                for m in pattern.finditer(content):
+                    entities["api_endpoints"].append({
+                        "name": m.group(2),
+                        "type": entity_type,
+                        "line": line_of(m, 2),
+                        "file": file_str,
+                        "method": m.group(1)
+                    })
 
             # Database operation detection (SNIPER PRECISION)
-            db_patterns = [
-                (r'(CREATE|DROP|ALTER)\s+TABLE', "sql_ddl"),
-                (r'(INSERT|UPDATE|DELETE|SELECT)\s+INTO|FROM', "sql_dml"),
-                (r'\.execute\([\'"]\s*(SELECT|INSERT|UPDATE|DELETE)', "database_execute"),
-                (r'\.query\([\'"]\s*(SELECT|INSERT|UPDATE|DELETE)', "database_query"),
-                (r'async\s+def\s+\w+.*:.*await\s+(cursor\.|connection\.)', "async_database_operation")
-            ]
-
-            for pattern, entity_type in db_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    line_number = content.split('\n').index([line for line in content.split('\n') if pattern.split('\\s')[0] in line.upper()][0]) + 1
+            for pattern, entity_type in self.SNIPER_DB_PATTERNS:
+                for m in pattern.finditer(content):
                     entities["database_operations"].append({
-                        "operation": match,
+                        "operation": m.group(1) or "",
                         "type": entity_type,
-                        "line": line_number,
-                        "file": str(file_path)
+                        "line": line_of(m),
+                        "file": file_str
                     })
 
             # HTML Component detection (SNIPER PRECISION)
-            html_patterns = [
-                (r'def\s+_(generate_?\w*_html)', "python_html_generator"),
-                (r'innerHTML\s*=\s*[\'"]([^\'"]*)', "javascript_inner_html"),
-                (r'createElement\([\'"]\w+[\'"]', "javascript_create_element"),
-                (r'<(\w+)(?:\s[^>]*)?[^>]*>', "html_tag"),
-                (r'react\.createElement\([\'"]\w+[\'"]', "react_create_element")
-            ]
-
-            for pattern, entity_type in html_patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        match = match[0] if match[0] else match[1]
-                    line_number = content.split('\n').index([line for line in content.split('\n') if pattern.split('\\(')[0] in line][0]) + 1
+            for pattern, entity_type in self.SNIPER_HTML_PATTERNS:
+                for m in pattern.finditer(content):
+                    element = m.group(1) if pattern.groups else m.group(0)
                     entities["html_components"].append({
-                        "element": match,
+                        "element": element,
                         "type": entity_type,
-                        "line": line_number,
-                        "file": str(file_path)
+                        "line": line_of(m, 1 if pattern.groups else 0),
+                        "file": file_str
                     })
 
             return {
-                "file_path": str(file_path),
+                "file_path": file_str,
                 "entity_count": sum(len(entities[key]) for key in entities),
                 "entities": entities,
-                "scan_timestamp": datetime.datetime.now().isoformat()
+                "scan_timestamp": datetime.datetime.now().isoformat(),
+                "scan_time_ms": round((time.perf_counter() - scan_start) * 1000, 3)
             }
 
         except Exception as e:
@@ -4875,9 +9075,22 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
                 "file_path": str(file_path),
                 "entity_count": 0,
                 "entities": {},
-                "error": str(e)
+                "error": str(e),
+                "scan_time_ms": round((time.perf_counter() - scan_start) * 1000, 3)
             }
 
+    def _lines_after(self, content: str, pos: int, limit: int) -> list:
+        """Up to `limit` lines starting at `pos` without splitting the whole file"""
+        lines = []
+        while len(lines) < limit:
+            end = content.find('\n', pos)
+            if end == -1:
+                lines.append(content[pos:])
+                break
+            lines.append(content[pos:end])
+            pos = end + 1
+        return lines
+
     def _calculate_function_complexity(self, content: str, function_name: str) -> str:
         """Calculate function complexity score"""
         try:
@@ -4887,7 +9100,7 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
                 return "UNKNOWN"
 
             start_pos = function_match.end()
-            lines = content[start_pos:].split('\n')
+            lines = self._lines_after(content, start_pos, 100)
 
             # Simple complexity metrics
             complexity = 0
@@ -4934,7 +9147,7 @@ Keep descriptions CONCISE and PURPOSE-FOCUSED."""
                 return []
 
             start_pos = class_match.end()
-            lines = content[start_pos:].split('\n')
+            lines = self._lines_after(content, start_pos, 200)
             methods = []
             base_indent = len(lines[0]) - len(lines[0].lstrip()) if lines else 0
 
@@ -5134,6 +9347,8 @@ class UltraThinkMermaidMaximizer:
             >>> diagrams = maximizer.generate_smart_diagrams(data)
         """
         self.project_path = project_path
+        self.start_time = None  # Analysis start timestamp (None = no time budget running)
+        self.abort_analysis = False  # Emergency abort flag
 
     def generate_smart_diagrams(self, enhanced_data: dict) -> list:
         """Generate 5 focused diagrams for maximum insights"""
@@ -5522,34 +9737,65 @@ class UltraThinkMermaidMaximizer:
             # Multi-project ecosystem: INTELLIGENT ESTIMATION first!
             print(f"[%] Detected {len(project_dirs)} projects - using intelligent estimation...")
 
-            # STEP 1: Quick sample (first 3 projects)
-            sample_size = min(3, len(project_dirs))
-            sample_projects = project_dirs[:sample_size]
-
-            print(f"   🔍 Sampling {sample_size} projects for quick estimation...")
-            sample_file_counts = []
-            for sample_proj in sample_projects:
-                try:
-                    # Quick count (limited depth, 30s timeout)
-                    quick_info = self.scan_project_optimized(sample_proj)
-                    sample_file_counts.append(quick_info.get("file_count", 0))
-                except:
-                    sample_file_counts.append(0)
-
-            # STEP 2: Estimate total files
-            avg_files_per_project = sum(sample_file_counts) / len(sample_file_counts) if sample_file_counts else 0
-            estimated_total_files = int(avg_files_per_project * len(project_dirs))
+            # STEP 1: Probe every project, stratify by size, sample within a budget
+            budget_seconds = 30.0
+            cut_off_counts = []  # Files listed by sampled walks the budget cut short
 
-            print(f"   📊 Estimated: ~{estimated_total_files:,} total files across {len(project_dirs)} projects")
+            def count_files(project, should_stop):
+                # Shared, so the full scan below reuses the sampled projects' walks
+                inventory = FileInventory.shared(project, should_stop)
+                files = sum(
+                    len(files) for _, _, files in inventory.walk(self.FAST_SCAN_SKIP_DIRS)
+                )
+                if not inventory.complete:
+                    cut_off_counts.append(files)
+                    return None  # Walk cut off by the budget: only a lower bound
+                return files
+
+            print(f"   🔍 Probing {len(project_dirs)} projects and sampling by size strata...")
+            estimate = StratifiedFileEstimator(
+                project_dirs, count_files, budget_seconds=budget_seconds
+            ).estimate()
+            sample_size = estimate["sampled"]
+
+            # STEP 2: Estimate total files (with a 95% confidence interval)
+            if not sample_size:
+                # Every sampled walk hit the budget: no point estimate, only a lower bound
+                estimate.update(estimate=None, ci_low=sum(cut_off_counts), ci_high=None)
+                estimated_total_files = estimate["ci_low"]
+                estimated_label = f"≥{estimated_total_files:,}"
+                print(
+                    f"   📊 Estimated: {estimated_label} total files across {len(project_dirs)} projects "
+                    f"(lower bound: no sampled walk finished within the {budget_seconds:.0f}s budget)"
+                )
+            else:
+                estimated_total_files = estimate["estimate"]
+                estimated_label = f"{estimated_total_files:,}"
+                if estimate["ci_high"] is None:
+                    interval = f"≥{estimate['ci_low']:,}, unbounded"
+                else:
+                    interval = f"95% CI {estimate['ci_low']:,}–{estimate['ci_high']:,}"
+                print(
+                    f"   📊 Estimated: ~{estimated_label} total files ({interval}) across "
+                    f"{len(project_dirs)} projects from {sample_size} samples"
+                )
 
-            # STEP 3: Determine if we should do full scan or just use estimate
-            if estimated_total_files > 100000:  # >100K files = too large
-                print(f"   ⚠️  Estimated {estimated_total_files:,} files - using STATISTICAL SAMPLING")
+            # STEP 3: Determine if we should do full scan or just use estimate.
+            # The interval decides when it clears the cutoff; otherwise the point estimate
+            if estimate["ci_high"] is None or estimate["ci_low"] > 100000:
+                too_large = True
+            elif estimate["ci_high"] <= 100000:
+                too_large = False
+            else:
+                too_large = estimated_total_files > 100000
+            if too_large:  # >100K files = too large
+                print(f"   ⚠️  Estimated {estimated_label} files - using STATISTICAL SAMPLING")
                 # Just use the sample data and extrapolate
                 total_stats["total_files"] = estimated_total_files
                 total_stats["total_projects"] = len(project_dirs)
                 total_stats["estimation_mode"] = True
                 total_stats["sample_size"] = sample_size
+                total_stats["estimate"] = estimate
                 # Return early with estimated data
                 scan_time = time.time() - scan_start
                 project_data["summary"] = total_stats
@@ -5557,13 +9803,20 @@ class UltraThinkMermaidMaximizer:
                     "scan_time": scan_time,
                     "mode": "statistical_estimation",
                     "sample_projects": sample_size,
-                    "estimated_files": estimated_total_files
+                    "estimated_files": estimate["estimate"],  # None: unknown, see files_lower_bound
+                    "files_lower_bound": estimate["ci_low"],
+                    "confidence_interval": [estimate["ci_low"], estimate["ci_high"]],
+                    "confidence": estimate["confidence"],
                 }
-                print(f"[%] Quick estimation: {len(project_dirs)} projects, ~{estimated_total_files:,} files (estimated)")
+                print(f"[%] Quick estimation: {len(project_dirs)} projects, {'~' if sample_size else ''}{estimated_label} files (estimated)")
                 return project_data
 
             # STEP 4: If reasonable size, do full parallel scan
-            print(f"   ✅ Estimated {estimated_total_files:,} files - proceeding with full scan")
+            print(f"   ✅ Estimated {estimated_label} files - proceeding with full scan")
+            total_stats["estimate"] = estimate
+            # One traversal of the whole ecosystem; per-project scans slice it
+            FileInventory.shared(self.project_path)
+            from concurrent.futures import ThreadPoolExecutor, as_completed
             with ThreadPoolExecutor(max_workers=8) as executor:
                 futures = {}
                 for item in project_dirs:
@@ -5604,6 +9857,9 @@ class UltraThinkMermaidMaximizer:
             "files_discovered": total_stats["total_files"],
             "scan_strategy": "parallel_optimized",
         }
+        covered = FileInventory.covering(self.project_path)
+        if covered:
+            project_data["scan_metadata"]["inventory"] = dict(covered[0].stats)
         print(
             f"[%] Surface scan: {total_stats['total_projects']} projects, {total_stats['total_files']} files ({scan_time:.1f}s)"
         )
@@ -5611,6 +9867,34 @@ class UltraThinkMermaidMaximizer:
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ scan_project_optimized                                                             ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    FAST_SCAN_SKIP_DIRS = BUILD_SKIP_DIRS | {
+        "target",
+        "vendor",
+        ".next",
+        ".nuxt",
+        "coverage",
+        "site-packages",
+    }
+
+    COMPREHENSIVE_MODE = False  # 99.9% accurate counting; the surface scan enables it for single projects
+    MAX_ANALYSIS_TIME = 180  # Seconds, as MrFixMyProjectPlease; set per instance to change
+    DEEP_SAMPLE_SIZE = None  # Deep-analysis files per project (None = scale with time budget)
+    DEEP_SECONDS_PER_FILE = 0.004  # Typical read(10KB) + pattern/quality pass
+    DEEP_SAMPLE_BOUNDS = (10, 5000)
+    check_time_limit = MrFixMyProjectPlease.check_time_limit  # Same budget rule over this instance's state
+
+    def _deep_sample_capacity(self) -> int:
+        """Reservoir size: DEEP_SAMPLE_SIZE, or a quarter of the remaining time budget"""
+        if self.DEEP_SAMPLE_SIZE:
+            return max(1, int(self.DEEP_SAMPLE_SIZE))
+        budget = self.MAX_ANALYSIS_TIME
+        remaining = budget - (time.time() - self.start_time) if self.start_time else budget
+        low, high = self.DEEP_SAMPLE_BOUNDS
+        capacity = max(low, min(high, int(max(0, remaining) * 0.25 / self.DEEP_SECONDS_PER_FILE)))
+        # Memory pressure shrinks the sample (the CI widens accordingly)
+        GOVERNOR.checkpoint()
+        return GOVERNOR.sample_limit(capacity, "deep_sample")
+
     def scan_project_optimized(self, project_path: Path) -> dict:
         """Optimized project scanning with risk assessment"""
         project_info = {
@@ -5634,7 +9918,9 @@ class UltraThinkMermaidMaximizer:
                 "has_git": False,
                 "has_ci_cd": False,
             },
-            "sample_files": [],  # For deep analysis later
+            "sample_files": [],  # For deep analysis later (reservoir sample, random order)
+            "sample_strata": [],  # Stratum of each sample file ("top_dir|.ext")
+            "sample_population": {},  # Stratum -> files seen by the walk
         }
         try:
             max_depth = 0
@@ -5642,42 +9928,33 @@ class UltraThinkMermaidMaximizer:
             # HIGH PRIORITY FIX #6: Progress indicator for COMPREHENSIVE_MODE
             progress_counter = 0
             last_progress_print = 0
-            for root, dirs, files in os.walk(project_path, followlinks=False):
+            # Shared single-pass inventory: reuse the run's traversal when it
+            # already covers this project, otherwise build (and share) one now
+            covered = FileInventory.covering(project_path)
+            if covered:
+                inventory, start = covered
+            else:
+                inventory, start = FileInventory.shared(project_path), ""
+            start_depth = start.count(os.sep) + 1 if start else 0
+            reservoir = StratifiedReservoirSampler(
+                self._deep_sample_capacity(), seed=str(project_path)
+            )
+            # Skip large directories ONLY in fast mode (not in comprehensive mode)
+            if not self.COMPREHENSIVE_MODE:
+                skip_dirs = self.FAST_SCAN_SKIP_DIRS
+            else:
+                # HIGH PRIORITY FIX #6: In COMPREHENSIVE_MODE, still skip corrupt/useless data
+                # TOTALITY: Skip .git internals, __pycache__, node_modules (not real project files)
+                skip_dirs = DEFAULT_SKIP_DIRS
+            for rel_dir, dirs, files in inventory.walk(skip_dirs, start):
                 # Calculate depth
-                current_depth = root.count(os.sep) - str(project_path).count(os.sep)
+                current_depth = (rel_dir.count(os.sep) + 1 if rel_dir else 0) - start_depth
                 max_depth = max(max_depth, current_depth)
-                # Skip large directories ONLY in fast mode (not in comprehensive mode)
-                if not self.COMPREHENSIVE_MODE:
-                    dirs[:] = [
-                        d
-                        for d in dirs
-                        if d
-                        not in [
-                            "node_modules",
-                            "__pycache__",
-                            ".git",
-                            "dist",
-                            "build",
-                            "target",
-                            "vendor",
-                            ".next",
-                            ".nuxt",
-                            "coverage",
-                            "site-packages",
-                        ]
-                    ]
-                else:
-                    # HIGH PRIORITY FIX #6: In COMPREHENSIVE_MODE, still skip corrupt/useless data
-                    # TOTALITY: Skip .git internals, __pycache__, node_modules (not real project files)
-                    dirs[:] = [
-                        d
-                        for d in dirs
-                        if d not in [".git", "__pycache__", "node_modules"]
-                    ]
                 project_info["directory_count"] += len(dirs)
                 # Limit files per directory ONLY in fast mode
                 files_to_process = files if self.COMPREHENSIVE_MODE else files[:200]
-                for file in files_to_process:
+                for entry in files_to_process:
+                    file = entry.name
                     if self.abort_analysis:
                         break
                     # HIGH PRIORITY FIX #6: Progress indicator every 1000 files
@@ -5688,12 +9965,11 @@ class UltraThinkMermaidMaximizer:
                     ):
                         print(f"   📊 Scanned {progress_counter:,} files...", end="\r")
                         last_progress_print = progress_counter
-                    file_path = Path(root) / file
                     try:
                         # Quick stats
                         project_info["file_count"] += 1
                         # File type detection
-                        ext = file_path.suffix.lower()
+                        ext = entry.ext
                         project_info["file_types"][ext] += 1
                         # Risk assessment
                         if ext in [
@@ -5755,21 +10031,13 @@ class UltraThinkMermaidMaximizer:
                                 "has_build_config"
                             ] = True
                         # Sample collection for potential deep analysis
-                        if len(project_info["sample_files"]) < 10:
-                            if ext in [
-                                ".py",
-                                ".js",
-                                ".ts",
-                                ".tsx",
-                                ".jsx",
-                                ".md",
-                                ".json",
-                            ]:
-                                project_info["sample_files"].append(str(file_path))
-                        # File size analysis
-                        if file_path.exists():
-                            stat = file_path.stat()
-                            file_size = stat.st_size
+                        if ext in DEEP_SAMPLE_EXTENSIONS:
+                            rel_path = entry.path[len(start) + 1:] if start else entry.path
+                            top_dir = rel_path.split(os.sep, 1)[0] if os.sep in rel_path else "."
+                            reservoir.offer(entry.path, f"{top_dir}|{ext}")
+                        # File size analysis (stat captured once by the inventory)
+                        if entry.size >= 0:
+                            file_size = entry.size
                             project_info["total_size"] += file_size
                             file_sizes.append(file_size)
                             if file_size > 100_000_000:  # 100MB
@@ -5783,6 +10051,10 @@ class UltraThinkMermaidMaximizer:
                 print(
                     f"   ✅ Scan complete: {progress_counter:,} files analyzed with 100% accuracy"
                 )
+            for rel_path, stratum in reservoir.items():
+                project_info["sample_files"].append(str(inventory.absolute(rel_path)))
+                project_info["sample_strata"].append(stratum)
+            project_info["sample_population"] = dict(reservoir.population)
             # Calculate complexity metrics
             project_info["complexity_metrics"]["max_depth"] = max_depth
             if file_sizes:
@@ -5934,6 +10206,11 @@ class UltraThinkMermaidMaximizer:
             "naming_issues": [],
             "quality_metrics": {},
         }
+        inventory = FileInventory.shared(self.project_path)
+        cache = AnalysisCache.shared(self.project_path)
+        pipeline = ContentPipeline(("patterns", "quality"), helper=self)  # Prefix-only: reads the first 10 KB
+        observations = []  # (stratum, quality) per analyzed file
+        population = {}  # stratum -> files the surface walk saw
         # Analyze all projects with sampling
         for project_name, project_info in self.surface_scan.items():
             if project_name == "summary":
@@ -5941,36 +10218,71 @@ class UltraThinkMermaidMaximizer:
             if self.abort_analysis or self.check_time_limit():
                 break
             project_path = self.project_path / project_name
+            if project_name == self.project_path.name and not project_path.exists():
+                project_path = self.project_path  # Single-project mode: keyed by root name
             if not project_path.exists():
                 continue
-            # Analyze sample files
+            # Analyze sample files: the reservoir is in random order, so any
+            # prefix is still a random sample of its strata
             sample_files = project_info.get("sample_files", [])
+            sample_strata = project_info.get("sample_strata", [])
             files_to_analyze = sample_files[
                 : max(1, int(len(sample_files) * sampling_rate))
             ]
-            for file_path_str in files_to_analyze:
+            for position, file_path_str in enumerate(files_to_analyze):
                 if self.abort_analysis:
                     break
+                stratum = (
+                    f"{project_name}/{sample_strata[position]}"
+                    if position < len(sample_strata) else f"{project_name}/?"
+                )
                 try:
                     file_path = Path(file_path_str)
                     if not file_path.exists():
                         continue
-                    # Read and analyze content
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read(10240)  # Read first 10KB
+                    entry = inventory.entry_for(file_path)
+                    cached = cache.get("quality", file_path, entry)
+                    if cached is None:
+                        # Read and analyze content (parse-stage runs seed this cache)
+                        outputs, read = pipeline.run(file_path)
+                        pipeline.account(read, entry.size if entry else None)
+                        cached = ContentPipeline.quality_entry(outputs)
+                        if cached is None:
+                            continue  # Unreadable
+                        cache.put("quality", file_path, entry, cached)
                     results["files_analyzed"] += 1
-                    results["content_analyzed"] += len(content)
-                    # Pattern detection
-                    patterns = self.detect_patterns(content, file_path.suffix)
-                    results["patterns_found"].extend(patterns)
-                    # Quality metrics
-                    quality = self.analyze_code_quality(content, file_path.suffix)
-                    if quality:
-                        results["quality_metrics"][str(file_path)] = quality
+                    results["content_analyzed"] += cached["content_length"]
+                    results["patterns_found"].extend(cached["patterns"])
+                    if cached["quality"]:
+                        results["quality_metrics"][str(file_path)] = cached["quality"]
+                        observations.append((stratum, cached["quality"]))
                 except Exception as e:
                     continue
+            for stratum, count in project_info.get("sample_population", {}).items():
+                population[f"{project_name}/{stratum}"] = count
+        cache.commit()
+        results["content_pipeline"] = pipeline.summary()
         # Analyze patterns
         results["patterns_detected"] = len(set(results["patterns_found"]))
+        # Aggregate quality with sampling error (post-stratified over dir × extension)
+        aggregates = {
+            "mean_line_count": lambda q: q.get("line_count", 0),
+            "comment_rate": lambda q: 1.0 if q.get("has_comments") else 0.0,
+            "documentation_rate": lambda q: 1.0 if q.get("has_documentation") else 0.0,
+            "high_complexity_rate": lambda q: 1.0 if q.get("complexity_estimate") == "high" else 0.0,
+        }
+        results["quality_summary"] = {
+            name: StratifiedReservoirSampler.estimate_mean(
+                [(stratum, metric(quality)) for stratum, quality in observations], population
+            )
+            for name, metric in aggregates.items()
+        }
+        results["sampling"] = {
+            "method": "stratified_reservoir",
+            "population_files": sum(population.values()),
+            "strata": len(population),
+            "confidence": 0.95,
+        }
         return results
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ perform_standard_analysis                                                          ║
@@ -6171,27 +10483,39 @@ class UltraThinkMermaidMaximizer:
     # ║ execute_emergency_fallback                                                         ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
     def execute_emergency_fallback(self, error: Exception):
-        """Ultimate fallback when analysis fails"""
+        """Ultimate fallback when analysis fails (keeps any completed surface scan)"""
         print(f"🚨 Emergency fallback activated: {error}")
-        # Set minimal results for report generation
-        self.surface_scan = {
-            "summary": {
-                "total_projects": 0,
-                "total_files": 0,
-                "project_types": {},
-                "risk_factors": {"analysis_failed": True},
-                "scan_metadata": {"error": str(error)},
+        summary = self.surface_scan.get("summary") if isinstance(self.surface_scan, dict) else None
+        if summary:
+            # Stage 1 finished: report it instead of an empty shell
+            summary.setdefault("risk_factors", {})["analysis_failed"] = True
+            summary.setdefault("scan_metadata", {})["error"] = str(error)
+        else:
+            # Set minimal results for report generation
+            self.surface_scan = {
+                "summary": {
+                    "total_projects": 0,
+                    "total_files": 0,
+                    "project_types": {},
+                    "risk_factors": {"analysis_failed": True},
+                    "scan_metadata": {"error": str(error)},
+                }
             }
-        }
+        recommendations = [
+            "Analysis encountered critical errors",
+            "Manual investigation required",
+            "Consider reducing analysis scope",
+        ]
+        checkpoints = getattr(self, "checkpoints", None)
+        if checkpoints is not None and checkpoints.saved:
+            recommendations.insert(
+                0, f"Re-run with --resume to continue after: {', '.join(checkpoints.saved)}"
+            )
         self.ecosystem_intelligence = {
             "error_occurred": True,
             "error_message": str(error),
             "fallback_level": "emergency",
-            "recommendations": [
-                "Analysis encountered critical errors",
-                "Manual investigation required",
-                "Consider reducing analysis scope",
-            ],
+            "recommendations": recommendations,
         }
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ detect_patterns                                                                    ║
@@ -7218,6 +11542,21 @@ class UltraThinkMermaidMaximizer:
         }
         if total_time > 0:
             metrics["processing_rate"] = summary.get("total_files", 0) / total_time
+        # Persistent cache effectiveness (hits = files not re-read / re-parsed)
+        metrics["cache"] = AnalysisCache.shared(self.project_path).stats()
+        # LLM answers replayed instead of requested (seconds_saved = their original latency)
+        metrics["llm_cache"] = LLMResponseCache.shared(self.project_path).stats()
+        # Layer 3 / GPT-5 prompt sizes after compaction (tokens, folded subtrees, chunks)
+        metrics["prompt_compaction"] = PromptCompactor.shared().stats()
+        # Memory budget: peak usage and the degradations the governor applied
+        metrics["memory"] = GOVERNOR.report()
+        checkpoints = getattr(self, "checkpoints", None)
+        if checkpoints is not None:
+            metrics["checkpoints"] = checkpoints.summary()
+        if metrics["memory"]["peak_mb"]:
+            metrics["memory_usage"] = f"{metrics['memory']['peak_mb']:.0f} MB peak"
+        if TRACER.enabled:
+            metrics["trace"] = TRACER.summary()
         # Performance rating
         if metrics["processing_rate"] > 5000:
             metrics["time_efficiency"] = "excellent"
@@ -7397,6 +11736,7 @@ class UltraThinkMermaidMaximizer:
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ generate_html_report                                                               ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @TRACER.traced("html:report", "html")
     def generate_html_report(self, results: dict) -> str:
         """
         🚀 ENHANCED HTML GENERATOR WITH CENTRALIZED ARCHITECTURE
@@ -11004,6 +15344,7 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ _generate_temporal_html_optimized                                                  ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @TRACER.traced("html:temporal", "html")
     def _generate_temporal_html_optimized(self) -> str:
         """Generate INTERACTIVE TIMELINE with ALL files visible - horizontal scrolling navigation"""
         if (
@@ -11011,55 +15352,30 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
             or "file_timestamps" not in self.temporal_analysis
         ):
             return ""
-        # Get ALL files with timestamps from temporal_analysis
-        files_with_time = []
-        for f in self.temporal_analysis["file_timestamps"]:
-            # Convert datetime to timestamp
-            mtime = (
-                f["modified"].timestamp() if hasattr(f["modified"], "timestamp") else 0
-            )
-            if mtime > 0:
-                files_with_time.append(
-                    {
-                        "path": f.get("path", "unknown"),
-                        "name": Path(f.get("path", "unknown")).name,
-                        "mtime": mtime,
-                        "size": f.get("size", 0),
-                    }
-                )
-        files_with_time.sort(key=lambda x: x["mtime"])
-        if not files_with_time:
+        # Get ALL files with timestamps from the temporal table (row indexes, no copies)
+        table = self.temporal_analysis["file_timestamps"]
+        order = table.order_by_mtime(positive_only=True)
+        if not order:
             return ""
         # Get time range
-        min_time = files_with_time[0]["mtime"]
-        max_time = files_with_time[-1]["mtime"]
+        min_time = table.mtime[order[0]]
+        max_time = table.mtime[order[-1]]
         time_range = max_time - min_time
         if time_range == 0:
             return ""
         # Build timeline HTML
         from datetime import datetime
-        # Detect work session clusters (files within 4 hours = same session)
-        sessions = []
-        current_session = None
-        for f in files_with_time:
-            if not current_session:
-                current_session = {"start": f["mtime"], "end": f["mtime"], "files": [f]}
-            else:
-                time_diff_hours = (f["mtime"] - current_session["end"]) / 3600
-                if time_diff_hours <= 4:  # Same session
-                    current_session["end"] = f["mtime"]
-                    current_session["files"].append(f)
-                else:  # New session
-                    if len(current_session["files"]) >= 3:  # Meaningful session
-                        sessions.append(current_session)
-                    current_session = {
-                        "start": f["mtime"],
-                        "end": f["mtime"],
-                        "files": [f],
-                    }
-        # Add last session
-        if current_session and len(current_session["files"]) >= 3:
-            sessions.append(current_session)
+        # Detect work session clusters (files within 4 hours = same session);
+        # only files inside rendered sessions are materialized as dicts
+        sessions = []
+        for start, end in table.sessions(order, gap_hours=4, min_files=3):
+            sessions.append(
+                {
+                    "start": table.mtime[order[start]],
+                    "end": table.mtime[order[end - 1]],
+                    "files": [table.row(order[position]) for position in range(start, end)],
+                }
+            )
         # Get GPT-5 session names if available
         llm_session_names = (
             self.llm_insights.get("session_names", {}) if self.llm_insights else {}
@@ -11073,7 +15389,7 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
           <div id="timelineGlobalView" style="margin-top:20px;padding:16px;background:var(--surface-2);border-radius:8px;border:1px solid var(--border)">
             <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:12px">
               <div class="small" style="color:var(--muted)">
-                <strong data-en="Total Files:" data-pt="Total de Arquivos:">Total Files:</strong> {len(files_with_time):,} |
+                <strong data-en="Total Files:" data-pt="Total de Arquivos:">Total Files:</strong> {len(order):,} |
                 <strong data-en="Time Span:" data-pt="Período:">Time Span:</strong> {datetime.fromtimestamp(min_time).strftime('%b %d')} → {datetime.fromtimestamp(max_time).strftime('%b %d, %Y')} |
                 <strong data-en="Work Sessions:" data-pt="Sessões de Trabalho:">Work Sessions:</strong> {len(sessions)}
               </div>
@@ -11393,10 +15709,7 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
         from datetime import datetime, timedelta
         import calendar
         # Create activity map: {date_string: file_count}
-        daily_activity = {}
-        for f in files_with_time:
-            date_str = datetime.fromtimestamp(f["mtime"]).strftime("%Y-%m-%d")
-            daily_activity[date_str] = daily_activity.get(date_str, 0) + 1
+        daily_activity = table.bucket_counts(order, "day")
         # Get date range
         start_date = datetime.fromtimestamp(min_time).date()
         end_date = datetime.fromtimestamp(max_time).date()
@@ -12606,6 +16919,29 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
         total_time = perf.get("total_time", 0)
         files_processed = perf.get("files_processed", 0)
         processing_rate = perf.get("processing_rate", 0)
+        cache_stats = perf.get("cache") or {}
+        sniper_stats = perf.get("sniper_scan") or {}
+        trace_rows = perf.get("trace") or []
+        memory = perf.get("memory") or {}
+        cache_row = ""
+        if memory.get("budget_mb"):
+            cache_row += f"""
+              <tr>
+                <td data-en="Peak Memory / Budget" data-pt="Pico de Memória / Orçamento">Peak Memory / Budget</td>
+                <td class="mono">{memory.get('peak_mb', 0):,.0f} / {memory['budget_mb']:,.0f} MB ({memory.get('source')}, level: {memory.get('level', 'full')})</td>
+              </tr>"""
+        if sniper_stats.get("files_scanned"):
+            cache_row += f"""
+              <tr>
+                <td data-en="Sniper Entity Scan" data-pt="Varredura de Entidades">Sniper Entity Scan</td>
+                <td class="mono">{sniper_stats.get('total_ms', 0):,.0f} ms / {sniper_stats['files_scanned']:,} files (max {sniper_stats.get('max_ms', 0):,.1f} ms)</td>
+              </tr>"""
+        if cache_stats.get("enabled"):
+            cache_row += f"""
+              <tr>
+                <td data-en="Cache Hits / Misses" data-pt="Cache Acertos / Falhas">Cache Hits / Misses</td>
+                <td class="mono">{cache_stats.get('hits', 0):,} / {cache_stats.get('misses', 0):,}</td>
+              </tr>"""
         return f"""
         <details>
           <summary data-en="⚡ Performance Metrics" data-pt="⚡ Métricas de Performance">⚡ Performance Metrics</summary>
@@ -12622,11 +16958,78 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
               <tr>
                 <td data-en="Processing Rate" data-pt="Taxa de Processamento">Processing Rate</td>
                 <td class="mono">{processing_rate:.1f} files/s</td>
-              </tr>
+              </tr>{cache_row}
             </tbody>
-          </table>
+          </table>{self._generate_memory_degradations_html(memory.get("degradations") or [])}{self._generate_trace_table_html(trace_rows)}
         </details>
         """
+
+    def _generate_memory_degradations_html(self, degradations: list) -> str:
+        """Memory governor steps (spill / reduce / drop / abort) under Performance Metrics"""
+        if not degradations:
+            return ""
+        rows = ""
+        for step in degradations:
+            freed = f"{step['freed_mb']:,.1f} MB" if step.get("freed_mb") is not None else "-"
+            rows += f"""
+              <tr>
+                <td class="mono">{step['level']}</td>
+                <td class="mono">{step.get('structure') or '-'}</td>
+                <td class="mono">{step.get('stage') or '-'}</td>
+                <td class="mono">{step['usage_mb']:,.0f} / {step['limit_mb']:,.0f} MB</td>
+                <td class="mono">{freed}</td>
+                <td>{step.get('detail') or ''}</td>
+              </tr>"""
+        return f"""
+          <table class="table" style="margin-top:12px">
+            <thead>
+              <tr>
+                <th data-en="Degradation" data-pt="Degradação">Degradation</th>
+                <th data-en="Structure" data-pt="Estrutura">Structure</th>
+                <th data-en="Stage" data-pt="Etapa">Stage</th>
+                <th data-en="Usage / Limit" data-pt="Uso / Limite">Usage / Limit</th>
+                <th data-en="Freed" data-pt="Liberado">Freed</th>
+                <th data-en="Detail" data-pt="Detalhe">Detail</th>
+              </tr>
+            </thead>
+            <tbody>{rows}
+            </tbody>
+          </table>"""
+
+    def _generate_trace_table_html(self, trace_rows: list) -> str:
+        """--trace span summary (slowest first) under Performance Metrics"""
+        if not trace_rows:
+            return ""
+        rows = ""
+        for row in trace_rows[:25]:
+            rss = f"{row['rss_peak_mb']:,.0f} MB" if row.get("rss_peak_mb") is not None else "-"
+            volume = []
+            if row.get("files"):
+                volume.append(f"{row['files']:,} files")
+            if row.get("bytes"):
+                volume.append(f"{row['bytes'] / 1024 / 1024:,.1f} MB")
+            rows += f"""
+              <tr>
+                <td class="mono">{row['name']}</td>
+                <td class="mono">{row['calls']:,}</td>
+                <td class="mono">{row['total_ms']:,.1f} ms</td>
+                <td class="mono">{', '.join(volume) or '-'}</td>
+                <td class="mono">{rss}</td>
+              </tr>"""
+        return f"""
+          <table class="table" style="margin-top:12px">
+            <thead>
+              <tr>
+                <th data-en="Span" data-pt="Etapa">Span</th>
+                <th data-en="Calls" data-pt="Chamadas">Calls</th>
+                <th data-en="Total" data-pt="Total">Total</th>
+                <th data-en="Processed" data-pt="Processado">Processed</th>
+                <th data-en="Peak RSS" data-pt="Pico RSS">Peak RSS</th>
+              </tr>
+            </thead>
+            <tbody>{rows}
+            </tbody>
+          </table>"""
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ _translate_file_type                                                               ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
@@ -12803,35 +17206,36 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
         """Generate ASCII tree representation of project structure"""
         try:
             tree_lines = [str(self.project_path.name) + "/"]
-            def add_directory(path, prefix="", depth=0):
+            inventory = FileInventory.shared(self.project_path)
+            def add_directory(rel_dir, prefix="", depth=0):
                 """Perform add directory operation."""
                 if depth >= max_depth:
                     return
-                try:
-                    items = sorted(
-                        path.iterdir(), key=lambda x: (not x.is_dir(), x.name)
+                listing = inventory.listings.get(rel_dir)
+                if listing is None:
+                    return  # Unreadable or symlinked directory
+                items = sorted(
+                    listing[0] + listing[1], key=lambda x: (not x.is_dir, x.name)
+                )
+                items = [
+                    i
+                    for i in items
+                    if not i.name.startswith(".")
+                    and i.name not in DEFAULT_SKIP_DIRS
+                ][:20]
+                for i, item in enumerate(items):
+                    is_last = i == len(items) - 1
+                    current_prefix = "└── " if is_last else "├── "
+                    tree_lines.append(
+                        prefix
+                        + current_prefix
+                        + item.name
+                        + ("/" if item.is_dir else "")
                     )
-                    items = [
-                        i
-                        for i in items
-                        if not i.name.startswith(".")
-                        and i.name not in ["node_modules", "__pycache__"]
-                    ][:20]
-                    for i, item in enumerate(items):
-                        is_last = i == len(items) - 1
-                        current_prefix = "└── " if is_last else "├── "
-                        tree_lines.append(
-                            prefix
-                            + current_prefix
-                            + item.name
-                            + ("/" if item.is_dir() else "")
-                        )
-                        if item.is_dir():
-                            extension_prefix = "    " if is_last else "│   "
-                            add_directory(item, prefix + extension_prefix, depth + 1)
-                except (PermissionError, OSError):
-                    pass
-            add_directory(self.project_path)
+                    if item.is_dir:
+                        extension_prefix = "    " if is_last else "│   "
+                        add_directory(item.path, prefix + extension_prefix, depth + 1)
+            add_directory("")
             return "\\n".join(tree_lines[:100])  # Limit to 100 lines
         except Exception as e:
             return f"Error generating tree: {{str(e)}}"
@@ -13399,27 +17803,47 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
     # ║ run_advanced_analysis                                                              ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
     def run_advanced_analysis(self):
-        """Run all advanced analysis modules"""
+        """Run all advanced analysis modules (each one checkpointed for --resume)"""
+        checkpoints = getattr(self, "checkpoints", None) or CheckpointStore()
         try:
             # Temporal analysis
-            self.analyze_temporal_evolution()
+            with TRACER.span("temporal"), GOVERNOR.stage("temporal"):
+                checkpoints.run(
+                    "temporal", self.analyze_temporal_evolution, self,
+                    ("temporal_analysis", "work_sessions", "monthly_activity"),
+                )
             # Duplicate detection
-            self.detect_duplicates()
+            with TRACER.span("duplicates", "hashing"), GOVERNOR.stage("duplicates"):
+                checkpoints.run("duplicates", self.detect_duplicates, self, ("duplicate_analysis",))
             # Naming patterns
-            self.analyze_naming_patterns()
+            with TRACER.span("naming_patterns"):
+                checkpoints.run("naming", self.analyze_naming_patterns, self, ("naming_analysis",))
             # Directory purposes (Layer 2)
-            self.classify_directory_purposes()
+            with TRACER.span("directory_purposes"):
+                checkpoints.run(
+                    "directory_purposes", self.classify_directory_purposes, self, ("directory_purposes",)
+                )
             # 🔬 LAYER 3: Deep LLM Synthesis (NEW!)
             # Combines Layer 1 + Layer 2 + all context to eliminate unknowns
-            self.layer3_results = self.discover_emergent_purpose_layer3()
+            self.layer3_results = checkpoints.run(
+                "purpose_layer3", self.discover_emergent_purpose_layer3, self, ("directory_purposes",)
+            )
             # Technology stack
-            self.detect_technology_stack()
+            with TRACER.span("technology_stack"):
+                checkpoints.run("technology_stack", self.detect_technology_stack, self, ("tech_stack",))
             # Empty directories
-            self.detect_empty_directories()
+            with TRACER.span("empty_directories"):
+                checkpoints.run(
+                    "empty_directories", self.detect_empty_directories, self, ("empty_directories",)
+                )
             # Consolidation opportunities
-            self.find_consolidation_opportunities()
+            with TRACER.span("consolidation"):
+                checkpoints.run(
+                    "consolidation", self.find_consolidation_opportunities, self,
+                    ("consolidation_opportunities",),
+                )
             # GPT-5 analysis (if Doppler available)
-            self.analyze_with_gpt5()
+            checkpoints.run("gpt5", self.analyze_with_gpt5, self, ("llm_insights",))
             print("✅ Advanced analysis complete")
         except Exception as e:
             print(f"⚠️ Advanced analysis partial failure: {e}")
@@ -13430,7 +17854,7 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
         """Analyze file timestamps to extract work sessions and temporal patterns"""
         print("📅 Analyzing temporal evolution...")
         temporal_data = {
-            "file_timestamps": [],
+            "file_timestamps": FileTimestampTable(),
             "monthly_activity": defaultdict(int),
             "work_sessions": [],
             "creation_timeline": {},
@@ -13438,125 +17862,65 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
             "activity_patterns": {},
         }
         try:
-            # Collect all file timestamps
-            for root, dirs, files in os.walk(self.project_path):
-                # Skip large directories
-                dirs[:] = [
-                    d for d in dirs if d not in ["node_modules", "__pycache__", ".git"]
-                ]
-                for file in files:
-                    file_path = Path(root) / file
-                    try:
-                        stat = file_path.stat()
-                        mtime = datetime.datetime.fromtimestamp(stat.st_mtime)
-                        # MEDIUM PRIORITY FIX #9: Proper creation time detection
-                        # macOS/BSD: Use st_birthtime (true creation time)
-                        # Linux: Fallback to st_ctime (metadata change time)
-                        if hasattr(stat, "st_birthtime"):
-                            # macOS/BSD systems have true creation time
-                            ctime = datetime.datetime.fromtimestamp(stat.st_birthtime)
-                        else:
-                            # Linux: st_ctime is metadata change, not creation
-                            # Use st_mtime as best approximation
-                            ctime = datetime.datetime.fromtimestamp(stat.st_ctime)
-                        temporal_data["file_timestamps"].append(
-                            {
-                                "path": str(file_path.relative_to(self.project_path)),
-                                "modified": mtime,
-                                "created": ctime,
-                                "size": stat.st_size,
-                            }
-                        )
-                        # Monthly aggregation
-                        month_key = mtime.strftime("%Y-%m")
-                        temporal_data["monthly_activity"][month_key] += 1
-                    except (OSError, PermissionError):
-                        pass
+            # Collect all file timestamps (skip large directories) into columns
+            table = temporal_data["file_timestamps"]
+            inventory = FileInventory.shared(self.project_path)
+            for entry in inventory.iter_files(DEFAULT_SKIP_DIRS):
+                if entry.size < 0:
+                    continue  # stat failed during the inventory walk
+                # MEDIUM PRIORITY FIX #9: Proper creation time detection
+                # macOS/BSD: inventory ctime is st_birthtime (true creation time)
+                # Linux: Fallback to st_ctime (metadata change time)
+                if table.valid_timestamp(entry.mtime) and table.valid_timestamp(entry.ctime):
+                    table.append(entry)
+                    if not len(table) % 4096 and GOVERNOR.checkpoint() and GOVERNOR.degraded("spill"):
+                        freed = table.spill()
+                        if freed:
+                            GOVERNOR.note("spill", "file_timestamps", f"{freed / 1048576:.1f} MB of names to disk")
+            # Resident until the HTML report renders: spillable from now on
+            GOVERNOR.register("file_timestamps", size=table.nbytes, spill=table.spill)
+            order = table.order_by_mtime()
+            # Monthly aggregation (one datetime per month, not per file)
+            temporal_data["monthly_activity"].update(table.bucket_counts(order, "month"))
             # Detect work sessions (files modified within 4 hours = same session)
-            if temporal_data["file_timestamps"]:
-                sorted_files = sorted(
-                    temporal_data["file_timestamps"], key=lambda x: x["modified"]
+            sessions = []
+            for start, end in table.sessions(order, gap_hours=4, min_files=3):
+                session_start = datetime.datetime.fromtimestamp(table.mtime[order[start]])
+                session_end = datetime.datetime.fromtimestamp(table.mtime[order[end - 1]])
+                sessions.append(
+                    {
+                        "start": session_start.strftime("%Y-%m-%d %H:%M"),
+                        "end": session_end.strftime("%Y-%m-%d %H:%M"),
+                        "duration_minutes": int(
+                            (session_end - session_start).total_seconds() / 60
+                        ),
+                        "file_count": end - start,
+                        "sample_files": [
+                            table.path(order[position])
+                            for position in range(start, min(end, start + 5))
+                        ],
+                    }
                 )
-                current_session = {
-                    "start": None,
-                    "end": None,
-                    "files": [],
-                    "file_count": 0,
-                }
-                sessions = []
-                for file_data in sorted_files:
-                    if not current_session["start"]:
-                        current_session["start"] = file_data["modified"]
-                        current_session["end"] = file_data["modified"]
-                        current_session["files"].append(file_data["path"])
-                        current_session["file_count"] = 1
-                    else:
-                        time_diff = (
-                            file_data["modified"] - current_session["end"]
-                        ).total_seconds() / 3600
-                        if time_diff <= 4:  # Same session (within 4 hours)
-                            current_session["end"] = file_data["modified"]
-                            current_session["files"].append(file_data["path"])
-                            current_session["file_count"] += 1
-                        else:
-                            # Save current session and start new one
-                            if (
-                                current_session["file_count"] >= 3
-                            ):  # Only meaningful sessions
-                                duration_minutes = (
-                                    current_session["end"] - current_session["start"]
-                                ).total_seconds() / 60
-                                sessions.append(
-                                    {
-                                        "start": current_session["start"].strftime(
-                                            "%Y-%m-%d %H:%M"
-                                        ),
-                                        "end": current_session["end"].strftime(
-                                            "%Y-%m-%d %H:%M"
-                                        ),
-                                        "duration_minutes": int(duration_minutes),
-                                        "file_count": current_session["file_count"],
-                                        "sample_files": current_session["files"][:5],
-                                    }
-                                )
-                            current_session = {
-                                "start": file_data["modified"],
-                                "end": file_data["modified"],
-                                "files": [file_data["path"]],
-                                "file_count": 1,
-                            }
-                # Don't forget last session
-                if current_session["file_count"] >= 3:
-                    duration_minutes = (
-                        current_session["end"] - current_session["start"]
-                    ).total_seconds() / 60
-                    sessions.append(
-                        {
-                            "start": current_session["start"].strftime(
-                                "%Y-%m-%d %H:%M"
-                            ),
-                            "end": current_session["end"].strftime("%Y-%m-%d %H:%M"),
-                            "duration_minutes": int(duration_minutes),
-                            "file_count": current_session["file_count"],
-                            "sample_files": current_session["files"][:5],
-                        }
-                    )
-                temporal_data["work_sessions"] = sorted(
-                    sessions, key=lambda x: x["start"], reverse=True
-                )[:20]
+            temporal_data["work_sessions"] = sorted(
+                sessions, key=lambda x: x["start"], reverse=True
+            )[:20]
             # Calculate project age
-            if temporal_data["file_timestamps"]:
-                oldest = min(
-                    temporal_data["file_timestamps"], key=lambda x: x["created"]
-                )
-                newest = max(
-                    temporal_data["file_timestamps"], key=lambda x: x["modified"]
-                )
+            if len(table):
+                oldest = min(range(len(table)), key=table.ctime.__getitem__)
+                newest = max(range(len(table)), key=table.mtime.__getitem__)
                 temporal_data["project_age_days"] = (
-                    newest["modified"] - oldest["created"]
+                    datetime.datetime.fromtimestamp(table.mtime[newest])
+                    - datetime.datetime.fromtimestamp(table.ctime[oldest])
                 ).days
-                temporal_data["oldest_file"] = oldest["path"]
-                temporal_data["newest_file"] = newest["path"]
+                temporal_data["oldest_file"] = table.path(oldest)
+                temporal_data["newest_file"] = table.path(newest)
+            temporal_data["storage"] = {
+                "rows": len(table),
+                "directories": len(table.directories),
+                "bytes": table.nbytes(),
+                "backend": "numpy" if optional_import("numpy") is not None else "array",
+                "names_spilled": isinstance(table.names, SpilledStringList),
+            }
             self.temporal_analysis = temporal_data
             self.work_sessions = temporal_data["work_sessions"]
             self.monthly_activity = dict(temporal_data["monthly_activity"])
@@ -13568,6 +17932,39 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
     # ║ DUPLICATE DETECTION - Hash-based + Name similarity                                 ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
     # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ _edge_digest / _content_digest - duplicate detection hashing                       ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _edge_digest(self, abs_path: str, file_size: int, io_stats: dict) -> str:
+        """Hash of the first and last DUPLICATE_EDGE_BYTES (cheap pre-filter)"""
+        digest = new_duplicate_hasher()
+        with open(abs_path, "rb") as f:
+            head = f.read(DUPLICATE_EDGE_BYTES)
+            f.seek(max(0, file_size - DUPLICATE_EDGE_BYTES))
+            tail = f.read(DUPLICATE_EDGE_BYTES)
+        digest.update(head)
+        digest.update(tail)
+        io_stats["bytes_read"] += len(head) + len(tail)
+        io_stats["files_edge_hashed"] += 1
+        return digest.hexdigest()
+
+    def _content_digest(self, abs_path: str, file_size: int, io_stats: dict) -> str:
+        """Full-content hash via mmap (chunked read fallback for special files)"""
+        import mmap
+        digest = new_duplicate_hasher()
+        with open(abs_path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+                    bytes_read = len(mapped)
+            except (ValueError, OSError):
+                bytes_read = 0
+                while chunk := f.read(1024 * 1024):
+                    digest.update(chunk)
+                    bytes_read += len(chunk)
+        io_stats["bytes_read"] += bytes_read
+        io_stats["files_fully_hashed"] += 1
+        return digest.hexdigest()
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
     # ║ detect_duplicates                                                                  ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
     def detect_duplicates(self) -> dict:
@@ -13582,41 +17979,133 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
         try:
             file_hashes = defaultdict(list)
             file_names = defaultdict(list)
-            # Collect file hashes and names
-            for root, dirs, files in os.walk(self.project_path):
-                dirs[:] = [
-                    d
-                    for d in dirs
-                    if d not in ["node_modules", "__pycache__", ".git", "dist", "build"]
-                ]
-                for file in files:
-                    file_path = Path(root) / file
+            # Phase 0: collect candidates and names, grouped by size (no reads)
+            inventory = FileInventory.shared(self.project_path)
+            cache = AnalysisCache.shared(self.project_path)
+            root_str = str(inventory.root)
+            candidates = []
+            size_buckets = defaultdict(list)
+            for entry in inventory.iter_files(BUILD_SKIP_DIRS):
+                file_size = entry.size
+                if file_size < 0:
+                    continue  # stat failed during the inventory walk
+                # Skip extremely large files (>500MB) to prevent runaway processing
+                if file_size > 500_000_000:
+                    continue
+                candidates.append(entry)
+                size_buckets[file_size].append(entry)
+                # Collect names for similarity analysis
+                file_names[entry.name.lower()].append(entry.path)
+
+            io_stats = {
+                "files_considered": len(candidates),
+                "bytes_considered": sum(entry.size for entry in candidates),
+                "bytes_read": 0,
+                "files_unique_size": 0,
+                "files_edge_hashed": 0,
+                "files_fully_hashed": 0,
+                "files_hash_cached": 0,
+                "hash_algorithm": duplicate_hash_name(),
+            }
+            # Phase 1: a file with a unique size cannot have a duplicate.
+            # Phase 2: same size → hash first/last 64KB; Phase 3: full hash
+            # (mmap) only for files whose edges still collide.
+            digests = {}
+            hash_kind = f"content_hash:{duplicate_hash_name()}"
+            spilled = []  # Non-empty once spill_digests() moved the digests to the cache
+
+            def digest_bytes():
+                import sys
+                return sys.getsizeof(digests) + sum(
+                    sys.getsizeof(digest) for digest in list(digests.values())
+                )
+
+            def spill_digests():
+                """Release every digest the analysis cache holds; digest_of() re-reads them"""
+                if not cache.enabled:
+                    return 0
+                before = digest_bytes()
+                cache.commit()
+                for path, digest in list(digests.items()):
+                    if digest != "empty":  # Zero-byte files are never cached
+                        digests.pop(path, None)
+                spilled.append(True)
+                return max(0, before - digest_bytes())
+
+            def digest_of(entry):
+                digest = digests.get(entry.path)
+                if digest is None and spilled and len(size_buckets[entry.size]) > 1:
+                    digest = cache.get(hash_kind, os.path.join(root_str, entry.path), entry)
+                return digest
+
+            for file_size, bucket in size_buckets.items():
+                if len(bucket) < 2:
+                    io_stats["files_unique_size"] += 1
+                    continue
+                if GOVERNOR.checkpoint() and GOVERNOR.degraded("spill") and len(digests) >= 4096:
+                    freed = spill_digests()
+                    if freed:
+                        GOVERNOR.note("spill", "duplicate_digests", f"{freed / 1048576:.1f} MB of digests to the analysis cache")
+                if file_size == 0:
+                    for entry in bucket:
+                        digests[entry.path] = "empty"
+                    continue
+                edge_groups = defaultdict(list)
+                for entry in bucket:
+                    abs_path = os.path.join(root_str, entry.path)
+                    cached_digest = cache.get(hash_kind, abs_path, entry)
+                    if cached_digest is not None:
+                        io_stats["files_hash_cached"] += 1
+                        digests[entry.path] = cached_digest
+                        continue
                     try:
-                        # HIGH PRIORITY FIX #7: Chunked hashing to prevent memory spikes
-                        # Calculate hash for exact duplicates using chunked reading
-                        md5_hash = hashlib.md5()
-                        file_size = file_path.stat().st_size
-                        # Skip extremely large files (>500MB) to prevent runaway processing
-                        if file_size > 500_000_000:
-                            continue
-                        with open(file_path, "rb") as f:
-                            # Read in 8KB chunks to prevent memory spikes
-                            while chunk := f.read(8192):
-                                md5_hash.update(chunk)
-                        file_hash = md5_hash.hexdigest()
-                        file_hashes[file_hash].append(
-                            {
-                                "path": str(file_path.relative_to(self.project_path)),
-                                "size": file_size,
-                                "name": file,
-                            }
-                        )
-                        # Collect names for similarity analysis
-                        file_names[file.lower()].append(
-                            str(file_path.relative_to(self.project_path))
-                        )
-                    except (OSError, PermissionError, IOError):
+                        if file_size <= 2 * DUPLICATE_EDGE_BYTES:
+                            # Edges cover the whole file: this is the full hash
+                            digest = self._content_digest(abs_path, file_size, io_stats)
+                            digests[entry.path] = digest
+                            cache.put(hash_kind, abs_path, entry, digest)
+                        else:
+                            edge = self._edge_digest(abs_path, file_size, io_stats)
+                            edge_groups[edge].append((entry, abs_path))
+                    except (OSError, ValueError):
                         pass
+                # A cached full hash in this bucket may still match a lone edge group
+                bucket_has_digest = any(digest_of(entry) is not None for entry in bucket)
+                for group in edge_groups.values():
+                    if len(group) < 2 and not bucket_has_digest:
+                        continue  # Unique head/tail bytes → cannot be a duplicate
+                    for entry, abs_path in group:
+                        try:
+                            digest = self._content_digest(abs_path, file_size, io_stats)
+                            digests[entry.path] = digest
+                            cache.put(hash_kind, abs_path, entry, digest)
+                        except (OSError, ValueError):
+                            pass
+            cache.commit()
+            # Resident until the duplicate groups are built: spillable from now on
+            GOVERNOR.register("duplicate_digests", size=digest_bytes, spill=spill_digests)
+            io_stats["bytes_skipped"] = io_stats["bytes_considered"] - io_stats["bytes_read"]
+            TRACER.count(
+                files=io_stats["files_edge_hashed"] + io_stats["files_fully_hashed"],
+                bytes=io_stats["bytes_read"],
+            )
+            io_stats["bytes_read_ratio"] = (
+                io_stats["bytes_read"] / io_stats["bytes_considered"]
+                if io_stats["bytes_considered"]
+                else 0.0
+            )
+            duplicate_data["io_stats"] = io_stats
+            # Keep walk order so duplicate groups are reported as before
+            for entry in candidates:
+                digest = digest_of(entry)
+                if digest is not None:
+                    file_hashes[(entry.size, digest)].append(
+                        {
+                            "path": entry.path,
+                            "size": entry.size,
+                            "name": entry.name,
+                        }
+                    )
             # Find exact duplicates
             for file_hash, files in file_hashes.items():
                 if len(files) > 1:
@@ -13631,23 +18120,36 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
                     duplicate_data["total_duplicate_size"] += files[0]["size"] * (
                         len(files) - 1
                     )
-            # Find similar names (potential duplicates)
+            # Find similar names (potential duplicates) via an indexed join.
+            # Memory pressure: join a hash-selected sample of the names (reduce),
+            # keep at most three paths per reported name (drop).
             all_names = list(file_names.keys())
-            for i, name1 in enumerate(all_names):
-                for name2 in all_names[i + 1 :]:
-                    similarity = SequenceMatcher(None, name1, name2).ratio()
-                    if (
-                        similarity > 0.85 and similarity < 1.0
-                    ):  # Very similar but not identical
-                        duplicate_data["similar_names"].append(
-                            {
-                                "name1": name1,
-                                "name2": name2,
-                                "similarity": f"{similarity:.1%}",
-                                "paths1": file_names[name1],
-                                "paths2": file_names[name2],
-                            }
-                        )
+            GOVERNOR.checkpoint(force=True)
+            limit = GOVERNOR.sample_limit(len(all_names), "similar_names")
+            if limit < len(all_names):
+                # The names with the smallest CRC32: deterministic, and unlike a prefix of
+                # walk order not biased toward the first directories listed
+                import heapq
+                import zlib
+                kept = set(heapq.nsmallest(
+                    limit, all_names, key=lambda name: zlib.crc32(name.encode("utf-8", "surrogateescape"))
+                ))
+                all_names = [name for name in all_names if name in kept]
+            max_paths = None
+            if GOVERNOR.degraded("drop"):
+                max_paths = 3
+                GOVERNOR.note("drop", "duplicate_paths", "paths per similar/versioned name capped at 3")
+            for i, j, similarity in find_similar_name_pairs(all_names, 0.85):
+                name1, name2 = all_names[i], all_names[j]
+                duplicate_data["similar_names"].append(
+                    {
+                        "name1": name1,
+                        "name2": name2,
+                        "similarity": f"{similarity:.1%}",
+                        "paths1": file_names[name1][:max_paths],
+                        "paths2": file_names[name2][:max_paths],
+                    }
+                )
             # Detect version patterns (file_v1.txt, file_v2.txt, file_old.txt, etc)
             version_patterns = [
                 r"_v\d+",
@@ -13667,7 +18169,7 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
                                 {
                                     "base_name": base_name,
                                     "versions": [name],
-                                    "paths": paths,
+                                    "paths": paths[:max_paths],
                                 }
                             )
             self.duplicate_analysis = duplicate_data
@@ -13699,16 +18201,14 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
         }
         try:
             all_names = []
-            for root, dirs, files in os.walk(self.project_path):
-                dirs[:] = [
-                    d for d in dirs if d not in ["node_modules", "__pycache__", ".git"]
-                ]
+            inventory = FileInventory.shared(self.project_path)
+            for _, dirs, files in inventory.walk(DEFAULT_SKIP_DIRS):
                 # Analyze directory names
-                for dir_name in dirs:
-                    all_names.append(dir_name)
+                for dir_entry in dirs:
+                    all_names.append(dir_entry.name)
                 # Analyze filenames (without extension)
-                for file in files:
-                    name_without_ext = Path(file).stem
+                for entry in files:
+                    name_without_ext = Path(entry.name).stem
                     all_names.append(name_without_ext)
             # Detect conventions
             for name in all_names:
@@ -13795,10 +18295,11 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
             "folder_purposes", {}
         )
         try:
-            for root, dirs, files in os.walk(self.project_path):
-                rel_path = Path(root).relative_to(self.project_path)
+            inventory = FileInventory.shared(self.project_path)
+            for rel_dir, dirs, files in inventory.walk():
+                rel_path = Path(rel_dir) if rel_dir else Path(".")
                 # Classify directory
-                dir_name = Path(root).name.lower()
+                dir_name = inventory.absolute(rel_dir).name.lower()
                 purpose = "unknown"
                 # First: Check Layer 1 purpose map (most accurate)
                 if str(rel_path) == "." or rel_path == Path("."):
@@ -13848,6 +18349,7 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
         except Exception as e:
             logger.error(f"Directory purpose classification failed: {e}")
             return purpose_data
+    @TRACER.traced("llm:purpose_layer3", "llm")
     def discover_emergent_purpose_layer3(self) -> dict:
         """
         🔬 LAYER 3: DEEP LLM SYNTHESIS WITH EMERGENT UNDERSTANDING
@@ -13862,6 +18364,9 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
             - Layer 2: directory_purposes (classified folders)
             - File data: file_timestamps, tech_stack, naming_patterns
             - Temporal: work_sessions, monthly_activity
+        PROMPT SIZE:
+            - PromptCompactor folds unknown subtrees, fits the context to the token
+              budget and sends very large trees as parallel chunks (--prompt-budget)
         OUTPUT:
             {
                 'root_purpose': 'Complete project purpose',
@@ -13874,8 +18379,6 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
             }
         """
         try:
-            import subprocess
-            from openai import OpenAI
             from pathlib import Path
             print("   🧠 Synthesizing complete purpose hierarchy...")
             # STEP 1: Gather ALL available context
@@ -13887,44 +18390,30 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
             unknown_before = layer2_data.get("purpose_distribution", {}).get(
                 "unknown", 0
             )
-            # Extract strategic context
-            context_summary = {
-                "layer1_root_purpose": layer1_data.get("root_purpose", "Unknown"),
-                "layer1_folder_purposes": layer1_data.get("folder_purposes", {}),
-                "layer2_purpose_distribution": dict(
-                    layer2_data.get("purpose_distribution", {})
-                ),
-                "tech_stack_languages": tech_stack.get("language_distribution", {}),
-                "project_age_days": temporal_analysis.get("project_age_days", 0),
-                "work_sessions_count": len(temporal_analysis.get("work_sessions", [])),
-                "total_files": self.surface_scan.get("summary", {}).get(
-                    "total_files", 0
-                ),
-                "file_types_top_10": dict(
-                    list(
-                        self.surface_scan.get("summary", {})
-                        .get("file_types", {})
-                        .items()
-                    )[:10]
-                ),
-            }
-            # STEP 2: Collect UNKNOWN directories for deep analysis
-            unknown_dirs = []
+            compactor = PromptCompactor.shared()
+            # Extract strategic context (ranked, then cut to a third of the prompt budget)
+            file_types = self.surface_scan.get("summary", {}).get("file_types", {})
+            context_summary = compactor.fit(
+                {
+                    "layer1_root_purpose": str(layer1_data.get("root_purpose", "Unknown"))[:300],
+                    "project_age_days": temporal_analysis.get("project_age_days", 0),
+                    "work_sessions_count": len(temporal_analysis.get("work_sessions", [])),
+                    "total_files": self.surface_scan.get("summary", {}).get("total_files", 0),
+                    "tech_stack_languages": tech_stack.get("language_distribution", {}),
+                    "file_types_top_10": dict(Counter(file_types).most_common(10)),
+                    "layer2_purpose_distribution": dict(
+                        Counter(layer2_data.get("purpose_distribution", {})).most_common()
+                    ),
+                    "layer1_folder_purposes": layer1_data.get("folder_purposes", {}),
+                },
+                ["layer2_purpose_distribution", "layer1_folder_purposes", "file_types_top_10",
+                 "tech_stack_languages"],
+                budget=compactor.budget_tokens // 3,
+            )
+            # STEP 2: Collapse UNKNOWN subtrees into aggregates, largest first
             all_purposes = layer2_data.get("purposes", {})
-            for dir_path, dir_info in all_purposes.items():
-                if dir_info.get("purpose") == "unknown":
-                    unknown_dirs.append(
-                        {
-                            "path": dir_path,
-                            "files": dir_info.get("files", 0),
-                            "subdirs": dir_info.get("subdirs", 0),
-                        }
-                    )
-            # Limit to top 50 most important unknown dirs
-            unknown_dirs_sorted = sorted(
-                unknown_dirs, key=lambda x: x["files"] + x["subdirs"] * 2, reverse=True
-            )[:50]
-            if not unknown_dirs_sorted:
+            unknown_dirs, members = compactor.collapse_unknown(all_purposes)
+            if not unknown_dirs:
                 print("   ✅ No unknown directories to analyze")
                 return {
                     "root_purpose": layer1_data.get(
@@ -13935,40 +18424,32 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
                     "confidence": 1.0,
                     "reasoning_chain": ["All directories already classified"],
                 }
-            print(f"   📊 Analyzing {len(unknown_dirs_sorted)} unknown directories...")
-            # STEP 3: Get Doppler API key
-            result = subprocess.run(
-                [
-                    "doppler",
-                    "secrets",
-                    "get",
-                    "OPENAI_API_KEY",
-                    "--project",
-                    "ai-tools",
-                    "--config",
-                    "dev",
-                    "--plain",
-                ],
-                capture_output=True,
-                text=True,
+            # ≤ 40 subtrees per chunk keeps each answer inside max_tokens
+            directory_chunks, left_over = compactor.chunks(unknown_dirs, max_items=40)
+            compactor.record(
+                "purpose_layer3",
+                unknown_dirs=sum(len(paths) for paths in members.values()),
+                subtrees=len(unknown_dirs),
+                left_over=left_over,
+                context_tokens=compactor.tokens(context_summary),
+                context_omitted=context_summary.get("_omitted", {}),
             )
-            if result.returncode != 0:
-                print("   ⚠️  Doppler not configured, skipping Layer 3")
-                return {
-                    "root_purpose": layer1_data.get("root_purpose", "Unknown"),
-                    "hierarchical_purposes": {},
-                    "unknown_resolved": 0,
-                    "confidence": 0.0,
-                    "reasoning_chain": ["Doppler not configured"],
-                }
-            api_key = result.stdout.strip()
-            client = OpenAI(api_key=api_key)
-            # STEP 4: LLM Deep Synthesis
-            prompt = f"""You are an expert at understanding project structure through EMERGENT ANALYSIS.
+            print(
+                f"   📊 Analyzing {len(unknown_dirs) - left_over} unknown subtrees "
+                f"({len(directory_chunks)} parallel chunk(s))..."
+            )
+            context_json = json.dumps(context_summary, indent=2)
+
+            # STEP 3: LLM Deep Synthesis, one request per chunk (replayed from
+            # LLMResponseCache for an identical prompt)
+            def build_request(chunk, index, total):
+                part = f" (PART {index + 1} OF {total})" if total > 1 else ""
+                prompt = f"""You are an expert at understanding project structure through EMERGENT ANALYSIS.
 **CONTEXT FROM LAYER 1 & 2:**
-{json.dumps(context_summary, indent=2)[:2000]}
-**UNKNOWN DIRECTORIES TO CLASSIFY:**
-{json.dumps(unknown_dirs_sorted[:30], indent=2)[:1500]}
+{context_json}
+**UNKNOWN DIRECTORIES TO CLASSIFY{part}:**
+{json.dumps(chunk, indent=2)}
+(An entry with "dirs" stands for a whole unknown subtree of that many folders.)
 **TASK:** Use EMERGENT REASONING to infer the purpose of each unknown directory.
 **REASONING APPROACH:**
 1. Look at parent folder purpose (if known)
@@ -13990,29 +18471,56 @@ grep -r "TODO\\|FIXME\\|HACK\\|XXX\\|BUG" . --include="*.py" --include="*.js" --
 }}
 For EACH unknown directory, provide a PURPOSE based on context clues.
 Be SPECIFIC and CONCISE (5-10 words per purpose)."""
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at emergent project analysis through pattern recognition. Respond ONLY with valid JSON.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.4,
-                max_tokens=1500,
-                response_format={"type": "json_object"},
-            )
-            response_text = response.choices[0].message.content
-            synthesis_result = json.loads(response_text.strip())
-            # STEP 5: Merge with existing purposes
-            hierarchical_purposes = synthesis_result.get("hierarchical_purposes", {})
-            unknown_resolved = len(hierarchical_purposes)
-            # Update directory_purposes with Layer 3 insights
+                return {
+                    "model": "gpt-4o",
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": "You are an expert at emergent project analysis through pattern recognition. Respond ONLY with valid JSON.",
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    "temperature": 0.4,
+                    "max_tokens": 1500,
+                    "response_format": {"type": "json_object"},
+                }
+
+            # STEP 4: Ask the shared client for all chunks at once
+            try:
+                results, errors = compactor.map_chunks(
+                    "purpose_layer3", directory_chunks, build_request,
+                    lambda content: json.loads(content.strip()),
+                    LLMResponseCache.shared(self.project_path),
+                )
+            except LLMUnavailable as e:
+                print(f"   ⚠️  {e}, skipping Layer 3")
+                return {
+                    "root_purpose": layer1_data.get("root_purpose", "Unknown"),
+                    "hierarchical_purposes": {},
+                    "unknown_resolved": 0,
+                    "confidence": 0.0,
+                    "reasoning_chain": [str(e)],
+                }
+            if not results:
+                raise LLMError("; ".join(errors))
+            # Reduce: union of the chunk answers
+            hierarchical_purposes = {}
+            reasoning_chain = []
+            for result in results:
+                hierarchical_purposes.update(result.get("hierarchical_purposes", {}))
+                for reason in result.get("reasoning_chain", []):
+                    if reason not in reasoning_chain:
+                        reasoning_chain.append(reason)
+            reasoning_chain += errors
+            confidence = sum(result.get("confidence", 0.85) for result in results) / len(results)
+            # STEP 5: Merge with existing purposes (a subtree's purpose covers all its folders)
+            unknown_resolved = 0
             for dir_path, new_purpose in hierarchical_purposes.items():
-                if dir_path in all_purposes:
-                    all_purposes[dir_path]["purpose"] = new_purpose
-                    all_purposes[dir_path]["layer"] = "layer3"
+                for member in members.get(dir_path, [dir_path]):
+                    if member in all_purposes:
+                        all_purposes[member]["purpose"] = new_purpose
+                        all_purposes[member]["layer"] = "layer3"
+                        unknown_resolved += 1
             # Recalculate distribution
             new_distribution = Counter()
             for dir_info in all_purposes.values():
@@ -14037,8 +18545,8 @@ Be SPECIFIC and CONCISE (5-10 words per purpose)."""
                 "unknown_before": unknown_before,
                 "unknown_after": unknown_after,
                 "reduction_percentage": reduction_pct,
-                "confidence": synthesis_result.get("confidence", 0.85),
-                "reasoning_chain": synthesis_result.get("reasoning_chain", []),
+                "confidence": confidence,
+                "reasoning_chain": reasoning_chain,
             }
         except Exception as e:
             print(f"   ⚠️  Layer 3 synthesis failed: {str(e)}")
@@ -14101,10 +18609,10 @@ Be SPECIFIC and CONCISE (5-10 words per purpose)."""
                 )
             # Multiple README files
             readme_files = []
-            for root, dirs, files in os.walk(self.project_path):
-                for file in files:
-                    if file.lower().startswith("readme"):
-                        readme_files.append(str(Path(root) / file))
+            inventory = FileInventory.shared(self.project_path)
+            for entry in inventory.iter_files():
+                if entry.name.lower().startswith("readme"):
+                    readme_files.append(str(inventory.absolute(entry.path)))
             if len(readme_files) > 3:
                 opportunities.append(
                     {
@@ -14129,16 +18637,11 @@ Be SPECIFIC and CONCISE (5-10 words per purpose)."""
         """Find all empty directories"""
         empty_dirs = []
         try:
-            for root, dirs, files in os.walk(self.project_path, topdown=False):
-                for dir_name in dirs:
-                    dir_path = Path(root) / dir_name
-                    try:
-                        if not any(dir_path.iterdir()):  # Empty
-                            empty_dirs.append(
-                                str(dir_path.relative_to(self.project_path))
-                            )
-                    except (OSError, PermissionError):
-                        pass
+            inventory = FileInventory.shared(self.project_path)
+            for _, dirs, _ in inventory.walk(topdown=False):
+                for dir_entry in dirs:
+                    if inventory.is_empty_dir(dir_entry):  # Empty (None = unreadable)
+                        empty_dirs.append(dir_entry.path)
             self.empty_directories = empty_dirs
             return empty_dirs
         except Exception as e:
@@ -14177,12 +18680,10 @@ Be SPECIFIC and CONCISE (5-10 words per purpose)."""
         }
         try:
             # Detect languages by file extensions
-            for root, dirs, files in os.walk(self.project_path):
-                dirs[:] = [d for d in dirs if d not in ["node_modules", "__pycache__"]]
-                for file in files:
-                    ext = Path(file).suffix.lower()
-                    if ext in extension_to_language:
-                        tech_stack["languages"][extension_to_language[ext]] += 1
+            inventory = FileInventory.shared(self.project_path)
+            for entry in inventory.iter_files(DEFAULT_SKIP_DIRS):
+                if entry.ext in extension_to_language:
+                    tech_stack["languages"][extension_to_language[entry.ext]] += 1
             # Detect frameworks/tools by config files
             framework_indicators = {
                 "package.json": "Node.js/npm",
@@ -14195,12 +18696,11 @@ Be SPECIFIC and CONCISE (5-10 words per purpose)."""
                 "pom.xml": "Java/Maven",
                 "build.gradle": "Java/Gradle",
             }
-            for root, dirs, files in os.walk(self.project_path):
-                for file in files:
-                    if file in framework_indicators:
-                        tech_stack["package_managers"].append(
-                            framework_indicators[file]
-                        )
+            for entry in inventory.iter_files():
+                if entry.name in framework_indicators:
+                    tech_stack["package_managers"].append(
+                        framework_indicators[entry.name]
+                    )
             # Convert language counts to percentages
             total_files = sum(tech_stack["languages"].values())
             if total_files > 0:
@@ -14232,36 +18732,6 @@ Be SPECIFIC and CONCISE (5-10 words per purpose)."""
         Uses ~30-60 seconds of the 2-minute LLM budget remaining
         """
         try:
-            import subprocess
-            from openai import OpenAI
-            # Get OpenAI API key from Doppler (same method as analyze_with_gpt5)
-            result = subprocess.run(
-                [
-                    "doppler",
-                    "secrets",
-                    "get",
-                    "OPENAI_API_KEY",
-                    "--project",
-                    "ai-tools",
-                    "--config",
-                    "dev",
-                    "--plain",
-                ],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                return {
-                    "enriched": False,
-                    "reason": "Doppler not configured (ai-tools/dev)",
-                }
-            api_key = result.stdout.strip()
-            if not api_key or api_key.startswith("Error"):
-                return {
-                    "enriched": False,
-                    "reason": "OPENAI_API_KEY not found in Doppler",
-                }
-            client = OpenAI(api_key=api_key)
             # Prepare action summary for LLM
             action_summary = {
                 "p0_quick_wins": [
@@ -14299,29 +18769,90 @@ Format as JSON:
   "p2": [...]
 }}
 Keep responses concise (max 20 words per field). Focus on clarity and visual language."""
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
+            request = {
+                "model": "gpt-4o",
+                "messages": [
                     {
                         "role": "system",
                         "content": "You are a visual communication expert who makes technical concepts intuitive and actionable. Respond ONLY with valid JSON, no markdown formatting.",
                     },
                     {"role": "user", "content": prompt},
                 ],
-                temperature=0.7,
-                max_tokens=1500,
-                response_format={"type": "json_object"},  # Force JSON mode
-            )
-            response_text = response.choices[0].message.content
+                "temperature": 0.7,
+                "max_tokens": 1500,
+                "response_format": {"type": "json_object"},  # Force JSON mode
+            }
+            llm_cache = LLMResponseCache.shared(self.project_path)
+            response_text = llm_cache.get("action_plan", request)
+            fetch_seconds = None
+            if response_text is None:
+                started = time.perf_counter()
+                try:
+                    response_text = LLMClient.shared().complete(request)
+                except LLMUnavailable as e:
+                    return {"enriched": False, "reason": str(e)}
+                fetch_seconds = time.perf_counter() - started
+            raw_text = response_text
             # Robust JSON extraction (handles markdown code blocks)
             if "```json" in response_text:
                 response_text = response_text.split("```json")[1].split("```")[0]
             elif "```" in response_text:
                 response_text = response_text.split("```")[1].split("```")[0]
             enriched_data = json.loads(response_text.strip())
+            if fetch_seconds is not None:
+                llm_cache.put("action_plan", request, raw_text, fetch_seconds)
             return {"enriched": True, "data": enriched_data}
         except Exception as e:
             return {"enriched": False, "reason": str(e)}
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ _summarize_directories - Map step for very large directory listings                ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _summarize_directories(self, compactor, project_name: str, rows: list) -> list:
+        """
+        Replace a directory listing too large for the GPT-5 prompt with area summaries
+        MAP: ranked rows split into ≤ max_chunks chunks, each summarized by gpt-4o in
+             parallel (one round of calls, whatever the tree size)
+        REDUCE: the GPT-5 call itself reads the merged areas
+        Falls back to the ranked rows (cut later by the budget) when the map step fails.
+        """
+        chunks, left_over = compactor.chunks(rows)
+
+        def build_request(chunk, index, total):
+            prompt = f"""Project "{project_name}": directories {index + 1} of {total} parts, largest first.
+{json.dumps(chunk, separators=(",", ":"))}
+Group them into at most 8 functional AREAS. Flag any area that looks like an independent
+sub-project (own manifest, README or tech stack).
+RESPOND IN JSON: {{"areas": [{{"path": "common/path", "summary": "5-12 words", "files": 123, "sub_project": false}}]}}"""
+            return {
+                "model": "gpt-4o",
+                "messages": [
+                    {"role": "system", "content": "You summarize project directory listings. Respond ONLY with valid JSON."},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0.2,
+                "max_tokens": 600,
+                "response_format": {"type": "json_object"},
+            }
+
+        try:
+            results, errors = compactor.map_chunks(
+                "gpt5_directories", chunks, build_request,
+                lambda content: json.loads(content.strip())["areas"],
+                LLMResponseCache.shared(self.project_path),
+            )
+        except LLMUnavailable:
+            return rows
+        if errors or not results:
+            print(f"⚠️ Directory summary incomplete ({len(errors)} of {len(chunks)} chunks failed), sending ranked list")
+            return rows
+        areas = [area for result in results for area in result]
+        if left_over:
+            tail = rows[-left_over:]
+            areas.append({"path": "(smallest directories)", "dirs": left_over,
+                          "files": sum(row.get("files", 0) for row in tail)})
+        compactor.record("gpt5", directory_areas=len(areas), directory_chunks=len(chunks))
+        return areas
+    @TRACER.traced("llm:gpt5", "llm")
     def analyze_with_gpt5(self) -> dict:
         """Send analysis data to GPT-5 for PURPOSE-DRIVEN intelligent insights"""
         print("[🤖] Analyzing with GPT-5...")
@@ -14334,33 +18865,12 @@ Keep responses concise (max 20 words per field). Focus on clarity and visual lan
             "raw_response": "",
         }
         try:
-            # Get OpenAI API key from Doppler (ai-tools project)
-            result = subprocess.run(
-                [
-                    "doppler",
-                    "secrets",
-                    "get",
-                    "OPENAI_API_KEY",
-                    "--project",
-                    "ai-tools",
-                    "--config",
-                    "dev",
-                    "--plain",
-                ],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                print("⚠️ Doppler not configured (ai-tools/dev), skipping LLM analysis")
-                return llm_insights
-            api_key = result.stdout.strip()
-            if not api_key or api_key.startswith("Error"):
-                print("⚠️ OPENAI_API_KEY not found in Doppler, skipping LLM analysis")
-                return llm_insights
             # Prepare COMPREHENSIVE analysis summary for PURPOSE-DRIVEN insights
             project_name = os.path.basename(str(self.project_path))
-            # Prepare work sessions for LLM analysis
+            compactor = PromptCompactor.shared()
+            # Prepare work sessions for LLM analysis (each sample path shown once)
             work_sessions_summary = []
+            seen_paths = set()
             for idx, session in enumerate(self.work_sessions[:10], 1):
                 from datetime import datetime
                 session_time = datetime.strptime(session["start"], "%Y-%m-%d %H:%M")
@@ -14383,13 +18893,18 @@ Keep responses concise (max 20 words per field). Focus on clarity and visual lan
                         "time_of_day": time_of_day,
                         "duration_minutes": session["duration_minutes"],
                         "file_count": session["file_count"],
-                        "sample_files": session.get("sample_files", [])[:3],
+                        "sample_files": compactor.dedupe_paths(
+                            session.get("sample_files", []), self.project_path, seen_paths
+                        )[:3],
                     }
                 )
-            # Get directories with indicators of independent projects
-            all_directories = self.directory_purposes.get("all_directories", [])[
-                :50
-            ]  # Top 50 directories
+            # Ranked directories (sub-project candidates); summarized by area in
+            # parallel chunks when the listing is larger than its share of the budget
+            all_directories = compactor.directory_digest(
+                self.directory_purposes.get("purposes", {})
+            )
+            if compactor.tokens(all_directories) > compactor.budget_tokens // 3:
+                all_directories = self._summarize_directories(compactor, project_name, all_directories)
             analysis_summary = {
                 "project_name": project_name,
                 "project_path": str(self.project_path),
@@ -14407,15 +18922,15 @@ Keep responses concise (max 20 words per field). Focus on clarity and visual lan
                     / 1024,
                 },
                 "file_types": dict(
-                    list(
-                        self.surface_scan.get("summary", {})
-                        .get("file_types", {})
-                        .items()
-                    )[:15]
+                    Counter(
+                        self.surface_scan.get("summary", {}).get("file_types", {})
+                    ).most_common(15)
                 ),
                 "tech_stack": self.tech_stack.get("language_distribution", {}),
-                "directory_purposes": self.directory_purposes.get(
-                    "purpose_distribution", {}
+                "directory_purposes": dict(
+                    Counter(
+                        self.directory_purposes.get("purpose_distribution", {})
+                    ).most_common()
                 ),
                 "high_priority_directories": self.directory_purposes.get(
                     "high_priority", []
@@ -14448,6 +18963,18 @@ Keep responses concise (max 20 words per field). Focus on clarity and visual lan
                 ],
                 "naming_patterns": self.naming_analysis.get("conventions", {}),
             }
+            # Least useful sections are cut first; sessions go last (each needs a name)
+            analysis_summary = compactor.fit(
+                analysis_summary,
+                ["all_directories_sample", "consolidation_samples", "directory_purposes",
+                 "file_types", "naming_patterns", "high_priority_directories", "work_sessions"],
+            )
+            compactor.record(
+                "gpt5",
+                directories=len(self.directory_purposes.get("purposes", {})),
+                prompt_tokens=compactor.tokens(analysis_summary),
+                omitted=analysis_summary.get("_omitted", {}),
+            )
             # PURPOSE-DRIVEN PROMPT aligned with mr-fix-my-project-please.py philosophy
             system_prompt = """You are an EXPERT PROJECT PURPOSE ANALYZER for mr-fix-my-project-please.py.
 PHILOSOPHY: FILE PURPOSE + FOLDER PURPOSE = META-PURPOSE
@@ -14506,28 +19033,31 @@ PROJECT: {project_name}
 DATA:
 {json.dumps(analysis_summary, indent=2)}
 Provide your PURPOSE-DRIVEN analysis following the system prompt structure."""
-            # Call GPT-4 Turbo API
-            import requests
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "gpt-5-chat-latest",  # GPT-5 Chat (latest)
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    "temperature": 0.7,
-                    "max_tokens": 2000,
-                },
-                timeout=60,
-            )
-            if response.status_code == 200:
-                result = response.json()
-                content = result["choices"][0]["message"]["content"]
+            request = {
+                "model": "gpt-5-chat-latest",  # GPT-5 Chat (latest)
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                "temperature": 0.7,
+                "max_tokens": 2000,
+            }
+            # Replayed from LLMResponseCache when the analysis summary is unchanged
+            llm_cache = LLMResponseCache.shared(self.project_path)
+            content = llm_cache.get("gpt5", request)
+            fetch_seconds = None
+            if content is None:
+                # Call the GPT-5 chat API through the shared client
+                started = time.perf_counter()
+                try:
+                    content = LLMClient.shared().complete(request, timeout=60)
+                    fetch_seconds = time.perf_counter() - started
+                except LLMUnavailable as e:
+                    print(f"⚠️ {e}, skipping LLM analysis")
+                    return llm_insights
+                except LLMError as e:
+                    print(f"⚠️ GPT-5 API error ({e.status or 'no response'}): {e}")
+            if content is not None:
                 # Store raw response for HTML display
                 llm_insights["raw_response"] = content
                 # Parse work session names from JSON in response (bilingual)
@@ -14598,11 +19128,8 @@ Provide your PURPOSE-DRIVEN analysis following the system prompt structure."""
                 llm_insights["hidden_patterns"] = ["See full analysis below"]
                 llm_insights["health_assessment"] = "See full analysis below"
                 print(f"✅ GPT-5 analysis complete ({len(content)} chars)")
-            else:
-                error_msg = (
-                    response.json().get("error", {}).get("message", "Unknown error")
-                )
-                print(f"⚠️ GPT-5 API error ({response.status_code}): {error_msg}")
+                if fetch_seconds is not None:
+                    llm_cache.put("gpt5", request, content, fetch_seconds)
             self.llm_insights = llm_insights
             return llm_insights
         except Exception as e:
@@ -14926,27 +19453,580 @@ def generate_architecture_map(script_path: str = __file__) -> str:
     # ║ Dependencies: All zones                                                            ║
     # ║ Complexity: Low | Stability: High                                                  ║
     # ╚════════════════════════════════════════════════════════════════════════════════════╝
+# ╔════════════════════════════════════════════════════════════════════════════════════╗
+# ║ ANALYSIS DAEMON - --serve: JSON-RPC worker with warm per-project sessions          ║
+# ╚════════════════════════════════════════════════════════════════════════════════════╝
+class _ProjectSession:
+    """Warm state of one project inside the --serve daemon"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()  # One analyze/report of this project at a time
+        self.busy = 0  # In-flight requests (guarded by AnalysisDaemon._sessions_lock)
+        self.last_used = time.monotonic()
+        self.fingerprint = None  # Tree + settings the snapshot was computed from
+        self.snapshot = None  # Last analyze_and_heal results (replaced, never mutated)
+        self.html_path = None  # Last report of this fingerprint
+        self.runs = 0
+        self.cached_answers = 0
+
+
+class AnalysisDaemon:
+    """
+    🛰️ LONG-LIVED ANALYSIS WORKER (--serve)
+    PURPOSE: Answer MCP tool calls without re-importing the analyzer and rebuilding
+             every structure on each call
+    PROTOCOL: JSON-RPC 2.0, one message per line, over stdio or a Unix socket
+        • analyze {project}                 → summary (cached while the tree is unchanged)
+        • report  {project, output_dir?}    → summary + html_path
+        • query   {project, kind, ...}      → summary | file | files | critical_files |
+                                              duplicates | stages (from the warm snapshot)
+        • status / evict {project} / shutdown
+    WARM STATE (per project): FileInventory, AnalysisCache (SQLite + preloaded rows) and
+    the last results. analyze/report re-walk the tree and compare its fingerprint: same →
+    cached answer; changed → rerun, where the cache re-parses only changed files.
+    CONCURRENCY: requests run on a thread pool; a per-project lock serializes work on
+    one project, and analyses run one at a time process-wide (GOVERNOR, TRACER and
+    stdout are process-wide). Queries read the last snapshot without locking.
+    EVICTION: sessions idle for idle_seconds, least recently used beyond max_sessions,
+    and least recently used while process RSS exceeds memory_mb.
+    """
+
+    ERROR_CODES = {"parse": -32700, "invalid": -32600, "method": -32601, "params": -32602, "server": -32000}
+    QUERY_KINDS = ("summary", "file", "files", "critical_files", "duplicates", "stages")
+
+    def __init__(self, memory_mb: float = 2048.0, idle_seconds: float = 900.0, max_sessions: int = 8,
+                 workers: int = 4, configure=None):
+        from concurrent.futures import ThreadPoolExecutor
+        self.memory_mb = memory_mb
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max(1, max_sessions)
+        self.configure = configure  # fn(fixer): applies CLI flags (--jobs, ...) to each run
+        self.sessions: Dict[str, _ProjectSession] = {}
+        self.evictions = Counter()
+        self.requests = 0
+        self.started = time.time()
+        self._sessions_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mrfix-rpc")
+        self._rss = self._rss_reader()
+        self._reaper = threading.Thread(target=self._reap, name="mrfix-reaper", daemon=True)
+        self._reaper.start()
+
+    @staticmethod
+    def _rss_reader():
+        """Current (not peak) RSS in MB: psutil, else /proc/self/statm, else None"""
+        psutil = optional_import("psutil")
+        if psutil is not None:
+            process = psutil.Process()
+            return lambda: process.memory_info().rss / 1048576
+        try:
+            page_size = os.sysconf("SC_PAGE_SIZE")
+
+            def read_statm():
+                with open("/proc/self/statm", "rb") as f:
+                    return int(f.read().split()[1]) * page_size / 1048576
+
+            read_statm()
+            return read_statm
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ transports                                                                         ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def serve_stream(self, lines, write):
+        """
+        Answer newline-delimited requests from `lines` through write(str).
+        Requests are handled concurrently; `shutdown` waits for in-flight ones.
+        """
+        write_lock = threading.Lock()
+        pending = []
+
+        def respond(response):
+            if response is not None:
+                data = json.dumps(response, default=str) + "\n"
+                with write_lock:
+                    write(data)
+
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8", "replace")
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                respond(self._error(None, "parse", f"Invalid JSON: {e}"))
+                continue
+            if isinstance(message, dict) and message.get("method") == "shutdown":
+                for future in pending:
+                    future.result()
+                respond(self.handle(message))
+                break
+            pending = [future for future in pending if not future.done()]
+            pending.append(self._pool.submit(lambda message=message: respond(self.handle(message))))
+            if self._stop.is_set():
+                break
+        for future in pending:
+            future.result()
+
+    def serve_unix(self, socket_path: str):
+        """Accept connections on a Unix socket (one thread per connection) until shutdown"""
+        import socketserver
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                def write(data):
+                    self.wfile.write(data.encode("utf-8"))
+                    self.wfile.flush()
+
+                daemon.serve_stream(self.rfile, write)
+                if daemon._stop.is_set():
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Stale socket of a previous daemon
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        server.daemon_threads = True
+        os.chmod(socket_path, 0o600)  # Local user only
+        try:
+            server.serve_forever(poll_interval=0.5)
+        finally:
+            server.server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    def close(self):
+        """Stop the reaper and worker threads and release every session"""
+        self._stop.set()
+        self._pool.shutdown(wait=True)
+        with self._sessions_lock:
+            for session in list(self.sessions.values()):
+                self._release(session)
+            self.sessions.clear()
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ dispatch                                                                           ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _error(self, request_id, kind: str, message: str) -> dict:
+        return {"jsonrpc": "2.0", "id": request_id,
+                "error": {"code": self.ERROR_CODES[kind], "message": message}}
+
+    def handle(self, message) -> Optional[dict]:
+        """One JSON-RPC request → response (None for notifications)"""
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0":
+            return self._error(None, "invalid", "Expected a JSON-RPC 2.0 request object")
+        request_id = message.get("id")
+        method = message.get("method")
+        params = message.get("params") or {}
+        handler = getattr(self, f"rpc_{method}", None) if isinstance(method, str) else None
+        if handler is None:
+            response = self._error(request_id, "method", f"Unknown method: {method}")
+        elif not isinstance(params, dict):
+            response = self._error(request_id, "params", "params must be an object")
+        else:
+            self.requests += 1
+            try:
+                with TRACER.span(f"rpc:{method}", "rpc"):
+                    response = {"jsonrpc": "2.0", "id": request_id, "result": handler(params)}
+            except (ValueError, KeyError) as e:
+                response = self._error(request_id, "params", str(e))
+            except Exception as e:
+                logger.error(f"--serve {method} failed: {e}")
+                response = self._error(request_id, "server", f"{type(e).__name__}: {e}")
+        return response if "id" in message else None
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ sessions                                                                           ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    @contextlib.contextmanager
+    def _checkout(self, params: dict):
+        """Session of params["project"], pinned (not evictable) while in use"""
+        project = params.get("project")
+        if not project:
+            raise ValueError("params.project is required")
+        path = Path(project).expanduser().resolve()
+        if not path.is_dir():
+            raise ValueError(f"Not a directory: {path}")
+        with self._sessions_lock:
+            session = self.sessions.get(str(path))
+            if session is None:
+                session = self.sessions[str(path)] = _ProjectSession(str(path))
+            session.busy += 1
+            session.last_used = time.monotonic()
+        try:
+            yield session
+        finally:
+            with self._sessions_lock:
+                session.busy -= 1
+                session.last_used = time.monotonic()
+            self._enforce_limits()
+
+    def _release(self, session: _ProjectSession):
+        """Drop a session's warm state (caller holds _sessions_lock)"""
+        FileInventory.reset(session.path)
+        AnalysisCache.reset(session.path)
+        LLMResponseCache.reset(session.path)
+        session.snapshot = None
+
+    def _evict(self, session: _ProjectSession, reason: str) -> bool:
+        with self._sessions_lock:
+            if session.busy or self.sessions.get(session.path) is not session:
+                return False
+            del self.sessions[session.path]
+            self._release(session)
+        self.evictions[reason] += 1
+        print(f"🧹 Evicted {session.path} ({reason})")
+        return True
+
+    def _enforce_limits(self):
+        """Idle timeout, session cap, then RSS cap (least recently used first)"""
+        now = time.monotonic()
+        with self._sessions_lock:
+            idle = sorted((s for s in self.sessions.values() if not s.busy), key=lambda s: s.last_used)
+            excess = len(self.sessions) - self.max_sessions
+        for session in idle:
+            if now - session.last_used > self.idle_seconds:
+                self._evict(session, "idle")
+            elif excess > 0 and self._evict(session, "max_sessions"):
+                excess -= 1
+        if self._rss is None:
+            return
+        import gc
+        for session in idle:
+            if self._rss() <= self.memory_mb:
+                break
+            if self._evict(session, "memory"):
+                gc.collect()
+
+    def _reap(self):
+        interval = max(1.0, min(60.0, self.idle_seconds / 4))
+        while not self._stop.wait(interval):
+            try:
+                self._enforce_limits()
+            except Exception as e:
+                logger.error(f"--serve eviction failed: {e}")
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ analysis runs                                                                      ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def _fixer(self, session: _ProjectSession) -> "MrFixMyProjectPlease":
+        fixer = MrFixMyProjectPlease(session.path)
+        fixer.MAX_MEMORY_GB = self.memory_mb / 1024
+        if self.configure is not None:
+            self.configure(fixer)
+        return fixer
+
+    def _refresh(self, session: _ProjectSession, html: bool = False, output_dir=None):
+        """(snapshot, cached): rerun only when the tree or settings changed"""
+        with session.lock:
+            fixer = self._fixer(session)
+            FileInventory.reset(session.path)
+            fingerprint = fixer.tree_fingerprint("analyze_and_heal")  # Walks the tree once
+            unchanged = session.snapshot is not None and fingerprint == session.fingerprint
+            if unchanged and (not html or (session.html_path and os.path.exists(session.html_path))):
+                session.cached_answers += 1
+                return session.snapshot, True
+            fixer.reuse_inventory = True
+            fixer.render_html = html
+            fixer.report_dir = str(output_dir or session.path)
+            with self._run_lock:
+                results = fixer.analyze_and_heal()
+            if results.get("status") != "completed":
+                raise RuntimeError(results.get("error") or "analysis failed")
+            results.pop("dependency_map_html", None)  # Rendered diagrams live in the report
+            session.html_path = results.get("html_file") if html else (
+                session.html_path if unchanged else None
+            )
+            session.fingerprint = fingerprint
+            session.snapshot = results
+            session.runs += 1
+            return results, False
+
+    @staticmethod
+    def _summary(session: _ProjectSession, snapshot: dict, cached: bool) -> dict:
+        dependencies = snapshot.get("ultrathink_analysis") or {}
+        metrics = snapshot.get("performance_metrics") or {}
+        return {
+            "project": session.path,
+            "cached": cached,
+            "fingerprint": session.fingerprint,
+            "status": snapshot.get("status"),
+            "total_files": snapshot.get("total_files"),
+            "total_dirs": snapshot.get("total_dirs"),
+            "file_types": snapshot.get("file_types"),
+            "score": snapshot.get("score"),
+            "duplicate_names": len(snapshot.get("duplicates") or {}),
+            "purpose": (snapshot.get("purpose_map") or {}).get("root_purpose"),
+            "dependencies": dependencies.get("statistics"),
+            "risk": dependencies.get("risk_assessment"),
+            "analysis_time": snapshot.get("analysis_time"),
+            "performance_metrics": {
+                key: metrics.get(key) for key in ("cache", "llm_cache", "prompt_compaction", "content_pipeline", "stages", "memory", "html_render")
+            },
+        }
+
+    # ╔════════════════════════════════════════════════════════════════════════════════════╗
+    # ║ RPC methods                                                                        ║
+    # ╚════════════════════════════════════════════════════════════════════════════════════╝
+    def rpc_analyze(self, params: dict) -> dict:
+        with self._checkout(params) as session:
+            started = time.perf_counter()
+            snapshot, cached = self._refresh(session)
+            return dict(self._summary(session, snapshot, cached),
+                        seconds=round(time.perf_counter() - started, 3))
+
+    def rpc_report(self, params: dict) -> dict:
+        with self._checkout(params) as session:
+            started = time.perf_counter()
+            snapshot, cached = self._refresh(session, html=True, output_dir=params.get("output_dir"))
+            return dict(self._summary(session, snapshot, cached), html_path=session.html_path,
+                        seconds=round(time.perf_counter() - started, 3))
+
+    def rpc_query(self, params: dict) -> dict:
+        kind = params.get("kind", "summary")
+        if kind not in self.QUERY_KINDS:
+            raise ValueError(f"Unknown query kind {kind!r} (expected one of {', '.join(self.QUERY_KINDS)})")
+        with self._checkout(params) as session:
+            snapshot, cached = session.snapshot, True
+            if snapshot is None or params.get("refresh"):
+                snapshot, cached = self._refresh(session)
+            dependencies = snapshot.get("ultrathink_analysis") or {}
+            limit = int(params.get("limit", 200))
+            if kind == "summary":
+                return self._summary(session, snapshot, cached)
+            if kind == "file":
+                if not params.get("path"):
+                    raise ValueError("params.path is required for kind=file")
+                path = Path(session.path) / params["path"]
+
+                def lookup(table: dict, default=None):
+                    # Stage outputs key files by Path; reloaded checkpoints by str
+                    return table.get(path, table.get(str(path), default))
+
+                parsed = lookup(dependencies.get("file_analysis") or {})
+                if parsed is None:
+                    raise ValueError(f"Not an analyzed source file: {params['path']}")
+                sniper = parsed.get("sniper_entities") or {}
+                return {
+                    "path": str(path),
+                    "imports": parsed.get("imports"),
+                    "exports": parsed.get("exports"),
+                    "entity_count": sniper.get("entity_count", 0),
+                    "dependencies": [str(dep) for dep in lookup(dependencies.get("dependency_graph") or {}, [])],
+                    "ripple": lookup((dependencies.get("ripple_analysis") or {}).get("ripple_scores") or {}),
+                }
+            if kind == "files":
+                from fnmatch import fnmatch
+                pattern = params.get("pattern", "*")
+                inventory = FileInventory.shared(session.path)
+                matches = []
+                for entry in inventory.iter_files(CheckpointStore.TREE_SKIP_DIRS):
+                    if fnmatch(entry.path, pattern):
+                        matches.append({"path": entry.path, "size": entry.size, "mtime": entry.mtime})
+                        if len(matches) >= limit:
+                            break
+                return {"pattern": pattern, "files": matches, "truncated": len(matches) >= limit}
+            if kind == "critical_files":
+                return {"critical_files": (dependencies.get("critical_files") or [])[:limit]}
+            if kind == "duplicates":
+                return {"duplicates": snapshot.get("duplicates") or {}}
+            return {"stages": (snapshot.get("performance_metrics") or {}).get("stages")}
+
+    def rpc_status(self, params: dict) -> dict:
+        now = time.monotonic()
+        with self._sessions_lock:
+            sessions = [
+                {
+                    "project": session.path,
+                    "busy": session.busy,
+                    "idle_seconds": round(now - session.last_used, 1),
+                    "analyzed": session.snapshot is not None,
+                    "runs": session.runs,
+                    "cached_answers": session.cached_answers,
+                }
+                for session in self.sessions.values()
+            ]
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "rss_mb": round(self._rss(), 1) if self._rss is not None else None,
+            "memory_mb": self.memory_mb,
+            "idle_seconds": self.idle_seconds,
+            "max_sessions": self.max_sessions,
+            "sessions": sessions,
+            "evictions": dict(self.evictions),
+        }
+
+    def rpc_evict(self, params: dict) -> dict:
+        path = str(Path(params.get("project") or "").expanduser().resolve())
+        with self._sessions_lock:
+            session = self.sessions.get(path)
+        return {"evicted": bool(session) and self._evict(session, "requested")}
+
+    def rpc_shutdown(self, params: dict) -> dict:
+        self._stop.set()
+        return {"stopping": True, "requests": self.requests}
+
+
 # ║ SCRIPT EXECUTION                                                                   ║
 # ╚════════════════════════════════════════════════════════════════════════════════════╝
 
+def _cli_option_value(argv: list, name: str, default=None):
+    """Value of `--name VALUE` or `--name=VALUE` in argv (default if absent)"""
+    for i, arg in enumerate(argv):
+        if arg == name and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith(name + "="):
+            return arg.split("=", 1)[1]
+    return default
+
+
+def _serve(argv: list):
+    """--serve [SOCKET]: run the analysis daemon on stdio (default) or a Unix socket"""
+    import sys
+
+    def option(name, convert, default):
+        value = _cli_option_value(argv, name)
+        if value is None:
+            return default
+        try:
+            return convert(value)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid {name} value: {value}", file=sys.stderr)
+            return default
+
+    if '--no-cache' in argv:
+        AnalysisCache.enabled_by_default = False
+        LLMResponseCache.enabled_by_default = False
+    if '--no-ignore' in argv:
+        FileInventory.honor_ignore_files = False
+    LLMResponseCache.ttl_seconds = option('--llm-cache-ttl', lambda v: max(0.0, float(v)) * 3600,
+                                          LLMResponseCache.ttl_seconds)
+    PromptCompactor.budget_tokens = option('--prompt-budget', int, PromptCompactor.budget_tokens)
+    FileInventory.default_workers = option('--walk-threads', lambda v: max(1, int(v)), FileInventory.default_workers)
+    jobs = option('--jobs', lambda v: max(1, int(v)), 1)
+
+    def configure(fixer):
+        fixer.MAX_WORKERS = jobs
+
+    daemon = AnalysisDaemon(
+        memory_mb=option('--memory-budget', lambda v: max(1.0, float(v)), 2048.0),
+        idle_seconds=option('--idle-timeout', lambda v: max(1.0, float(v)), 900.0),
+        max_sessions=option('--max-projects', int, 8),
+        configure=configure,
+    )
+    socket_path = _cli_option_value(argv, '--serve')
+    rpc_out = sys.stdout
+    sys.stdout = sys.stderr  # Progress chatter must never interleave with RPC lines
+    try:
+        if socket_path is None or socket_path.startswith('--'):
+            print("🛰️ Mr. Fix daemon serving JSON-RPC on stdio")
+
+            def write(data):
+                rpc_out.write(data)
+                rpc_out.flush()
+
+            daemon.serve_stream(sys.stdin, write)
+        else:
+            print(f"🛰️ Mr. Fix daemon serving JSON-RPC on {socket_path}")
+            daemon.serve_unix(socket_path)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
 def main():
     """Main entry point for the script"""
     import sys
 
+    if '--serve' in sys.argv or any(arg.startswith('--serve=') for arg in sys.argv):
+        _serve(sys.argv)
+        return
+
     if len(sys.argv) < 2:
-        print("Usage: python mr-fix-my-project-please.py <project_path>")
+        print("Usage: python mr-fix-my-project-please.py <project_path> [--html-only] [--jobs N] [--walk-threads N] [--no-cache] [--no-ignore] [--llm-cache-ttl HOURS] [--prompt-budget TOKENS] [--format html|json|ndjson] [--trace [FILE]] [--memory-budget MB] [--resume]")
+        print("       python mr-fix-my-project-please.py --serve [SOCKET] [--idle-timeout SECONDS] [--max-projects N] [--jobs N] [--memory-budget MB]")
         print("Example: python mr-fix-my-project-please.py PRODUCT")
         sys.exit(1)
 
     project_path = sys.argv[1]
     html_only = '--html-only' in sys.argv
+    if '--no-cache' in sys.argv:
+        AnalysisCache.enabled_by_default = False
+        LLMResponseCache.enabled_by_default = False
+    if '--no-ignore' in sys.argv:
+        FileInventory.honor_ignore_files = False  # Also list what .gitignore/.mrfixignore exclude
+    llm_cache_ttl = _cli_option_value(sys.argv, '--llm-cache-ttl')
+    if llm_cache_ttl is not None:
+        try:
+            LLMResponseCache.ttl_seconds = max(0.0, float(llm_cache_ttl)) * 3600
+        except ValueError:
+            print(f"⚠️ Ignoring invalid --llm-cache-ttl value: {llm_cache_ttl}")
+    prompt_budget = _cli_option_value(sys.argv, '--prompt-budget')
+    if prompt_budget is not None:
+        try:
+            PromptCompactor.budget_tokens = int(prompt_budget)
+        except ValueError:
+            print(f"⚠️ Ignoring invalid --prompt-budget value: {prompt_budget}")
+    jobs = _cli_option_value(sys.argv, '--jobs', '1')
+    walk_threads = _cli_option_value(sys.argv, '--walk-threads')
+    if walk_threads is not None:
+        try:
+            FileInventory.default_workers = max(1, int(walk_threads))
+        except ValueError:
+            print(f"⚠️ Ignoring invalid --walk-threads value: {walk_threads}")
+    output_format = _cli_option_value(sys.argv, '--format', 'html')
+    if output_format not in ('html',) + StageRecordWriter.FORMATS:
+        print(f"❌ Unknown --format {output_format} (expected html, json or ndjson)")
+        sys.exit(1)
 
     # Convert to Path object for .name attribute access
     from pathlib import Path
     project_path_obj = Path(project_path)
 
+    trace_path = _cli_option_value(sys.argv, '--trace')
+    if '--trace' in sys.argv or trace_path is not None:
+        if trace_path is None or trace_path.startswith('--'):
+            trace_path = f"{project_path_obj.name}_trace.json"
+        TRACER.enable()
+        import atexit
+
+        def write_trace():
+            TRACER.write(trace_path)
+            print(f"⏱️ Chrome trace written to: {trace_path} (open in chrome://tracing or ui.perfetto.dev)",
+                  file=sys.stderr)
+
+        atexit.register(write_trace)
+
     # Initialize the project fixer
     fixer = MrFixMyProjectPlease(project_path)
+    try:
+        fixer.MAX_WORKERS = max(1, int(jobs))
+    except ValueError:
+        print(f"⚠️ Ignoring invalid --jobs value: {jobs}")
+    # Reuse checkpointed stages of an interrupted run (same tree + configuration)
+    fixer.resume = '--resume' in sys.argv
+    memory_budget = _cli_option_value(sys.argv, '--memory-budget')
+    if memory_budget is not None:
+        try:
+            fixer.MAX_MEMORY_GB = max(1.0, float(memory_budget)) / 1024
+        except ValueError:
+            print(f"⚠️ Ignoring invalid --memory-budget value: {memory_budget}")
+
+    if output_format in StageRecordWriter.FORMATS:
+        # Headless CI mode: records on stdout, progress chatter on stderr, no HTML
+        import contextlib
+        fixer.stage_writer = StageRecordWriter(output_format, project_path_obj.name, sys.stdout)
+        with contextlib.redirect_stdout(sys.stderr):
+            results = fixer.analyze_and_heal()
+        sys.exit(0 if results.get('status') == 'completed' else 1)
 
     if html_only:
         # Generate ULTRATHINK analysis with dependency maps